@@ -0,0 +1,99 @@
+"""
+Compares the collision broadphases on scenes modeled after the demos.
+The physics is stepped without drawing, and the average time of a physics step is printed for each broadphase.
+"""
+from random import Random
+import time
+import rubato as rb
+
+# Controls the size of the benchmark
+num_obj = 400
+num_steps = 100
+
+rb.init(name="rubato broadphase benchmark", res=(1980, 1980), hidden=True)
+
+broadphases = {
+    "AABBTree": rb.AABBTree,
+    "SweepAndPrune": rb.SweepAndPrune,
+    "SpatialHash": rb.SpatialHash,
+}
+
+
+def body(rand: Random, pos: tuple[float, float], gravity: tuple[float, float]) -> rb.GameObject:
+    return rb.wrap(
+        [
+            rb.Circle(radius=12) if rand.random() < 0.5 else rb.Polygon(rb.Vector.poly(rand.randint(3, 8), 14)),
+            rb.RigidBody(
+                mass=0.1,
+                bounciness=0.5,
+                friction=0.2,
+                gravity=gravity,
+                velocity=(rand.randint(-100, 100), rand.randint(-100, 100)),
+            ),
+        ],
+        pos=pos,
+    )
+
+
+def physics_scene(name: str, broadphase: rb.Broadphase) -> rb.Scene:
+    """Bodies bouncing around inside four walls, like physics_demo.py."""
+    rand = Random(0)
+    scene = rb.Scene(name, broadphase=broadphase)
+
+    w, h = rb.Display.res.x, rb.Display.res.y
+    scene.add(
+        rb.wrap(rb.Rectangle(width=w + 175, height=h // 10), pos=rb.Display.top_center + (0, 60)),
+        rb.wrap(rb.Rectangle(width=w + 175, height=h // 10), pos=rb.Display.bottom_center + (0, -60)),
+        rb.wrap(rb.Rectangle(width=w // 10, height=h + 175), pos=rb.Display.center_left + (-60, 0)),
+        rb.wrap(rb.Rectangle(width=w // 10, height=h + 175), pos=rb.Display.center_right + (60, 0)),
+    )
+
+    for _ in range(num_obj):
+        scene.add(body(rand, (rand.uniform(-w / 2.5, w / 2.5), rand.uniform(-h / 2.5, h / 2.5)), (0, -80)))
+
+    return scene
+
+
+def side_scroller_scene(name: str, broadphase: rb.Broadphase) -> rb.Scene:
+    """A long level with the bodies spread out along the x axis, like the platformer demo."""
+    rand = Random(0)
+    scene = rb.Scene(name, broadphase=broadphase)
+
+    length = num_obj * 60
+    for x in range(0, length, 400):
+        scene.add(rb.wrap(rb.Rectangle(width=400, height=40), pos=(x, -300)))
+
+    for _ in range(num_obj):
+        scene.add(body(rand, (rand.uniform(0, length), rand.uniform(-250, 250)), (0, -200)))
+
+    return scene
+
+
+def asteroids_scene(name: str, broadphase: rb.Broadphase) -> rb.Scene:
+    """Drifting asteroids with no gravity, like asteroids.py."""
+    rand = Random(0)
+    scene = rb.Scene(name, broadphase=broadphase)
+
+    w, h = rb.Display.res.x, rb.Display.res.y
+    for _ in range(num_obj):
+        scene.add(body(rand, (rand.uniform(-w / 2, w / 2), rand.uniform(-h / 2, h / 2)), (0, 0)))
+
+    return scene
+
+
+scenes = {
+    "physics": physics_scene,
+    "side scroller": side_scroller_scene,
+    "asteroids": asteroids_scene,
+}
+
+for scene_name, make_scene in scenes.items():
+    print(f"{scene_name} ({num_obj} bodies, {num_steps} steps)")
+    for bp_name, bp in broadphases.items():
+        scene = make_scene(f"{scene_name} {bp_name}", bp())
+
+        start = time.perf_counter()
+        scene.simulate(num_steps, update=False)
+        elapsed = time.perf_counter() - start
+
+        print(f"    {bp_name:<16}{1000 * elapsed / num_steps:8.2f} ms/step")
@@ -40,6 +40,7 @@ def init(
     maximize: bool = False,
     target_fps: int = 0,
     physics_fps: int = 50,
+    max_substeps: int = 8,
     hidden: bool = False  # test: skip
 ):
     """
@@ -58,6 +59,8 @@ def init(
             Defaults to False.
         target_fps: The target frames per second. If set to 0, the target fps will be uncapped. Defaults to 0.
         physics_fps: The physics simulation's frames per second. Defaults to 50.
+        max_substeps: The most physics steps run in one frame to catch up with the time that passed. 0 means that
+            there is no limit. Defaults to 8.
         hidden: Whether the window should be hidden. Defaults to False.
     """
     sdl2.SDL_Init(sdl2.SDL_INIT_EVERYTHING)
@@ -69,6 +72,7 @@ def init(
         Time._normal_delta = 1 / target_fps
     Time._physics_fps = physics_fps
     Time.fixed_delta = 1 / physics_fps
+    Time.max_substeps = max_substeps
 
     flags = (
         sdl2.SDL_WINDOW_RESIZABLE | sdl2.SDL_WINDOW_ALLOW_HIGHDPI | sdl2.SDL_WINDOW_MOUSE_FOCUS |
@@ -87,6 +91,7 @@ def init(
         logical_size=(int(res[0]), int(res[1]))
     )
     Display._half_res = (res[0] / 2, res[1] / 2)
+    Display._clear_batch()
 
     if change_pos:
         Display.window_pos += Vector(0, Display.get_window_border_size()[0])
@@ -6,7 +6,7 @@
 import sdl2, sdl2.sdlttf
 import sys
 
-from . import Time, Display, Radio, Events, Font, PrintError, IdError, Draw, InitError
+from . import Time, Display, Radio, Events, Font, PrintError, IdError, Draw, InitError, PhysicsStats
 
 if TYPE_CHECKING:
     from . import Scene
@@ -162,9 +162,16 @@ def _tick(cls):
                 # fixed update
                 Time._physics_counter += Time.delta_time
 
+                steps = 0
                 while Time._physics_counter >= Time.fixed_delta:
+                    if Time.max_substeps and steps == Time.max_substeps:
+                        # drop what can't be caught up on, keeping the fraction of a step that is left
+                        Time._physics_counter %= Time.fixed_delta
+                        break
                     curr._fixed_update()
                     Time._physics_counter -= Time.fixed_delta
+                    Time._physics_steps += 1
+                    steps += 1
 
             curr._draw()
 
@@ -179,8 +186,11 @@ def _tick(cls):
         if cls.show_fps:
             Draw._draw_fps(cls.debug_font)
 
+        if cls.debug and PhysicsStats.enabled:
+            PhysicsStats._draw(cls.debug_font)
+
         # update renderers
-        Display.renderer.present()
+        Display._present()
 
         # end frame
         Time._end_frame()
@@ -2,5 +2,6 @@
 The classes module holds all of the high-dependency modules relating to rubato functionality.
 """
 from .gameobject import *
+from .snapshot import Snapshot, SnapshotDelta
 from .group import Group
 from .scene import Scene
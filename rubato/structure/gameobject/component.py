@@ -6,7 +6,8 @@
     ``clone()`` method.
 """
 from __future__ import annotations
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterator
+from array import array
 
 from ... import Vector, Camera
 
@@ -59,6 +60,14 @@ def true_rotation(self) -> float:
         """Returns the rotation of the component offset by its parent gameobject rotation."""
         return self.rot_offset + self.gameobj.rotation
 
+    def _save_state(self, data: array, refs: list):
+        """Adds the state of the component that a Snapshot keeps to the numbers and references of the snapshot."""
+        pass
+
+    def _load_state(self, data: Iterator[float], refs: Iterator):
+        """Puts back the state added by `_save_state()`, taking it from the numbers and references of a Snapshot."""
+        pass
+
     def _setup(self):
         self.__started = True
         self.setup()
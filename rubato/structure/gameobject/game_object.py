@@ -3,10 +3,14 @@
 Its functionality is defined by the components it holds.
 """
 from __future__ import annotations
-from typing import Type, TypeVar
+from typing import Type, TypeVar, TYPE_CHECKING, Iterator
+from array import array
 
 from . import Component
-from ... import Game, Vector, DuplicateComponentError, Draw, ImplementationError, Camera, Color, Surface
+from ... import Game, Vector, DuplicateComponentError, Draw, ImplementationError, Camera, Color, Surface, Time
+
+if TYPE_CHECKING:
+    from . import RigidBody
 
 T = TypeVar("T", bound=Component)
 
@@ -54,6 +58,8 @@ def __init__(
         """Whether the game object should update and draw."""
 
         self._components: dict[type, list[Component]] = {}
+        # the interpolating rigidbody that last recorded where the game object was before a physics step
+        self._interpolator: RigidBody | None = None
         self._debug_cross: Surface = Surface(10, 10)
         self._debug_cross.draw_line(Vector(0, 5), Vector(0, -5), Color.debug, thickness=2)  # vertical line
         self._debug_cross.draw_line(Vector(-5, 0), Vector(5, 0), Color.debug, thickness=2)  # horizontal line
@@ -105,21 +111,29 @@ def remove(self, comp_type: Type[Component]):
         """
         self.remove_ind(comp_type, 0)
 
-    def remove_by_ref(self, component: Component) -> bool:
+    def remove_by_ref(self, *components: Component) -> bool:
         """
-        Removes a component from the game object.
+        Removes components from the game object. Many components are removed in one pass over the components of
+        each type.
 
         Args:
-            component: The component to remove.
+            components: The component(s) to remove.
 
         Returns:
-            Whether the component was removed.
+            Whether all of the components were removed.
         """
-        for key, val in self._components.items():
-            if issubclass(key, type(component)):
-                val.remove(component)
-                return True
-        return False
+        by_type: dict[type, set[int]] = {}
+        for component in components:
+            by_type.setdefault(type(component), set()).add(id(component))
+
+        removed = 0
+        for comp_type, ids in by_type.items():
+            comps = self._components.get(comp_type)
+            if comps:
+                kept = [comp for comp in comps if id(comp) not in ids]
+                removed += len(comps) - len(kept)
+                comps[:] = kept
+        return removed == sum(len(ids) for ids in by_type.values())
 
     def remove_ind(self, comp_type: Type[Component], ind: int):
         """
@@ -200,6 +214,22 @@ def _draw(self, camera: Camera):
         if self.hidden or not self.active:
             return
 
+        rb = self._interpolator
+        if rb is not None and rb.interpolate and rb._state_step == Time._physics_steps - 1:
+            # draw between the previous physics step and the last one, then put the game object back
+            pos, rotation = self.pos, self.rotation
+            x, y, rot = rb._prev_state
+            alpha = Time.physics_alpha
+            self.pos = Vector(x + (pos.x - x) * alpha, y + (pos.y - y) * alpha)
+            self.rotation = rot + (rotation - rot) * alpha
+            try:
+                self._draw_components(camera)
+            finally:
+                self.pos, self.rotation = pos, rotation
+        else:
+            self._draw_components(camera)
+
+    def _draw_components(self, camera: Camera):
         for comps in self._components.values():
             for comp in comps:
                 if not comp.hidden:
@@ -220,6 +250,21 @@ def _update(self):
             for comp in comps:
                 comp._update()
 
+    def _save_state(self, data: array, refs: list):
+        comps = [comp for comps in self._components.values() for comp in comps]
+        refs.append(comps)
+        data.extend((self.pos.x, self.pos.y, self.rotation, self.active))
+        for comp in comps:
+            comp._save_state(data, refs)
+
+    def _load_state(self, data: Iterator[float], refs: Iterator):
+        comps: list[Component] = next(refs)
+        self.pos.x, self.pos.y = next(data), next(data)
+        self.rotation = next(data)
+        self.active = next(data) == 1
+        for comp in comps:
+            comp._load_state(data, refs)
+
     def _fixed_update(self):
         if not self.active:
             return
@@ -248,6 +293,8 @@ def clone(self) -> GameObject:
         return new_obj
 
     def __contains__(self, comp_type):
+        if comp_type in self._components:
+            return True
         for key in self._components:
             if issubclass(key, comp_type):
                 return True
@@ -2,7 +2,8 @@
 from __future__ import annotations
 from enum import IntEnum, unique
 from random import randint
-from typing import Callable
+from typing import Callable, Iterator
+from array import array
 import cython
 
 from . import Particle
@@ -128,6 +129,35 @@ def fixed_update(self):
                 particle.movement(particle, Time.fixed_delta)
                 i += 1
 
+    def _save_state(self, data: array, refs: list):
+        refs.append(list(self.__particles))
+        data.extend((self.running, self.__time, self.__generated, self.__forward))
+        for p in self.__particles:
+            data.extend(
+                (
+                    p.pos.x, p.pos.y, p.velocity.x, p.velocity.y, p.acceleration.x, p.acceleration.y, p.rotation,
+                    p.rot_velocity, p.rot_acceleration, p.scale.x, p.scale.y, p.age, p._system_pos.x,
+                    p._system_pos.y, p._system_rotation, p._system_z
+                )
+            )
+
+    def _load_state(self, data: Iterator[float], refs: Iterator):
+        self.__particles[:] = next(refs)
+        self.running = next(data) == 1
+        self.__time = next(data)
+        self.__generated = int(next(data))
+        self.__forward = next(data) == 1
+        for p in self.__particles:
+            p.pos.x, p.pos.y = next(data), next(data)
+            p.velocity.x, p.velocity.y = next(data), next(data)
+            p.acceleration.x, p.acceleration.y = next(data), next(data)
+            p.rotation, p.rot_velocity, p.rot_acceleration = next(data), next(data), next(data)
+            p.scale.x, p.scale.y = next(data), next(data)
+            p.age = next(data)
+            p._system_pos.x, p._system_pos.y = next(data), next(data)
+            p._system_rotation = next(data)
+            p._system_z = int(next(data))
+
     def draw(self, camera: Camera):
         for particle in self.__particles:
             if self.local_space:
@@ -1,5 +1,8 @@
 """Holds all the physics related components"""
-from .hitbox import Hitbox, Polygon, Rectangle, Circle
+from .hitbox import Hitbox, Polygon, Rectangle, Circle, EdgeChain
 from .rigidbody import RigidBody
-from .engine import Manifold, _Engine
-from .qtree import _QTree
+from .engine import Manifold, RaycastHit, _Engine
+from .broadphase import Broadphase
+from .aabb_tree import AABBTree
+from .sweep_prune import SweepAndPrune
+from .spatial_hash import SpatialHash
@@ -0,0 +1,345 @@
+"""
+A dynamic AABB tree broadphase. This is the default broadphase of every Group.
+"""
+from __future__ import annotations
+from typing import Any
+import cython
+
+from . import Broadphase
+from .broadphase import _segment_entry
+
+
+@cython.cclass
+class _TreeNode:
+    """A node of the tree. Leaves hold an item, branches hold exactly two children."""
+    item: Any = cython.declare(object)  # type: ignore
+    key: int = cython.declare(cython.longlong)  # type: ignore
+    x0: float = cython.declare(cython.double, visibility="readonly")  # type: ignore
+    y0: float = cython.declare(cython.double, visibility="readonly")  # type: ignore
+    x1: float = cython.declare(cython.double, visibility="readonly")  # type: ignore
+    y1: float = cython.declare(cython.double, visibility="readonly")  # type: ignore
+    # for branches, the union of the filters of every leaf below
+    category: int = cython.declare(object)  # type: ignore
+    mask: int = cython.declare(object)  # type: ignore
+    # the class can't name itself in its own body, so these are only declared by annotation
+    parent: _TreeNode
+    left: _TreeNode
+    right: _TreeNode
+    height: int = cython.declare(cython.int)  # type: ignore
+
+    def __init__(self, item: Any = None, key: int = -1):
+        self.item = item
+        self.key = key
+
+        self.x0 = 0
+        self.y0 = 0
+        self.x1 = 0
+        self.y1 = 0
+
+        self.category = -1
+        self.mask = -1
+
+        self.parent = None
+        self.left = None
+        self.right = None
+        self.height = 0
+
+    @cython.cfunc
+    def is_leaf(self) -> cython.bint:
+        return self.left is None
+
+    @cython.cfunc
+    def perimeter(self) -> cython.double:
+        return 2 * ((self.x1 - self.x0) + (self.y1 - self.y0))
+
+    @cython.cfunc
+    def fit(self, a: _TreeNode, b: _TreeNode):
+        """Sets the bounds and filter of this node to the union of two other nodes."""
+        self.x0 = a.x0 if a.x0 < b.x0 else b.x0
+        self.y0 = a.y0 if a.y0 < b.y0 else b.y0
+        self.x1 = a.x1 if a.x1 > b.x1 else b.x1
+        self.y1 = a.y1 if a.y1 > b.y1 else b.y1
+        self.category = a.category | b.category
+        self.mask = a.mask | b.mask
+
+    @cython.cfunc
+    def contains(self, x0: cython.double, y0: cython.double, x1: cython.double, y1: cython.double) -> cython.bint:
+        return self.x0 <= x0 and self.y0 <= y0 and x1 <= self.x1 and y1 <= self.y1
+
+    @cython.cfunc
+    def overlaps(self, x0: cython.double, y0: cython.double, x1: cython.double, y1: cython.double) -> cython.bint:
+        return not (x1 < self.x0 or y1 < self.y0 or x0 > self.x1 or y0 > self.y1)
+
+
+class AABBTree(Broadphase):
+    """
+    A persistent, incrementally updated bounding volume hierarchy. A good general purpose broadphase.
+
+    Leaves store fattened bounding boxes, so an item is only reinserted once it leaves its fat box.
+    Candidate pairs are cached per leaf and only recomputed for leaves that were reinserted, which keeps the cost of
+    a step proportional to the number of moving items. Every branch also keeps the union of the collision filters
+    below it, so whole subtrees that cannot collide with a query are skipped.
+
+    Args:
+        margin: How far to fatten the bounding box of each leaf in every direction. Defaults to 20.
+    """
+
+    def __init__(self, margin: float = 20):
+        self.margin: float = margin
+        self._root: _TreeNode | None = None
+        self._pairs: dict[_TreeNode, set[_TreeNode]] = {}
+        self._next_key: int = 0
+
+    def insert(self, item: Any, x0: float, y0: float, x1: float, y1: float) -> _TreeNode:
+        leaf: _TreeNode = _TreeNode(item, self._next_key)
+        self._next_key += 1
+        self._fatten(leaf, x0, y0, x1, y1)
+        self._insert_leaf(leaf)
+        self._pairs[leaf] = set()
+        self._repair(leaf)
+        return leaf
+
+    def remove(self, handle: _TreeNode):
+        for other in self._pairs.pop(handle):
+            self._pairs[other].discard(handle)
+        self._remove_leaf(handle)
+
+    def move(self, handle: _TreeNode, x0: float, y0: float, x1: float, y1: float) -> bool:
+        if handle.contains(x0, y0, x1, y1):
+            return False
+
+        self._remove_leaf(handle)
+        self._fatten(handle, x0, y0, x1, y1)
+        self._insert_leaf(handle)
+        self._repair(handle)
+        return True
+
+    def filter(self, handle: _TreeNode, category: int, mask: int):
+        if handle.category == category and handle.mask == mask:
+            return
+
+        handle.category, handle.mask = category, mask
+        node: _TreeNode = handle.parent
+        while node is not None:
+            node.category = node.left.category | node.right.category
+            node.mask = node.left.mask | node.right.mask
+            node = node.parent
+
+        self._repair(handle)
+
+    def query(self, x0: float, y0: float, x1: float, y1: float, category: int = -1, mask: int = -1) -> list:
+        leaf: _TreeNode
+        return [leaf.item for leaf in self._query(x0, y0, x1, y1, category, mask)]
+
+    def query_segment(self, x0: float, y0: float, x1: float, y1: float, category: int = -1, mask: int = -1) -> list:
+        found = []
+        if self._root is None:
+            return found
+
+        node: _TreeNode
+        stack: list[_TreeNode] = [self._root]
+        while stack:
+            node = stack.pop()
+            if not (node.category & mask and category & node.mask):
+                continue
+            if _segment_entry(x0, y0, x1, y1, node.x0, node.y0, node.x1, node.y1) < 0:
+                continue
+            if node.is_leaf():
+                found.append(node.item)
+            else:
+                stack.append(node.left)
+                stack.append(node.right)
+
+        return found
+
+    def pairs(self) -> list[tuple[Any, Any]]:
+        leaf: _TreeNode
+        other: _TreeNode
+        return [
+            (leaf.item, other.item) for leaf, others in self._pairs.items() for other in others if leaf.key < other.key
+        ]
+
+    def clone(self) -> AABBTree:
+        return AABBTree(self.margin)
+
+    def _fatten(self, leaf: _TreeNode, x0: float, y0: float, x1: float, y1: float):
+        leaf.x0 = x0 - self.margin
+        leaf.y0 = y0 - self.margin
+        leaf.x1 = x1 + self.margin
+        leaf.y1 = y1 + self.margin
+
+    def _query(self, x0: float, y0: float, x1: float, y1: float, category: int, mask: int) -> list[_TreeNode]:
+        found: list[_TreeNode] = []
+        if self._root is None:
+            return found
+
+        node: _TreeNode
+        stack: list[_TreeNode] = [self._root]
+        while stack:
+            node = stack.pop()
+            if not (node.category & mask and category & node.mask):
+                continue
+            if not node.overlaps(x0, y0, x1, y1):
+                continue
+            if node.is_leaf():
+                found.append(node)
+            else:
+                stack.append(node.left)
+                stack.append(node.right)
+
+        return found
+
+    def _repair(self, leaf: _TreeNode):
+        """Recomputes the cached pairs of a leaf after it was (re)inserted."""
+        other: _TreeNode
+        old = self._pairs[leaf]
+        for other in old:
+            self._pairs[other].discard(leaf)
+
+        new = set(self._query(leaf.x0, leaf.y0, leaf.x1, leaf.y1, leaf.category, leaf.mask))
+        new.discard(leaf)
+        for other in new:
+            self._pairs[other].add(leaf)
+
+        self._pairs[leaf] = new
+
+    def _insert_leaf(self, leaf: _TreeNode):
+        if self._root is None:
+            self._root = leaf
+            leaf.parent = None
+            return
+
+        # find the best sibling using the perimeter heuristic
+        node: _TreeNode = self._root
+        combined: _TreeNode = _TreeNode()
+        area: cython.double
+        cost: cython.double
+        inheritance: cython.double
+        cost_left: cython.double
+        cost_right: cython.double
+        while not node.is_leaf():
+            combined.fit(node, leaf)
+            area = node.perimeter()
+            cost = 2 * combined.perimeter()
+            inheritance = 2 * (combined.perimeter() - area)
+
+            cost_left = _descend_cost(node.left, leaf, combined, inheritance)
+            cost_right = _descend_cost(node.right, leaf, combined, inheritance)
+
+            if cost < cost_left and cost < cost_right:
+                break
+
+            node = node.left if cost_left < cost_right else node.right
+
+        sibling: _TreeNode = node
+        old_parent: _TreeNode = sibling.parent
+        new_parent: _TreeNode = _TreeNode()
+        new_parent.parent = old_parent
+        new_parent.fit(sibling, leaf)
+        new_parent.height = sibling.height + 1
+        new_parent.left = sibling
+        new_parent.right = leaf
+        sibling.parent = new_parent
+        leaf.parent = new_parent
+
+        if old_parent is None:
+            self._root = new_parent
+        elif old_parent.left is sibling:
+            old_parent.left = new_parent
+        else:
+            old_parent.right = new_parent
+
+        self._refit(leaf.parent)
+
+    def _remove_leaf(self, leaf: _TreeNode):
+        if leaf is self._root:
+            self._root = None
+            return
+
+        parent: _TreeNode = leaf.parent
+        grandparent: _TreeNode = parent.parent
+        sibling: _TreeNode = parent.left if parent.right is leaf else parent.right
+
+        if grandparent is None:
+            self._root = sibling
+            sibling.parent = None
+        else:
+            if grandparent.left is parent:
+                grandparent.left = sibling
+            else:
+                grandparent.right = sibling
+            sibling.parent = grandparent
+            self._refit(grandparent)
+
+        leaf.parent = None
+
+    def _refit(self, node: _TreeNode):
+        """Walks up from a node, rebalancing and fixing the bounds and heights of every ancestor."""
+        left: _TreeNode
+        right: _TreeNode
+        while node is not None:
+            node = self._balance(node)
+            left = node.left
+            right = node.right
+            node.height = 1 + max(left.height, right.height)
+            node.fit(left, right)
+            node = node.parent
+
+    def _balance(self, a: _TreeNode) -> _TreeNode:
+        """Performs a tree rotation if the node is unbalanced. Returns the node now in the position of a."""
+        if a.is_leaf() or a.height < 2:
+            return a
+
+        b: _TreeNode = a.left
+        c: _TreeNode = a.right
+        balance = c.height - b.height
+
+        if balance > 1:
+            self._rotate_up(a, c, b, False)
+            return c
+        if balance < -1:
+            self._rotate_up(a, b, c, True)
+            return b
+        return a
+
+    def _rotate_up(self, a: _TreeNode, up: _TreeNode, other: _TreeNode, from_left: bool):
+        """Rotates the child ``up`` of ``a`` into the position of ``a``."""
+        f: _TreeNode = up.left
+        g: _TreeNode = up.right
+
+        up.left = a
+        up.parent = a.parent
+        a.parent = up
+
+        if up.parent is None:
+            self._root = up
+        elif up.parent.left is a:
+            up.parent.left = up
+        else:
+            up.parent.right = up
+
+        keep: _TreeNode
+        give: _TreeNode
+        keep, give = (f, g) if f.height > g.height else (g, f)
+        up.right = keep
+        if from_left:
+            a.left = give
+        else:
+            a.right = give
+        give.parent = a
+
+        a.fit(other, give)
+        up.fit(a, keep)
+        a.height = 1 + max(other.height, give.height)
+        up.height = 1 + max(a.height, keep.height)
+
+
+@cython.cfunc
+def _descend_cost(
+    child: _TreeNode, leaf: _TreeNode, combined: _TreeNode, inheritance: cython.double
+) -> cython.double:
+    """The cost of inserting a leaf somewhere below a child of the node being descended."""
+    combined.fit(child, leaf)
+    if child.is_leaf():
+        return combined.perimeter() + inheritance
+    return combined.perimeter() - child.perimeter() + inheritance
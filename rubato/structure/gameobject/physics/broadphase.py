@@ -0,0 +1,157 @@
+"""
+A broadphase quickly culls the hitboxes that cannot be colliding, so that the physics engine only runs the
+expensive overlap tests on the pairs that might be. Each Group owns a broadphase that persists across physics steps.
+"""
+from __future__ import annotations
+from typing import Any
+
+
+class Broadphase:
+    """
+    A broadphase template. Note that this is a template class and should not be used directly.
+    Instead, use one of the broadphases that extend it, like
+    :func:`AABBTree <rubato.structure.gameobject.physics.aabb_tree.AABBTree>`,
+    :func:`SweepAndPrune <rubato.structure.gameobject.physics.sweep_prune.SweepAndPrune>` or
+    :func:`SpatialHash <rubato.structure.gameobject.physics.spatial_hash.SpatialHash>`.
+
+    All bounds are given as the left, bottom, right and top of an axis-aligned box in world coordinates.
+
+    Every item also has a collision filter: a category and a mask bitfield. Two items are only paired if each one's
+    category shares a bit with the other's mask. New items belong to and collide with every category.
+    """
+    # pylint: disable=unused-argument
+
+    def insert(self, item: Any, x0: float, y0: float, x1: float, y1: float) -> Any:
+        """
+        Adds an item to the broadphase.
+
+        Args:
+            item: The item to add.
+            x0: The left of the item's bounding box.
+            y0: The bottom of the item's bounding box.
+            x1: The right of the item's bounding box.
+            y1: The top of the item's bounding box.
+
+        Returns:
+            A handle to the item. Keep it to move or remove the item later.
+        """
+        return item
+
+    def remove(self, handle: Any):
+        """
+        Removes an item from the broadphase.
+
+        Args:
+            handle: The handle returned when the item was inserted.
+        """
+        pass
+
+    def move(self, handle: Any, x0: float, y0: float, x1: float, y1: float) -> bool:
+        """
+        Updates the bounding box of an item.
+
+        Args:
+            handle: The handle returned when the item was inserted.
+            x0: The new left of the item's bounding box.
+            y0: The new bottom of the item's bounding box.
+            x1: The new right of the item's bounding box.
+            y1: The new top of the item's bounding box.
+
+        Returns:
+            Whether the broadphase had to do any work to update the item.
+        """
+        return False
+
+    def filter(self, handle: Any, category: int, mask: int):
+        """
+        Sets the collision filter of an item.
+
+        Args:
+            handle: The handle returned when the item was inserted.
+            category: The categories the item belongs to.
+            mask: The categories the item collides with.
+        """
+        pass
+
+    def query(self, x0: float, y0: float, x1: float, y1: float, category: int = -1, mask: int = -1) -> list:
+        """
+        Finds the items that may overlap a box.
+
+        Args:
+            x0: The left of the box.
+            y0: The bottom of the box.
+            x1: The right of the box.
+            y1: The top of the box.
+            category: The categories of the box. Defaults to -1 (every category).
+            mask: The categories the box collides with. Defaults to -1 (every category).
+
+        Returns:
+            A list of the items that may overlap the box and whose filter accepts it.
+        """
+        return []
+
+    def query_segment(self, x0: float, y0: float, x1: float, y1: float, category: int = -1, mask: int = -1) -> list:
+        """
+        Finds the items that may be crossed by a line segment.
+        By default, this queries the bounding box of the segment. Broadphases that can follow the segment instead
+        override it.
+
+        Args:
+            x0: The x coordinate of the start of the segment.
+            y0: The y coordinate of the start of the segment.
+            x1: The x coordinate of the end of the segment.
+            y1: The y coordinate of the end of the segment.
+            category: The categories of the segment. Defaults to -1 (every category).
+            mask: The categories the segment collides with. Defaults to -1 (every category).
+
+        Returns:
+            A list of the items that may be crossed by the segment and whose filter accepts it.
+        """
+        return self.query(min(x0, x1), min(y0, y1), max(x0, x1), max(y0, y1), category, mask)
+
+    def pairs(self) -> list[tuple[Any, Any]]:
+        """
+        Finds the pairs of items that may overlap. Each unordered pair is returned once.
+
+        Returns:
+            A list of item pairs.
+        """
+        return []
+
+    def clone(self) -> Broadphase:
+        """Creates an empty broadphase with the same settings as this one."""
+        return Broadphase()
+
+
+def _segment_entry(x0: float, y0: float, x1: float, y1: float, bx0: float, by0: float, bx1: float, by1: float) -> float:
+    """
+    Finds where a line segment enters a box, as a fraction of the segment.
+    Returns 0 if the segment starts inside the box, and -1 if it misses the box.
+    """
+    lo, hi = 0.0, 1.0
+
+    dx = x1 - x0
+    if dx == 0:
+        if x0 < bx0 or x0 > bx1:
+            return -1
+    else:
+        ta, tb = (bx0 - x0) / dx, (bx1 - x0) / dx
+        if ta > tb:
+            ta, tb = tb, ta
+        lo, hi = max(lo, ta), min(hi, tb)
+        if lo > hi:
+            return -1
+
+    dy = y1 - y0
+    if dy == 0:
+        if y0 < by0 or y0 > by1:
+            return -1
+    else:
+        ta, tb = (by0 - y0) / dy, (by1 - y0) / dy
+        if ta > tb:
+            ta, tb = tb, ta
+        lo, hi = max(lo, ta), min(hi, tb)
+        if lo > hi:
+            return -1
+
+    return lo
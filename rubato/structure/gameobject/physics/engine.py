@@ -1,10 +1,13 @@
 """Utility methods for colliding hitbox components."""
 from __future__ import annotations
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Any, Callable, Optional
+from array import array
 import math
 
-from . import RigidBody, Circle, Polygon, Rectangle
-from .... import Math, Vector, InitError
+from . import RigidBody, Circle, Polygon, Rectangle, EdgeChain
+from .hitbox import _no_callback, _poly_world
+from .narrowphase import overlap_pairs, overlap_pair, touching_pairs
+from .... import Math, Vector, InitError, Time, PhysicsStats
 
 if TYPE_CHECKING:
     from . import Hitbox
@@ -28,302 +31,691 @@ def resolve(col: Manifold):
         Args:
             col: The collision information.
         """
-        # INITIALIZATION STEP
-        rb_a: RigidBody | None = col.shape_a.gameobj.get(RigidBody) if (RigidBody in col.shape_a.gameobj) else None
-        rb_b: RigidBody | None = col.shape_b.gameobj.get(RigidBody) if (RigidBody in col.shape_b.gameobj) else None
+        _Engine.solve([col], 1)
 
-        if not rb_a and not rb_b:
-            return
-
-        # calculate restitution
-        e = max(rb_a.bounciness if rb_a else 0, rb_b.bounciness if rb_b else 0)
+    @staticmethod
+    def solve(manifolds: list[Manifold], iterations: int, swept: set[RigidBody] | None = None):
+        """
+        Resolves collisions together with sequential impulses.
+        Every contact is solved several times in turn, clamping the total impulse it has applied so far instead of
+        each single one, so stacked bodies settle instead of pushing each other around. Contacts start from the
+        impulses their manifolds carry over from the last step (warm starting), so few iterations are needed.
+        The bodies are then pushed out of each other the same way.
 
-        # calculate friction coefficient
-        if not rb_a:
-            rv = rb_b.velocity  # type: ignore
-            mu = rb_b.friction * rb_b.friction  # type: ignore
-        elif not rb_b:
-            rv = -rb_a.velocity
-            mu = rb_a.friction * rb_a.friction
-        else:
-            rv = rb_b.velocity - rb_a.velocity
-            mu = (rb_a.friction * rb_a.friction + rb_b.friction * rb_b.friction) / 2
-
-        # find inverse masses
-        inv_mass_a: float = rb_a.inv_mass if rb_a else 0
-        inv_mass_b: float = rb_b.inv_mass if rb_b else 0
-
-        # handle infinite mass cases
-        if inv_mass_a == inv_mass_b == 0:
-            if not rb_a:
-                inv_mass_b = 1
-            elif not rb_b:
-                inv_mass_a = 1
+        Args:
+            manifolds: The collisions to resolve. Their accumulated impulses are updated.
+            iterations: How many times to solve every contact.
+            swept: The rigidbodies that continuous collision detection stopped short this step. Defaults to None.
+        """
+        # the velocity and the correction of the position of every body, by reference
+        bodies: dict[RigidBody, tuple[list[float], list[float]]] = {}
+        bouncing: set[RigidBody] = set()
+        contacts: list[tuple] = []
+
+        for col in manifolds:
+            go_a, go_b = col.shape_a.gameobj, col.shape_b.gameobj
+            rb_a: RigidBody | None = go_a.get(RigidBody) if RigidBody in go_a else None
+            rb_b: RigidBody | None = go_b.get(RigidBody) if RigidBody in go_b else None
+            move_a = rb_a is not None and not rb_a.static
+            move_b = rb_b is not None and not rb_b.static
+            if not (move_a or move_b):
+                continue
+
+            inv_mass_a: float = rb_a.inv_mass if move_a else 0  # type: ignore
+            inv_mass_b: float = rb_b.inv_mass if move_b else 0  # type: ignore
+
+            # massless rigidbodies are moved as if they had a mass of 1
+            if inv_mass_a == inv_mass_b == 0:
+                inv_mass_a = 1 if move_a else 0
+                inv_mass_b = 1 if move_b else 0
+
+            if rb_a is None:
+                mu = rb_b.friction * rb_b.friction  # type: ignore
+            elif rb_b is None:
+                mu = rb_a.friction * rb_a.friction
             else:
-                inv_mass_a, inv_mass_b = 1, 1
+                mu = (rb_a.friction * rb_a.friction + rb_b.friction * rb_b.friction) / 2
+
+            vel_a = shift_a = vel_b = shift_b = None
+            if move_a:
+                if rb_a not in bodies:
+                    bodies[rb_a] = ([rb_a._velocity.x, rb_a._velocity.y], [0, 0])  # type: ignore
+                vel_a, shift_a = bodies[rb_a]  # type: ignore
+            if move_b:
+                if rb_b not in bodies:
+                    bodies[rb_b] = ([rb_b._velocity.x, rb_b._velocity.y], [0, 0])  # type: ignore
+                vel_b, shift_b = bodies[rb_b]  # type: ignore
+
+            # the normal from a to b, and the tangent
+            nx: float = -col.normal.x
+            ny: float = -col.normal.y
+            tx: float = ny
+            ty: float = -nx
+
+            rvx: float = (vel_b[0] if vel_b else 0) - (vel_a[0] if vel_a else 0)
+            rvy: float = (vel_b[1] if vel_b else 0) - (vel_a[1] if vel_a else 0)
+            contact_vel: float = rvx * nx + rvy * ny
+
+            # bounce off of the speed the bodies approached with, unless they are only resting on each other
+            rest_vel: float = max(
+                rb_a.gravity.magnitude if rb_a else 0,
+                rb_b.gravity.magnitude if rb_b else 0,
+            ) * Time.fixed_delta
+            e = max(rb_a.bounciness if rb_a else 0, rb_b.bounciness if rb_b else 0)
+            bias: float = 0
+            if contact_vel < -rest_vel and e > 0:
+                bias = -e * contact_vel
+                bouncing.add(rb_a)  # type: ignore
+                bouncing.add(rb_b)  # type: ignore
+
+            # warm start
+            px: float = nx * col._jn + tx * col._jt
+            py: float = ny * col._jn + ty * col._jt
+            if vel_a:
+                vel_a[0] -= px * inv_mass_a
+                vel_a[1] -= py * inv_mass_a
+            if vel_b:
+                vel_b[0] += px * inv_mass_b
+                vel_b[1] += py * inv_mass_b
+
+            contacts.append((
+                col,
+                vel_a,
+                vel_b,
+                shift_a,
+                shift_b,
+                inv_mass_a,
+                inv_mass_b,
+                1 / (inv_mass_a + inv_mass_b),
+                nx,
+                ny,
+                bias,
+                mu,
+                inv_mass_a * rb_a.pos_correction if move_a else 0,  # type: ignore
+                inv_mass_b * rb_b.pos_correction if move_b else 0,  # type: ignore
+            ))
+
+        for _ in range(iterations):
+            for col, vel_a, vel_b, _, _, inv_mass_a, inv_mass_b, k, nx, ny, bias, mu, _, _ in contacts:
+                tx, ty = ny, -nx
+
+                # the normal impulse can only ever push the bodies apart
+                rvx = (vel_b[0] if vel_b else 0) - (vel_a[0] if vel_a else 0)
+                rvy = (vel_b[1] if vel_b else 0) - (vel_a[1] if vel_a else 0)
+                jn = max(col._jn - (rvx * nx + rvy * ny - bias) * k, 0)
+                d = jn - col._jn
+                col._jn = jn
+                px, py = nx * d, ny * d
+                if vel_a:
+                    vel_a[0] -= px * inv_mass_a
+                    vel_a[1] -= py * inv_mass_a
+                if vel_b:
+                    vel_b[0] += px * inv_mass_b
+                    vel_b[1] += py * inv_mass_b
+
+                # friction, limited by the normal impulse
+                rvx = (vel_b[0] if vel_b else 0) - (vel_a[0] if vel_a else 0)
+                rvy = (vel_b[1] if vel_b else 0) - (vel_a[1] if vel_a else 0)
+                limit = mu * col._jn
+                jt = min(max(col._jt - (rvx * tx + rvy * ty) * k, -limit), limit)
+                d = jt - col._jt
+                col._jt = jt
+                px, py = tx * d, ty * d
+                if vel_a:
+                    vel_a[0] -= px * inv_mass_a
+                    vel_a[1] -= py * inv_mass_a
+                if vel_b:
+                    vel_b[0] += px * inv_mass_b
+                    vel_b[1] += py * inv_mass_b
+
+        # the bodies were moved with their velocities from before the collisions, so their moves are redone with the
+        # resolved velocities. bouncing bodies are left where they are, as they would gain height otherwise, and so are
+        # swept bodies, which only moved part of the way
+        for rb, (vel, shift) in bodies.items():
+            if rb in bouncing or (swept and rb in swept):
+                continue
+            shift[0] = (vel[0] - rb._velocity.x) * Time.fixed_delta
+            shift[1] = (vel[1] - rb._velocity.y) * Time.fixed_delta
+
+        # push the bodies out of each other, the lighter one further. the penetrations are estimated from how far
+        # the bodies have been pushed so far, so a whole stack is straightened out together
+        for _ in range(iterations):
+            for col, _, _, shift_a, shift_b, _, _, k, nx, ny, _, _, corr_a, corr_b in contacts:
+                pen = col.penetration
+                if shift_a:
+                    pen += shift_a[0] * nx + shift_a[1] * ny
+                if shift_b:
+                    pen -= shift_b[0] * nx + shift_b[1] * ny
+                correction = max(pen - 0.01, 0) * k
+                if shift_a:
+                    shift_a[0] -= nx * correction * corr_a
+                    shift_a[1] -= ny * correction * corr_a
+                if shift_b:
+                    shift_b[0] += nx * correction * corr_b
+                    shift_b[1] += ny * correction * corr_b
+
+        # written in place like integration does, so the bodies keep their vectors
+        for rb, (vel, shift) in bodies.items():
+            pos, velocity = rb._own_vectors()
+            velocity.x, velocity.y = vel[0], vel[1]
+            rb.wake()
+            if shift[0] or shift[1]:
+                pos.x, pos.y = pos.x + shift[0], pos.y + shift[1]
 
-        col.normal *= -1
+    @staticmethod
+    def integrate(bodies: list[RigidBody]):
+        """
+        Moves rigidbodies by their velocities after applying their gravity, and advances their rest timers,
+        all in one pass. Their position and velocity vectors are updated in place instead of being replaced.
+        Vectors that the game objects or rigidbodies were given from outside are copied once first, so vectors
+        shared with other code aren't moved along with them.
 
-        # RESOLUTION STEP
-        contact_vel = rv.dot(col.normal)
+        Args:
+            bodies: The rigidbodies to integrate.
+        """
+        dt: float = Time.fixed_delta
+        for rb in bodies:
+            go = rb.gameobj
+
+            pos, vel = rb._own_vectors()
+            if rb.continuous:
+                rb._prev_pos.x, rb._prev_pos.y = pos.x, pos.y
+
+            vx: float = vel.x
+            vy: float = vel.y
+            ang_vel: float = rb.ang_vel
+            speed: float = rb.sleep_speed
+            if vx * vx + vy * vy < speed * speed and abs(ang_vel) < speed:
+                rb._rest_time += dt
+            else:
+                rb._rest_time = 0
 
-        inv_inert = 1 / (inv_mass_a + inv_mass_b)
+            gravity: Vector = rb.gravity
+            max_speed: Vector = rb.max_speed
+            vx = min(max(vx + gravity.x * dt, -max_speed.x), max_speed.x)
+            vy = min(max(vy + gravity.y * dt, -max_speed.y), max_speed.y)
 
-        j = -(1 + e) * contact_vel * inv_inert
+            vel.x, vel.y = vx, vy
+            pos.x, pos.y = pos.x + vx * dt, pos.y + vy * dt
+            if ang_vel != 0:
+                go.rotation += ang_vel * dt
 
-        impulse = col.normal * j
+    @staticmethod
+    def overlap(hitbox_a: Hitbox, hitbox_b: Hitbox) -> Optional[Manifold]:
+        """
+        Determines if there is overlap between two hitboxes.
+        Returns a Manifold manifold if a collision occurs but does not resolve.
+        Note that this is only implemented for native rubato hitbox types (Rectangle, Polygon, Circle, EdgeChain).
 
-        t = rv - col.normal * rv.dot(col.normal)
-        t.normalized(t)
+        Args:
+            hitbox_a: The first hitbox to collide with.
+            hitbox_b: The second hitbox to collide with.
 
-        jt = -rv.dot(t) * inv_inert
+        Returns:
+            Returns a collision info object if overlap is detected or None if no collision is detected.
+        """
+        if PhysicsStats._step is not None:
+            PhysicsStats._count_tests([(type(hitbox_a), type(hitbox_b))])
+        a_count, b_count = _Engine._pack(hitbox_a), _Engine._pack(hitbox_b)
+        r = overlap_pair(hitbox_a._packed, a_count, hitbox_b._packed, b_count)
+        return None if r is None else _Engine._manifold(hitbox_a, hitbox_b, *r)
 
-        if abs(jt) < j * mu:
-            t_impulse = t * jt
-        else:
-            t_impulse = -mu * t * j
+    @staticmethod
+    def overlap_all(pairs: list[tuple[Hitbox, Hitbox]]) -> list[Optional[Manifold]]:
+        """
+        Determines if there is overlap between each of many pairs of hitboxes.
+        The pairs are all tested in one call to compiled code that runs without the GIL, and manifolds are only
+        created for the pairs that overlap.
+        Note that this is only implemented for native rubato hitbox types (Rectangle, Polygon, Circle, EdgeChain).
 
-        correction = max(col.penetration - 0.01, 0) * col.normal
+        Args:
+            pairs: The pairs of hitboxes to test.
 
-        # Corrections
-        if rb_a and not rb_a.static:
-            rb_a.velocity -= impulse * inv_mass_a
-            rb_a.velocity -= t_impulse * inv_mass_a
-            col.shape_a.gameobj.pos -= correction * rb_a.pos_correction
+        Returns:
+            A collision info object for each pair that overlaps and None for each pair that doesn't, in the order
+            of the pairs.
+        """
+        results, features = array("d", [0]) * (3 * len(pairs)), array("i", [0]) * (2 * len(pairs))
+        overlap_pairs(*_Engine._pack_pairs(pairs), results, features)
 
-        if rb_b and not rb_b.static:
-            rb_b.velocity += impulse * inv_mass_b
-            rb_b.velocity += t_impulse * inv_mass_b
-            col.shape_b.gameobj.pos += correction * rb_b.pos_correction
+        cols: list[Optional[Manifold]] = []
+        for i, (hitbox_a, hitbox_b) in enumerate(pairs):
+            if features[2 * i] == -2:
+                cols.append(None)
+            else:
+                cols.append(
+                    _Engine._manifold(
+                        hitbox_a,
+                        hitbox_b,
+                        features[2 * i],
+                        features[2 * i + 1],
+                        results[3 * i],
+                        results[3 * i + 1],
+                        results[3 * i + 2],
+                    )
+                )
+        return cols
 
     @staticmethod
-    def overlap(hitbox_a: Hitbox, hitbox_b: Hitbox) -> Optional[Manifold]:
+    def touching_all(pairs: list[tuple[Hitbox, Hitbox]]) -> list[bool]:
         """
-        Determines if there is overlap between two hitboxes.
-        Returns a Manifold manifold if a collision occurs but does not resolve.
-        Note that this is only implemented for native rubato hitbox types (Rectangle, Polygon, Circle).
+        Determines if there is overlap between each of many pairs of hitboxes, without measuring the overlap.
+        Cheaper than `overlap_all()` when only whether they touch matters, as for most triggers.
+        Note that this is only implemented for native rubato hitbox types (Rectangle, Polygon, Circle, EdgeChain).
 
         Args:
-            hitbox_a: The first hitbox to collide with.
-            hitbox_b: The second hitbox to collide with.
+            pairs: The pairs of hitboxes to test.
 
         Returns:
-            Returns a collision info object if overlap is detected or None if no collision is detected.
+            Whether each pair overlaps, in the order of the pairs.
         """
-        if not isinstance(hitbox_a,
-                          Rectangle | Polygon | Circle) or not isinstance(hitbox_b, Rectangle | Polygon | Circle):
-            raise TypeError("Engine.overlap() only supports Rectangle, Polygon, and Circle objects.")
+        touching = array("i", [0]) * len(pairs)
+        touching_pairs(*_Engine._pack_pairs(pairs), touching)
+        return [t == 1 for t in touching]
 
-        if isinstance(hitbox_a, Circle):
-            if isinstance(hitbox_b, Circle):
-                return _Engine._circle_circle_test(hitbox_a, hitbox_b)
+    @staticmethod
+    def _pack_pairs(pairs: list[tuple[Hitbox, Hitbox]]) -> tuple[array, array, array, array]:
+        """
+        Packs the hitboxes of many pairs for the compiled overlap tests. Every hitbox is packed once, however many
+        pairs it is in.
 
-            return _Engine._circle_polygon_test(hitbox_a, hitbox_b)
+        Returns:
+            The packed geometry of the hitboxes, where each one starts in it, their number of vertices, and the
+            indices of the two hitboxes of each pair.
+        """
+        if PhysicsStats._step is not None:
+            PhysicsStats._count_tests([(type(hitbox_a), type(hitbox_b)) for hitbox_a, hitbox_b in pairs])
+        index: dict[Hitbox, int] = {}
+        data, offsets, counts, packed = array("d"), array("i"), array("i"), array("i")
+        for pair in pairs:
+            for hb in pair:
+                i = index.get(hb)
+                if i is None:
+                    i = index[hb] = len(offsets)
+                    counts.append(_Engine._pack(hb))
+                    offsets.append(len(data))
+                    data.extend(hb._packed)
+                packed.append(i)
+        return data, offsets, counts, packed
 
-        if isinstance(hitbox_b, Circle):
-            r = _Engine._circle_polygon_test(hitbox_b, hitbox_a)
-            return None if r is None else r._flip()
+    @staticmethod
+    def _pack(hb: Hitbox) -> int:
+        """
+        Brings the packed world geometry of a hitbox up to date for the overlap tests.
+
+        Returns:
+            The number of vertices of the hitbox, 0 for circles, or minus the number of vertices for edge chains.
+        """
+        if isinstance(hb, Circle):
+            hb._geometry()
+            return 0
+        if isinstance(hb, Polygon | Rectangle):
+            hb._geometry()
+            return len(hb._packed) // 4
+        if isinstance(hb, EdgeChain):
+            hb._geometry()
+            return 2 - len(hb._packed) // 2
+        raise TypeError("Engine.overlap() only supports Rectangle, Polygon, Circle, and EdgeChain objects.")
 
-        return _Engine._polygon_polygon_test(hitbox_a, hitbox_b)
+    @staticmethod
+    def _manifold(
+        hitbox_a: Hitbox,
+        hitbox_b: Hitbox,
+        side: int,
+        face: int,
+        penetration: float,
+        nx: float,
+        ny: float,
+    ) -> Manifold:
+        """Builds the manifold of an overlap found by the compiled tests."""
+        shape = hitbox_a if side == 0 else hitbox_b if side == 1 else None
+        return Manifold(hitbox_a, hitbox_b, penetration, Vector(nx, ny), (shape, face))
 
     @staticmethod
-    def collide(hitbox_a: Hitbox, hitbox_b: Hitbox) -> Optional[Manifold]:
+    def collide(hitbox_a: Hitbox, hitbox_b: Hitbox, manifolds: list[Manifold] | None = None) -> Optional[Manifold]:
         """
         Collides two hitboxes (if they overlap), calling their callbacks if they exist.
         Resolves the collision using Rigidbody impulse resolution if applicable.
-        Note that this is only implemented for native rubato hitbox types (Rectangle, Polygon, Circle).
+        Note that this is only implemented for native rubato hitbox types (Rectangle, Polygon, Circle, EdgeChain).
 
         Args:
             hitbox_a: The first hitbox to collide with.
             hitbox_b: The second hitbox to collide with.
+            manifolds: A list to add the collision to if it has to be resolved, to solve it later together with the
+                others with `solve()`. Defaults to None, which resolves it right away.
 
         Returns:
             Returns a collision info object if a collision is detected or None if no collision is detected.
         """
-        col = _Engine.overlap(hitbox_a, hitbox_b)
-        if col is None:
-            if hitbox_b in hitbox_a.colliding:
-                mani = Manifold(hitbox_a, hitbox_b)
-                hitbox_a.colliding.remove(hitbox_b)
-                hitbox_a.on_exit(mani)
-
-            if hitbox_a in hitbox_b.colliding:
-                mani = Manifold(hitbox_b, hitbox_a)
-                hitbox_b.colliding.remove(hitbox_a)
-                hitbox_b.on_exit(mani)
-
-            return
-
-        loc = col._flip()
+        return _Engine._contact(hitbox_a, hitbox_b, _Engine.overlap(hitbox_a, hitbox_b), manifolds)
 
-        if hitbox_b not in hitbox_a.colliding:
-            hitbox_a.colliding.add(hitbox_b)
-            hitbox_a.on_enter(col)
+    @staticmethod
+    def collide_all(pairs: list[tuple[Hitbox, Hitbox]], manifolds: list[Manifold] | None = None) -> list[bool]:
+        """
+        Collides each of many pairs of hitboxes like `collide()`, after testing them all at once.
+        Pairs with a trigger that won't call on_collide only need to know whether they touch, so they are tested
+        with `touching_all()`, and only measured fully when they start touching and an on_enter needs the manifold.
+        The others are tested with `overlap_all()`.
 
-        if hitbox_a not in hitbox_b.colliding:
-            hitbox_b.colliding.add(hitbox_a)
-            hitbox_b.on_enter(loc)
+        Args:
+            pairs: The pairs of hitboxes to collide.
+            manifolds: A list to add the collisions to that have to be resolved. Defaults to None, which resolves
+                them right away.
 
-        if not (hitbox_a.trigger or hitbox_b.trigger):
-            _Engine.resolve(col)
+        Returns:
+            Whether each pair collides, in the order of the pairs.
+        """
+        sensors = [_Engine._sensor(hitbox_a, hitbox_b) for hitbox_a, hitbox_b in pairs]
+        if any(sensors):
+            cols = iter(_Engine.overlap_all([pair for pair, sensor in zip(pairs, sensors) if not sensor]))
+            touching = iter(_Engine.touching_all([pair for pair, sensor in zip(pairs, sensors) if sensor]))
+        else:
+            cols, touching = iter(_Engine.overlap_all(pairs)), iter(())
 
-        hitbox_a.on_collide(col)
-        hitbox_b.on_collide(loc)
+        colliding: list[bool] = []
+        for (hitbox_a, hitbox_b), sensor in zip(pairs, sensors):
+            if sensor:
+                colliding.append(_Engine._sense(hitbox_a, hitbox_b, next(touching), manifolds))
+            else:
+                colliding.append(_Engine._contact(hitbox_a, hitbox_b, next(cols), manifolds) is not None)
+        return colliding
 
     @staticmethod
-    def _circle_circle_test(circle_a: Circle, circle_b: Circle) -> Optional[Manifold]:
-        """Checks for overlap between two circles"""
-        a_rad = circle_a.true_radius()
-        b_rad = circle_b.true_radius()
-        a_pos = circle_a.true_pos()
-        b_pos = circle_b.true_pos()
-
-        t_rad = a_rad + b_rad
-        d_x, d_y = a_pos.x - b_pos.x, a_pos.y - b_pos.y
-        dist = d_x * d_x + d_y * d_y
-
-        if dist > t_rad * t_rad:
-            return
+    def _sensor(hitbox_a: Hitbox, hitbox_b: Hitbox) -> bool:
+        """Whether a pair has a trigger and neither hitbox will call its on_collide for it."""
+        return (hitbox_a.trigger or hitbox_b.trigger) and \
+            (hitbox_a.on_collide is _no_callback or hitbox_a.enter_exit_only) and \
+            (hitbox_b.on_collide is _no_callback or hitbox_b.enter_exit_only)
 
-        dist = math.sqrt(dist)
+    @staticmethod
+    def _sense(hitbox_a: Hitbox, hitbox_b: Hitbox, touching: bool, manifolds: list[Manifold] | None) -> bool:
+        """Updates the colliding sets of a trigger pair that was only tested for touching, calling its callbacks."""
+        if not touching:
+            _Engine.separate(hitbox_a, hitbox_b)
+            return False
 
-        if dist == 0:
-            pen = a_rad
-            norm = Vector(1, 0)
-        else:
-            pen = t_rad - dist
-            norm = Vector(d_x / dist, d_y / dist)
+        if (hitbox_b not in hitbox_a.colliding and hitbox_a.on_enter is not _no_callback) or \
+            (hitbox_a not in hitbox_b.colliding and hitbox_b.on_enter is not _no_callback):
+            # the on_enter callbacks get the full manifold
+            return _Engine._contact(hitbox_a, hitbox_b, _Engine.overlap(hitbox_a, hitbox_b), manifolds) is not None
 
-        return Manifold(circle_a, circle_b, pen, norm)
+        hitbox_a.colliding.add(hitbox_b)
+        hitbox_b.colliding.add(hitbox_a)
+        return True
 
     @staticmethod
-    def _circle_polygon_test(circle: Circle, polygon: Polygon | Rectangle) -> Optional[Manifold]:
-        """Checks for overlap between a circle and a polygon"""
-        verts = polygon.offset_verts()
-        circle_rad = circle.true_radius()
-        circle_pos = circle.true_pos()
-        poly_pos = polygon.true_pos()
+    def _contact(
+        hitbox_a: Hitbox,
+        hitbox_b: Hitbox,
+        col: Optional[Manifold],
+        manifolds: list[Manifold] | None,
+    ) -> Optional[Manifold]:
+        """Updates the colliding sets, calls the callbacks and resolves the collision for the overlap of a pair."""
+        if col is None:
+            _Engine.separate(hitbox_a, hitbox_b)
+            return
 
-        center = (circle_pos - poly_pos).rotate(-polygon.gameobj.rotation)
+        # the flipped manifold is only built if hitbox_b has a callback to pass it to
+        loc = None
 
-        separation = -Math.INF
-        face_normal = 0
+        if hitbox_b not in hitbox_a.colliding:
+            hitbox_a.colliding.add(hitbox_b)
+            if hitbox_a.on_enter is not _no_callback:
+                _Engine._call(hitbox_a.on_enter, col)
 
-        for i in range(len(verts)):
-            s = _Engine._get_normal(verts, i).dot(center - verts[i])
+        if hitbox_a not in hitbox_b.colliding:
+            hitbox_b.colliding.add(hitbox_a)
+            if hitbox_b.on_enter is not _no_callback:
+                loc = col._flip()
+                _Engine._call(hitbox_b.on_enter, loc)
+
+        trigger = hitbox_a.trigger or hitbox_b.trigger
+        if not trigger:
+            if manifolds is None:
+                _Engine.resolve(col)
+            else:
+                manifolds.append(col)
 
-            if s > circle_rad:
-                return
+        if hitbox_a.on_collide is not _no_callback and not (trigger and hitbox_a.enter_exit_only):
+            _Engine._call(hitbox_a.on_collide, col)
+        if hitbox_b.on_collide is not _no_callback and not (trigger and hitbox_b.enter_exit_only):
+            _Engine._call(hitbox_b.on_collide, loc if loc is not None else col._flip())
 
-            if s > separation:
-                separation = s
-                face_normal = i
+        return col
 
-        if separation <= 0:
-            norm = _Engine._get_normal(verts, face_normal).rotate(polygon.gameobj.rotation)
-            return Manifold(circle, polygon, circle_rad, norm)
+    @staticmethod
+    def _call(callback: Callable[[Manifold], None], col: Manifold):
+        """Calls a collision callback, counting it if the physics step is being recorded."""
+        if PhysicsStats._step is not None:
+            PhysicsStats._step.callbacks += 1
+        callback(col)
 
-        v1, v2 = verts[face_normal], verts[(face_normal + 1) % len(verts)]
+    @staticmethod
+    def separate(hitbox_a: Hitbox, hitbox_b: Hitbox):
+        """
+        Marks two hitboxes as no longer colliding, calling their exit callbacks if they were colliding.
+        Does nothing if they were not.
 
-        dot_1 = (center - v1).dot(v2 - v1)
-        dot_2 = (center - v2).dot(v1 - v2)
-        pen = circle_rad - separation
+        Args:
+            hitbox_a: The first hitbox.
+            hitbox_b: The second hitbox.
+        """
+        if hitbox_b in hitbox_a.colliding:
+            hitbox_a.colliding.remove(hitbox_b)
+            if hitbox_a.on_exit is not _no_callback:
+                _Engine._call(hitbox_a.on_exit, Manifold(hitbox_a, hitbox_b))
 
-        if dot_1 <= 0:
-            offs = center - v1
-            if offs.mag_sq > circle_rad * circle_rad:
-                return
+        if hitbox_a in hitbox_b.colliding:
+            hitbox_b.colliding.remove(hitbox_a)
+            if hitbox_b.on_exit is not _no_callback:
+                _Engine._call(hitbox_b.on_exit, Manifold(hitbox_b, hitbox_a))
 
-            return Manifold(circle, polygon, pen, offs.rotate(polygon.gameobj.rotation).normalized())
-        elif dot_2 <= 0:
-            offs = center - v2
-            if offs.mag_sq > circle_rad * circle_rad:
-                return
+    @staticmethod
+    def raycast(hitbox: Hitbox, origin: Vector, direction: Vector, distance: float) -> Optional[RaycastHit]:
+        """
+        Casts a ray against a hitbox. Hitboxes that the ray starts inside of are not hit.
+        Note that this is only implemented for native rubato hitbox types (Rectangle, Polygon, Circle, EdgeChain).
 
-            return Manifold(circle, polygon, pen, offs.rotate(polygon.gameobj.rotation).normalized())
-        else:
-            norm = _Engine._get_normal(verts, face_normal)
-            if norm.dot(center - v1) > circle_rad:
-                return
+        Args:
+            hitbox: The hitbox to cast against.
+            origin: Where the ray starts.
+            direction: The direction of the ray. Must be normalized.
+            distance: How far the ray goes.
 
-            return Manifold(circle, polygon, pen, norm.rotate(polygon.gameobj.rotation))
+        Returns:
+            Where the ray first hits the hitbox, or None if it doesn't.
+        """
+        if isinstance(hitbox, Circle):
+            return _Engine._raycast_circle(hitbox, origin, direction, distance)
+        if isinstance(hitbox, Rectangle | Polygon):
+            return _Engine._raycast_polygon(hitbox, origin, direction, distance)
+        if isinstance(hitbox, EdgeChain):
+            return _Engine._raycast_chain(hitbox, origin, direction, distance)
+        raise TypeError("Engine.raycast() only supports Rectangle, Polygon, Circle, and EdgeChain objects.")
 
     @staticmethod
-    def _polygon_polygon_test(shape_a: Polygon | Rectangle, shape_b: Polygon | Rectangle) -> Optional[Manifold]:
-        """Checks for overlap between two polygons"""
-        a_verts = shape_a.offset_verts()
-        b_verts = shape_b.offset_verts()
-
-        pen_a, face_a = _Engine._axis_least_penetration(shape_a, shape_b, a_verts, b_verts)
-        if pen_a is None or face_a is None:
+    def _raycast_circle(circle: Circle, origin: Vector, direction: Vector, distance: float) -> Optional[RaycastHit]:
+        circle._geometry()
+        center = circle._true_center
+        r = circle._true_radius
+
+        mx, my = origin.x - center.x, origin.y - center.y
+        b = mx * direction.x + my * direction.y
+        c = mx * mx + my * my - r * r
+        if c <= 0 or b > 0:
             return
 
-        pen_b, face_b = _Engine._axis_least_penetration(shape_b, shape_a, b_verts, a_verts)
-        if pen_b is None or face_b is None:
+        disc = b * b - c
+        if disc < 0:
             return
 
-        if pen_b < pen_a:
-            man = Manifold(shape_a, shape_b, abs(pen_a))
-
-            v1 = a_verts[face_a].rotate(shape_a.gameobj.rotation) + shape_a.gameobj.pos
-            v2 = a_verts[(face_a + 1) % len(a_verts)].rotate(shape_a.gameobj.rotation) + shape_a.gameobj.pos
+        t = -b - math.sqrt(disc)
+        if t > distance:
+            return
 
-            side_plane_normal = (v2 - v1).normalized()
-            man.normal = side_plane_normal.perpendicular() * Math.sign(pen_a)
-        else:
-            man = Manifold(shape_a, shape_b, abs(pen_b))
+        point = origin + direction * t
+        return RaycastHit(circle, point, (point - center) / r, t)
 
-            v1 = b_verts[face_b].rotate(shape_b.gameobj.rotation) + shape_b.gameobj.pos
-            v2 = b_verts[(face_b + 1) % len(b_verts)].rotate(shape_b.gameobj.rotation) + shape_b.gameobj.pos
+    @staticmethod
+    def _raycast_polygon(
+        polygon: Polygon | Rectangle, origin: Vector, direction: Vector, distance: float
+    ) -> Optional[RaycastHit]:
+        verts, normals = _poly_world(polygon)
+        ox, oy, dx, dy = origin.x, origin.y, direction.x, direction.y
+
+        # clip the ray against the half plane behind every face
+        lower, upper = 0.0, distance
+        face = -1
+        for i in range(len(verts)):
+            n, v = normals[i], verts[i]
+            num = n.x * (v.x - ox) + n.y * (v.y - oy)
+            den = n.x * dx + n.y * dy
+
+            if den == 0:
+                if num < 0:
+                    return
+            elif den < 0 and num < lower * den:
+                lower = num / den
+                face = i
+            elif den > 0 and num < upper * den:
+                upper = num / den
+
+            if upper < lower:
+                return
 
-            side_plane_normal = (v2 - v1).normalized()
-            man.normal = side_plane_normal.perpendicular() * -Math.sign(pen_b)
+        # the ray starts inside
+        if face < 0:
+            return
 
-        return man
+        return RaycastHit(polygon, origin + direction * lower, normals[face].clone(), lower)
 
     @staticmethod
-    def _axis_least_penetration(
-        a: Polygon | Rectangle, b: Polygon | Rectangle, a_verts: list[Vector], b_verts: list[Vector]
-    ) -> tuple[float, int] | tuple[None, None]:
-        """Finds the axis of least penetration between two possibly colliding polygons."""
-        best_dist = -Math.INF
-        best_ind = 0
-
-        for i in range(len(a_verts)):
-            n = _Engine._get_normal(a_verts, i).rotate(a.gameobj.rotation).rotate(-b.gameobj.rotation)
-            s = _Engine._get_support(b_verts, -n)
-            v = (a_verts[i].rotate(a.gameobj.rotation) + a.gameobj.pos - b.gameobj.pos).rotate(-b.gameobj.rotation)
-            d = n.dot(s - v)
-
-            if d > best_dist:
-                best_dist = d
-                best_ind = i
-                if d >= 0:
-                    return None, None
-
-        return best_dist, best_ind
+    def _raycast_chain(chain: EdgeChain, origin: Vector, direction: Vector, distance: float) -> Optional[RaycastHit]:
+        chain._geometry()
+        points = chain._packed
+        ox, oy, dx, dy = origin.x, origin.y, direction.x, direction.y
+
+        # only the fronts of the edges are hit
+        hit, face = distance, -1
+        for i in range(len(points) // 2 - 3):
+            x1, y1, x2, y2 = points[2 * i + 2], points[2 * i + 3], points[2 * i + 4], points[2 * i + 5]
+            ex, ey = x2 - x1, y2 - y1
+            den = ey * dx - ex * dy
+            if den >= 0:
+                continue
+
+            t = (ey * (x1 - ox) - ex * (y1 - oy)) / den
+            if t < 0 or t > hit:
+                continue
+
+            along = (ox + dx * t - x1) * ex + (oy + dy * t - y1) * ey
+            if 0 <= along <= ex * ex + ey * ey:
+                hit, face = t, i
+
+        if face < 0:
+            return
 
-    @staticmethod
-    def _get_support(verts: list[Vector], direction: Vector) -> Vector | None:
-        """Gets the furthest support vertex in a given direction."""
-        best_proj = -Math.INF
-        best_vert = None
+        normal = Vector(points[2 * face + 5] - points[2 * face + 3], points[2 * face + 2] - points[2 * face + 4])
+        normal.magnitude = 1
+        return RaycastHit(chain, origin + direction * hit, normal, hit)
 
-        for v in verts:
-            projection = v.dot(direction)
+    @staticmethod
+    def time_of_impact(hitboxes: list[Hitbox], others: list[Hitbox], start: Vector, end: Vector) -> float:
+        """
+        Finds when the hitboxes of a game object moving in a straight line first touch any of the other hitboxes.
+        The motion is sampled at most half the size of the smallest hitbox apart, so nothing can be stepped over, and
+        the first touch is then found by bisection. Pairs already touching at the start are ignored.
 
-            if projection > best_proj:
-                best_vert = v
-                best_proj = projection
+        Args:
+            hitboxes: The hitboxes of the moving game object. Its position must be the end of the motion.
+            others: The hitboxes to sweep against.
+            start: The position of the game object at the start of the motion.
+            end: The position of the game object at the end of the motion.
 
-        return best_vert
+        Returns:
+            The fraction of the motion at which the first touch happens, or 1 if nothing is touched.
+        """
+        go = hitboxes[0].gameobj
+        d = end - start
+
+        extent = Math.INF
+        for hb in hitboxes:
+            x0, y0, x1, y1 = hb._bounds()
+            extent = min(extent, x1 - x0, y1 - y0)
+        step = extent / 2
+        samples = math.ceil(d.magnitude / step) if step > 0 else 1
+
+        go.pos = start.clone()
+        pairs = [(hb, other) for hb in hitboxes for other in others]
+        pairs = [pair for pair, col in zip(pairs, _Engine.overlap_all(pairs)) if col is None]
+
+        def touching(t: float) -> bool:
+            go.pos = start + d * t
+            return any(col is not None for col in _Engine.overlap_all(pairs))
+
+        hit = 1.0
+        prev = 0.0
+        for i in range(1, samples + 1):
+            t = i / samples
+            if touching(t):
+                lo, hi = prev, t
+                for _ in range(10):
+                    mid = (lo + hi) / 2
+                    if touching(mid):
+                        hi = mid
+                    else:
+                        lo = mid
+                hit = hi
+                break
+            prev = t
+
+        go.pos = end
+        return hit
 
     @staticmethod
-    def _get_normal(verts: list[Vector], index: int) -> Vector:
-        """Finds a vector perpendicular to a side"""
-        face = (verts[(index + 1) % len(verts)] - verts[index]).perpendicular()
-        face.magnitude = 1
-        return face
+    def update_sleep(bodies: list[RigidBody], contacts: list[tuple[Hitbox, Hitbox]]):
+        """
+        Puts islands of touching rigidbodies to sleep once every body in them has been resting long enough,
+        and wakes every body of an island that has an awake body that isn't resting.
+
+        Args:
+            bodies: The non-static rigidbodies to consider.
+            contacts: The pairs of hitboxes that are touching.
+        """
+        # union-find over the bodies, joined by every solid contact between two of them
+        body_of: dict = {rb.gameobj: rb for rb in bodies}
+        parent: dict[RigidBody, RigidBody] = {rb: rb for rb in bodies}
+
+        def find(rb: RigidBody) -> RigidBody:
+            while parent[rb] is not rb:
+                parent[rb] = parent[parent[rb]]
+                rb = parent[rb]
+            return rb
+
+        for hb_a, hb_b in contacts:
+            if hb_a.trigger or hb_b.trigger:
+                continue
+            rb_a, rb_b = body_of.get(hb_a.gameobj), body_of.get(hb_b.gameobj)
+            if rb_a is not None and rb_b is not None:
+                parent[find(rb_a)] = find(rb_b)
+
+        islands: dict[RigidBody, list[RigidBody]] = {}
+        for rb in bodies:
+            islands.setdefault(find(rb), []).append(rb)
+
+        for island in islands.values():
+            resting = True
+            for rb in island:
+                if not rb._asleep and (not rb.can_sleep or rb._rest_time < rb.sleep_time):
+                    resting = False
+                    break
+
+            for rb in island:
+                if resting:
+                    if not rb._asleep:
+                        rb.sleep()
+                elif rb._asleep:
+                    rb.wake()
 
 
 class Manifold:
@@ -335,6 +727,8 @@ class Manifold:
         shape_b: The second shape involved in the collision (the incident shape).
         penetration: The amount of penetration between the two shapes.
         normal: The normal of the collision.
+        feature: Identifies the face or vertex the collision is measured against, so the solver can recognize the
+            same contact in the next step. Defaults to None.
     """
 
     def __init__(
@@ -343,6 +737,7 @@ def __init__(
         shape_b: Hitbox,
         penetration: float = 0,
         normal: Vector = Vector(),
+        feature: Any = None,
     ):
         self.shape_a: Hitbox = shape_a
         """The reference shape."""
@@ -352,6 +747,10 @@ def __init__(
         """The amount by which the colliders are intersecting."""
         self.normal: Vector = normal
         """The direction that would most quickly separate the two colliders."""
+        self.feature: Any = feature
+        """Identifies the face or vertex the collision is measured against."""
+        self._jn: float = 0
+        self._jt: float = 0
 
     def __repr__(self) -> str:
         return (
@@ -366,4 +765,33 @@ def _flip(self) -> Manifold:
         Returns:
             The new manifold
         """
-        return Manifold(self.shape_b, self.shape_a, self.penetration, -self.normal)
+        return Manifold(self.shape_b, self.shape_a, self.penetration, -self.normal, self.feature)
+
+
+class RaycastHit:
+    """
+    A hit found by a raycast or a shape cast.
+
+    Args:
+        hitbox: The hitbox that was hit.
+        point: Where the ray hit the hitbox. For shape casts, the position of the cast hitbox's game object when it
+            first touches the hitbox.
+        normal: The normal of the surface that was hit.
+        distance: How far along the ray or cast the hit is.
+    """
+
+    def __init__(self, hitbox: Hitbox, point: Vector, normal: Vector, distance: float):
+        self.hitbox: Hitbox = hitbox
+        """The hitbox that was hit."""
+        self.point: Vector = point
+        """
+        Where the ray hit the hitbox. For shape casts, the position of the cast hitbox's game object when it first
+        touches the hitbox.
+        """
+        self.normal: Vector = normal
+        """The normal of the surface that was hit."""
+        self.distance: float = distance
+        """How far along the ray or cast the hit is."""
+
+    def __repr__(self) -> str:
+        return f"RaycastHit(hitbox={self.hitbox}, point={self.point}, normal={self.normal}, distance={self.distance})"
@@ -1,11 +1,24 @@
 """Primitive shapes integrated into the physics engine."""
 from __future__ import annotations
-from typing import Callable
+from typing import Callable, Iterator
+from array import array
+import math
+import cython
+
+if cython.compiled:
+    from cython.cimports.libc.math import rint  # type: ignore
+else:
+    rint = round
 
 from .. import Component
 from .... import Vector, Color, Game, Draw, Math, Camera, Input, Surface
 
 
+def _no_callback(manifold):  # pylint: disable=unused-argument
+    # the default collision callback. the engine doesn't call it, or build the manifold it would be passed.
+    pass
+
+
 class Hitbox(Component):
     """
     A hitbox superclass. Do not use this class to attach hitboxes to your game objects.
@@ -24,6 +37,10 @@ class Hitbox(Component):
         rot_offset: The rotation offset of the hitbox. Defaults to 0.
         z_index: The z-index of the hitbox. Defaults to 0.
         hidden: Whether the hitbox is hidden. Defaults to False.
+        category: The collision categories the hitbox belongs to, as a bitfield. Defaults to 1.
+        mask: The collision categories the hitbox collides with, as a bitfield. Defaults to -1 (every category).
+        enter_exit_only: Whether to only call on_enter and on_exit, and not on_collide every step, for collisions
+            with a trigger. Defaults to False.
     """
 
     def __init__(
@@ -40,19 +57,34 @@ def __init__(
         rot_offset: float = 0,
         z_index: int = 0,
         hidden: bool = False,
+        category: int = 1,
+        mask: int = -1,
+        enter_exit_only: bool = False,
     ):
         super().__init__(offset=offset, rot_offset=rot_offset, z_index=z_index, hidden=hidden)
         self.debug: bool = debug
         """Whether to draw a green outline around the hitbox or not."""
         self.trigger: bool = trigger
         """Whether this hitbox is just a trigger or not."""
+        self.category: int = category
+        """
+        The collision categories the hitbox belongs to, as a bitfield.
+        Two hitboxes are only tested for collision if each one's category shares a bit with the other's mask.
+        """
+        self.mask: int = mask
+        """The collision categories the hitbox collides with, as a bitfield."""
+        self.enter_exit_only: bool = enter_exit_only
+        """
+        Whether to only call on_enter and on_exit, and not on_collide every step, for collisions with a trigger.
+        Trigger pairs that don't call on_collide are only tested for whether they touch, which is cheaper.
+        """
         self.scale: Vector = Vector.create(scale)
         """The scale of the hitbox."""
-        self.on_collide: Callable = on_collide if on_collide else lambda manifold: None
+        self.on_collide: Callable = on_collide if on_collide else _no_callback
         """The on_collide function to call when a collision happens with this hitbox."""
-        self.on_enter: Callable = on_enter if on_enter else lambda manifold: None
+        self.on_enter: Callable = on_enter if on_enter else _no_callback
         """The on_enter function to call when collision begins with this hitbox."""
-        self.on_exit: Callable = on_exit if on_exit else lambda manifold: None
+        self.on_exit: Callable = on_exit if on_exit else _no_callback
         """The on_exit function to call when a collision ends with this hitbox."""
         self.singular: bool = False
         """Whether this hitbox is singular or not."""
@@ -71,11 +103,54 @@ def __init__(
         self._old_scale: Vector = self.scale
         self._old_color: Color | None = self.color.clone() if self.color is not None else None
 
+        # the transform the cached world geometry was computed with
+        self._geom_x: float = math.nan
+        self._geom_y: float = math.nan
+        self._geom_rot: float = math.nan
+        self._geom_off_x: float = math.nan
+        self._geom_off_y: float = math.nan
+        self._geom_scale_x: float = math.nan
+        self._geom_scale_y: float = math.nan
+        self._bb: tuple[float, float, float, float] = (0, 0, 0, 0)
+        # the world geometry packed into floats for the compiled overlap tests
+        self._packed: array = array("d")
+
     def regen(self):
         """
         Regenerates internal hitbox information.
         """
-        return
+        self._invalidate()
+
+    def _invalidate(self):
+        """Marks the cached world geometry as out of date."""
+        self._geom_x = math.nan
+
+    def _geometry(self):
+        """
+        Brings the cached world geometry up to date. It is only recomputed if the game object's position or rotation,
+        or the hitbox's offset or scale, changed since it was last computed.
+        """
+        go = self.gameobj
+        pos, off, scale = go.pos, self.offset, self.scale
+        if pos.x == self._geom_x and pos.y == self._geom_y and go.rotation == self._geom_rot and \
+            off.x == self._geom_off_x and off.y == self._geom_off_y and \
+            scale.x == self._geom_scale_x and scale.y == self._geom_scale_y:
+            return
+
+        self._geom_x, self._geom_y, self._geom_rot = pos.x, pos.y, go.rotation
+        self._geom_off_x, self._geom_off_y = off.x, off.y
+        self._geom_scale_x, self._geom_scale_y = scale.x, scale.y
+        self._transform()
+
+    def _transform(self):
+        """Recomputes the cached world geometry."""
+        tl, br = self.get_aabb()
+        self._bb = (tl.x, tl.y, br.x, br.y)
+
+    def _bounds(self) -> tuple[float, float, float, float]:
+        """The cached left, bottom, right and top of the axis-aligned bounding box of the hitbox."""
+        self._geometry()
+        return self._bb
 
     def contains_pt(self, pt: Vector | tuple[float, float]):  # pylint: disable=unused-argument
         """
@@ -89,6 +164,13 @@ def contains_pt(self, pt: Vector | tuple[float, float]):  # pylint: disable=unus
         """
         return False
 
+    def _save_state(self, data: array, refs: list):
+        refs.append(set(self.colliding))
+
+    def _load_state(self, data: Iterator[float], refs: Iterator):
+        self.colliding.clear()
+        self.colliding.update(next(refs))
+
     def redraw(self):
         """
         Regenerates the image of the hitbox.
@@ -109,10 +191,12 @@ def get_aabb(self) -> tuple[Vector, Vector]:
         return true_pos, true_pos
 
     def update(self):
-        if self.scale != self._old_scale:
+        scale, old_scale, offset, old_offset = self.scale, self._old_scale, self.offset, self._old_offset
+        if scale.x != old_scale.x or scale.y != old_scale.y:
             self.uptodate = False
 
-        if not self.uptodate or self.rot_offset != self._old_rot_offset or self.offset != self._old_offset:
+        if not self.uptodate or self.rot_offset != self._old_rot_offset or \
+            offset.x != old_offset.x or offset.y != old_offset.y:
             self.regen()
             self._old_rot_offset = self.rot_offset
             self._old_offset = self.offset.clone()
@@ -137,6 +221,97 @@ def draw(self, camera: Camera):
             Draw.queue_surface(self._debug_image, self.true_pos(), Math.INF, camera=camera)
 
 
+def _face_normals(verts: list[Vector]) -> list[Vector]:
+    """Finds the outward unit normal of every face of a polygon."""
+    normals = []
+    for i in range(len(verts)):
+        face = (verts[(i + 1) % len(verts)] - verts[i]).perpendicular()
+        face.magnitude = 1
+        normals.append(face)
+    return normals
+
+
+def _transform_poly(hb: Polygon | Rectangle):
+    """
+    Caches the packed world geometry and bounding box of a Polygon or Rectangle. The vertices and face normals are
+    rotated exactly like `Vector.rotate()` does, and only when the rotation changed, so a body that only moves is
+    just translated. The world vertices and face normals are only made into vectors when they are asked for.
+    """
+    go = hb.gameobj
+    if go.rotation != hb._rotated_by:
+        radians = math.radians(-go.rotation)
+        _rotate_poly(hb._offsets, hb._rotated, math.cos(radians), math.sin(radians))
+        hb._rotated_by = go.rotation
+
+    if len(hb._packed) != len(hb._rotated):
+        hb._packed = array("d", hb._rotated)
+    hb._bb = _translate_poly(hb._rotated, hb._packed, len(hb._offset_verts), go.pos.x, go.pos.y)
+    hb._true_verts = None
+
+
+def _pack_offsets(hb: Polygon | Rectangle):
+    """Packs the offset vertices and face normals of a Polygon or Rectangle, to be rotated by `_rotate_poly()`."""
+    hb._offsets = array("d", [c for v in hb._offset_verts + hb._offset_normals for c in (v.x, v.y)])
+    hb._rotated = array("d", hb._offsets)
+    hb._rotated_by = math.nan
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _rotate_poly(offsets: cython.double[:], rotated: cython.double[:], c: cython.double, s: cython.double):
+    """
+    Rotates packed vertices by the sine and cosine of an angle like `Vector.rotate()` does, rounding to 10 decimal
+    places and then to single precision like vectors store them.
+    """
+    i: cython.Py_ssize_t
+    x: cython.double
+    y: cython.double
+    for i in range(0, offsets.shape[0], 2):
+        x, y = offsets[i], offsets[i + 1]
+        rotated[i] = cython.cast(cython.float, rint((x * c - y * s) * 1e10) / 1e10)
+        rotated[i + 1] = cython.cast(cython.float, rint((x * s + y * c) * 1e10) / 1e10)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def _translate_poly(
+    rotated: cython.double[:], packed: cython.double[:], n: cython.int, px: cython.double, py: cython.double
+) -> tuple[float, float, float, float]:
+    """
+    Moves the rotated vertices of a polygon to its position, in single precision like vectors, and copies the
+    rotated face normals after them.
+
+    Returns:
+        The bounding box of the moved vertices.
+    """
+    i: cython.int
+    x: cython.double
+    y: cython.double
+    x0: cython.double = rotated[0] + px
+    y0: cython.double = rotated[1] + py
+    x1: cython.double = x0
+    y1: cython.double = y0
+    for i in range(n):
+        x = cython.cast(cython.float, rotated[2 * i] + px)
+        y = cython.cast(cython.float, rotated[2 * i + 1] + py)
+        packed[2 * i], packed[2 * i + 1] = x, y
+        x0, x1 = min(x0, x), max(x1, x)
+        y0, y1 = min(y0, y), max(y1, y)
+    for i in range(2 * n, 4 * n):
+        packed[i] = rotated[i]
+    return x0, y0, x1, y1
+
+
+def _poly_world(hb: Polygon | Rectangle) -> tuple[list[Vector], list[Vector]]:
+    """The world vertices and world face normals of a Polygon or Rectangle, made into vectors once per transform."""
+    hb._geometry()
+    if hb._true_verts is None:
+        packed, n = hb._packed, len(hb._offset_verts)
+        hb._true_verts = [Vector(packed[2 * i], packed[2 * i + 1]) for i in range(n)]
+        hb._true_normals = [Vector(packed[2 * (n + i)], packed[2 * (n + i) + 1]) for i in range(n)]
+    return hb._true_verts, hb._true_normals
+
+
 class Polygon(Hitbox):
     """
     A Polygonal Hitbox component.
@@ -163,6 +338,10 @@ class Polygon(Hitbox):
         rot_offset: The rotation offset of the hitbox. Defaults to 0.
         z_index: The z-index of the hitbox. Defaults to 0.
         hidden: Whether the hitbox is hidden. Defaults to False.
+        category: The collision categories the hitbox belongs to, as a bitfield. Defaults to 1.
+        mask: The collision categories the hitbox collides with, as a bitfield. Defaults to -1 (every category).
+        enter_exit_only: Whether to only call on_enter and on_exit, and not on_collide every step, for collisions
+            with a trigger. Defaults to False.
     """
 
     def __init__(
@@ -179,6 +358,9 @@ def __init__(
         rot_offset: float = 0,
         z_index: int = 0,
         hidden: bool = False,
+        category: int = 1,
+        mask: int = -1,
+        enter_exit_only: bool = False,
     ):
         super().__init__(
             offset=offset,
@@ -192,6 +374,9 @@ def __init__(
             tag=tag,
             z_index=z_index,
             hidden=hidden,
+            category=category,
+            mask=mask,
+            enter_exit_only=enter_exit_only,
         )
         self._verts: list[Vector] = [Vector.create(v) for v in verts]
 
@@ -219,20 +404,8 @@ def radius(self) -> float:
         return round(max_dist, 10)
 
     def get_aabb(self) -> tuple[Vector, Vector]:
-        verts = self.true_verts()
-        bottom, top, left, right = Math.INF, -Math.INF, Math.INF, -Math.INF
-
-        for vert in verts:
-            if vert.y > top:
-                top = vert.y
-            elif vert.y < bottom:
-                bottom = vert.y
-            if vert.x > right:
-                right = vert.x
-            elif vert.x < left:
-                left = vert.x
-
-        return Vector(left, bottom), Vector(right, top)
+        x0, y0, x1, y1 = self._bounds()
+        return Vector(x0, y0), Vector(x1, y1)
 
     def offset_verts(self) -> list[Vector]:
         """The list of polygon vertices offset by the Polygon's offsets."""
@@ -242,10 +415,16 @@ def true_verts(self) -> list[Vector]:
         """
         Returns a list of the Polygon's vertices in world coordinates. Accounts for gameobject position and rotation.
         """
-        return [v.rotate(self.gameobj.rotation) + self.gameobj.pos for v in self.offset_verts()]
+        return list(_poly_world(self)[0])
 
     def regen(self):
+        super().regen()
         self._offset_verts = [(vert * self.scale).rotate(self.rot_offset) + self.offset for vert in self.verts]
+        self._offset_normals = _face_normals(self._offset_verts)
+        _pack_offsets(self)
+
+    def _transform(self):
+        _transform_poly(self)
 
     def redraw(self):
         super().redraw()
@@ -261,7 +440,7 @@ def redraw(self):
         self._debug_image.draw_poly(self.verts, (0, 0), Color.debug, 2, blending=False)
 
     def contains_pt(self, pt: Vector | tuple[float, float]) -> bool:
-        return Input.pt_in_poly(pt, self.true_verts())
+        return Input.pt_in_poly(pt, _poly_world(self)[0])
 
     def clone(self) -> Polygon:
         """Clones the Polygon"""
@@ -271,6 +450,9 @@ def clone(self) -> Polygon:
             tag=self.tag,
             debug=self.debug,
             trigger=self.trigger,
+            category=self.category,
+            mask=self.mask,
+            enter_exit_only=self.enter_exit_only,
             scale=self.scale,
             on_collide=self.on_collide,
             on_exit=self.on_exit,
@@ -298,6 +480,10 @@ class Rectangle(Hitbox):
         rot_offset: The rotation offset of the hitbox. Defaults to 0.
         z_index: The z-index of the hitbox. Defaults to 0.
         hidden: Whether the hitbox is hidden. Defaults to False.
+        category: The collision categories the hitbox belongs to, as a bitfield. Defaults to 1.
+        mask: The collision categories the hitbox collides with, as a bitfield. Defaults to -1 (every category).
+        enter_exit_only: Whether to only call on_enter and on_exit, and not on_collide every step, for collisions
+            with a trigger. Defaults to False.
     """
 
     def __init__(
@@ -314,7 +500,10 @@ def __init__(
         offset: Vector | tuple[float, float] = (0, 0),
         rot_offset: float = 0,
         z_index: int = 0,
-        hidden: bool = False
+        hidden: bool = False,
+        category: int = 1,
+        mask: int = -1,
+        enter_exit_only: bool = False,
     ):
         super().__init__(
             offset=offset,
@@ -328,6 +517,9 @@ def __init__(
             tag=tag,
             z_index=z_index,
             hidden=hidden,
+            category=category,
+            mask=mask,
+            enter_exit_only=enter_exit_only,
         )
         if width < 0 or height < 0:
             raise ValueError("Width and height cannot be negative")
@@ -477,20 +669,8 @@ def right(self, new: float):
         self.gameobj.pos.x += new - self.get_aabb()[1].x
 
     def get_aabb(self) -> tuple[Vector, Vector]:
-        verts = self.true_verts()
-        bottom, top, left, right = Math.INF, -Math.INF, Math.INF, -Math.INF
-
-        for vert in verts:
-            if vert.y > top:
-                top = vert.y
-            elif vert.y < bottom:
-                bottom = vert.y
-            if vert.x > right:
-                right = vert.x
-            elif vert.x < left:
-                left = vert.x
-
-        return Vector(left, bottom), Vector(right, top)
+        x0, y0, x1, y1 = self._bounds()
+        return Vector(x0, y0), Vector(x1, y1)
 
     def offset_verts(self) -> list[Vector]:
         """The list of rectangle vertices offset by the Rectangles's offsets."""
@@ -500,13 +680,19 @@ def true_verts(self) -> list[Vector]:
         """
         Returns a list of the Rectangle's vertices in world coordinates. Accounts for gameobject position and rotation.
         """
-        return [v.rotate(self.gameobj.rotation) + self.gameobj.pos for v in self.offset_verts()]
+        return list(_poly_world(self)[0])
 
     def regen(self):
+        super().regen()
         w = self.width / 2
         h = self.height / 2
         self._verts = [Vector(-w, -h), Vector(w, -h), Vector(w, h), Vector(-w, h)]
         self._offset_verts = [(vert * self.scale).rotate(self.rot_offset) + self.offset for vert in self._verts]
+        self._offset_normals = _face_normals(self._offset_verts)
+        _pack_offsets(self)
+
+    def _transform(self):
+        _transform_poly(self)
 
     def redraw(self):
         self._debug_image.clear()
@@ -522,7 +708,7 @@ def redraw(self):
         self._debug_image.draw_rect((0, 0), (w, h), Color.debug, 2, blending=False)
 
     def contains_pt(self, pt: Vector | tuple[float, float]) -> bool:
-        return Input.pt_in_poly(pt, self.true_verts())
+        return Input.pt_in_poly(pt, _poly_world(self)[0])
 
     def clone(self) -> Rectangle:
         return Rectangle(
@@ -530,6 +716,9 @@ def clone(self) -> Rectangle:
             rot_offset=self.rot_offset,
             debug=self.debug,
             trigger=self.trigger,
+            category=self.category,
+            mask=self.mask,
+            enter_exit_only=self.enter_exit_only,
             scale=self.scale,
             on_collide=self.on_collide,
             on_exit=self.on_exit,
@@ -558,6 +747,10 @@ class Circle(Hitbox):
         rot_offset: The rotation offset of the hitbox. Defaults to 0.
         z_index: The z-index of the hitbox. Defaults to 0.
         hidden: Whether the hitbox is hidden. Defaults to False.
+        category: The collision categories the hitbox belongs to, as a bitfield. Defaults to 1.
+        mask: The collision categories the hitbox collides with, as a bitfield. Defaults to -1 (every category).
+        enter_exit_only: Whether to only call on_enter and on_exit, and not on_collide every step, for collisions
+            with a trigger. Defaults to False.
     """
 
     def __init__(
@@ -574,6 +767,9 @@ def __init__(
         rot_offset: float = 0,
         z_index: int = 0,
         hidden: bool = False,
+        category: int = 1,
+        mask: int = -1,
+        enter_exit_only: bool = False,
     ):
         super().__init__(
             offset=offset,
@@ -587,10 +783,15 @@ def __init__(
             tag=tag,
             z_index=z_index,
             hidden=hidden,
+            category=category,
+            mask=mask,
+            enter_exit_only=enter_exit_only,
         )
         if radius < 0:
             raise ValueError("Radius cannot be negative")
         self._radius = radius
+        self._true_center: Vector = Vector()
+        self._true_radius: float = 0
 
     @property
     def radius(self) -> int | float:
@@ -601,6 +802,7 @@ def radius(self) -> int | float:
     def radius(self, value: int | float):
         self._radius = value
         self.uptodate = False
+        self._invalidate()
 
     @property
     def center(self) -> Vector:
@@ -608,13 +810,30 @@ def center(self) -> Vector:
         return self.true_pos()
 
     def get_aabb(self) -> tuple[Vector, Vector]:
-        offset = self.true_radius()
-        true_pos = self.true_pos()
-        return true_pos - offset, true_pos + offset
+        x0, y0, x1, y1 = self._bounds()
+        return Vector(x0, y0), Vector(x1, y1)
 
     def true_radius(self) -> int | float:
         """Gets the true radius of the circle"""
-        return self.radius * self.scale.max()
+        self._geometry()
+        return self._true_radius
+
+    def _transform(self):
+        go, off, scale, c = self.gameobj, self.offset, self.scale, self._true_center
+        if off.x == 0 and off.y == 0:
+            c.x, c.y = go.pos.x, go.pos.y
+        else:
+            off.rotate(go.rotation, c)
+            c.x += go.pos.x
+            c.y += go.pos.y
+        x, y = c.x, c.y
+        self._true_radius = r = self._radius * max(scale.x, scale.y)
+        self._bb = (x - r, y - r, x + r, y + r)
+        packed = self._packed
+        if len(packed) == 3:
+            packed[0], packed[1], packed[2] = x, y, r
+        else:
+            self._packed = array("d", (x, y, r))
 
     def redraw(self):
         super().redraw()
@@ -631,8 +850,9 @@ def redraw(self):
         self._debug_image.draw_circle((0, 0), int_r, Color.debug, 2, blending=False)
 
     def contains_pt(self, pt: Vector | tuple[float, float]) -> bool:
-        r = self.true_radius()
-        return (pt - self.true_pos()).mag_sq <= r * r
+        self._geometry()
+        r = self._true_radius
+        return (pt - self._true_center).mag_sq <= r * r
 
     def clone(self) -> Circle:
         return Circle(
@@ -640,6 +860,9 @@ def clone(self) -> Circle:
             rot_offset=self.rot_offset,
             debug=self.debug,
             trigger=self.trigger,
+            category=self.category,
+            mask=self.mask,
+            enter_exit_only=self.enter_exit_only,
             scale=self.scale,
             on_collide=self.on_collide,
             on_exit=self.on_exit,
@@ -648,3 +871,245 @@ def clone(self) -> Circle:
             radius=self.radius,
             z_index=self.z_index,
         )
+
+
+class EdgeChain(Hitbox):
+    """
+    A Hitbox made of a chain of connected edges, for terrain. A whole floor or outline of a level can be one EdgeChain
+    instead of many Rectangles, which is cheaper to collide with and doesn't snag bodies on the seams between them.
+
+    The edges are one-sided: they only collide with shapes in front of them, which is the side the faces of a Polygon
+    point to when its vertices are given in the same direction. Shapes behind an edge pass through it.
+    Ghost vertices are the vertices before the first and after the last vertex of a chain that isn't a loop. They
+    aren't collided with, but tell the ends of the chain how the terrain continues, so a chain can be split up
+    without bodies catching on the splits.
+
+    Danger:
+        Edge chains don't collide with other edge chains, and have no area, so they don't contain any point.
+
+    Args:
+        verts: The vertices of the chain, in order. There must be at least 2. Defaults to [(0, 0), (0, 0)].
+        loop: Whether the last vertex connects back to the first. Defaults to False.
+        prev_vert: The ghost vertex before the first vertex, if the chain isn't a loop. Defaults to None.
+        next_vert: The ghost vertex after the last vertex, if the chain isn't a loop. Defaults to None.
+        color: The color of the hitbox. Set to None to not show the hitbox. Defaults to None.
+        tag: A string to tag the hitbox. Defaults to "".
+        debug: Whether to draw the hitbox. Defaults to False.
+        trigger: Whether the hitbox is a trigger. Defaults to False.
+        scale: The scale of the hitbox. Defaults to (1, 1).
+        on_collide: A function to call when the hitbox collides with another hitbox. Defaults to lambda manifold: None.
+        on_exit: A function to call when the hitbox exits another hitbox. Defaults to lambda manifold: None.
+        offset: The offset of the hitbox from the gameobject. Defaults to (0, 0).
+        rot_offset: The rotation offset of the hitbox. Defaults to 0.
+        z_index: The z-index of the hitbox. Defaults to 0.
+        hidden: Whether the hitbox is hidden. Defaults to False.
+        category: The collision categories the hitbox belongs to, as a bitfield. Defaults to 1.
+        mask: The collision categories the hitbox collides with, as a bitfield. Defaults to -1 (every category).
+        enter_exit_only: Whether to only call on_enter and on_exit, and not on_collide every step, for collisions
+            with a trigger. Defaults to False.
+    """
+
+    def __init__(
+        self,
+        verts: list[Vector] | list[tuple[float, float]] = [(0, 0), (0, 0)],
+        loop: bool = False,
+        prev_vert: Vector | tuple[float, float] | None = None,
+        next_vert: Vector | tuple[float, float] | None = None,
+        color: Color | None = None,
+        tag: str = "",
+        debug: bool = False,
+        trigger: bool = False,
+        scale: Vector | tuple[float, float] = (1, 1),
+        on_collide: Callable | None = None,
+        on_exit: Callable | None = None,
+        offset: Vector | tuple[float, float] = (0, 0),
+        rot_offset: float = 0,
+        z_index: int = 0,
+        hidden: bool = False,
+        category: int = 1,
+        mask: int = -1,
+        enter_exit_only: bool = False,
+    ):
+        super().__init__(
+            offset=offset,
+            rot_offset=rot_offset,
+            debug=debug,
+            trigger=trigger,
+            scale=scale,
+            on_collide=on_collide,
+            on_exit=on_exit,
+            color=color,
+            tag=tag,
+            z_index=z_index,
+            hidden=hidden,
+            category=category,
+            mask=mask,
+            enter_exit_only=enter_exit_only,
+        )
+        if len(verts) < 2:
+            raise ValueError("An EdgeChain needs at least 2 vertices")
+
+        self._verts: list[Vector] = [Vector.create(v) for v in verts]
+        self._loop: bool = loop
+        self._prev_vert: Vector | None = Vector.create(prev_vert) if prev_vert is not None else None
+        self._next_vert: Vector | None = Vector.create(next_vert) if next_vert is not None else None
+        self._true_verts: list[Vector] = []
+
+        self.regen()
+
+    @property
+    def verts(self) -> list[Vector]:
+        """A list of the vertices in the EdgeChain."""
+        return self._verts
+
+    @verts.setter
+    def verts(self, new: list[Vector]):
+        if len(new) < 2:
+            raise ValueError("An EdgeChain needs at least 2 vertices")
+        self._verts = new
+        self.uptodate = False
+
+    @property
+    def loop(self) -> bool:
+        """Whether the last vertex connects back to the first."""
+        return self._loop
+
+    @loop.setter
+    def loop(self, value: bool):
+        self._loop = value
+        self.uptodate = False
+
+    @property
+    def prev_vert(self) -> Vector | None:
+        """The ghost vertex before the first vertex, if the chain isn't a loop."""
+        return self._prev_vert
+
+    @prev_vert.setter
+    def prev_vert(self, value: Vector | None):
+        self._prev_vert = value
+        self.uptodate = False
+
+    @property
+    def next_vert(self) -> Vector | None:
+        """The ghost vertex after the last vertex, if the chain isn't a loop."""
+        return self._next_vert
+
+    @next_vert.setter
+    def next_vert(self, value: Vector | None):
+        self._next_vert = value
+        self.uptodate = False
+
+    @property
+    def radius(self) -> float:
+        """The radius of the EdgeChain. (get-only)"""
+        max_dist = 0
+        for vert in self._offset_verts:
+            max_dist = max(max_dist, vert.dist_to(self.offset))
+        return round(max_dist, 10)
+
+    def get_aabb(self) -> tuple[Vector, Vector]:
+        x0, y0, x1, y1 = self._bounds()
+        return Vector(x0, y0), Vector(x1, y1)
+
+    def offset_verts(self) -> list[Vector]:
+        """The list of chain vertices offset by the EdgeChain's offsets."""
+        return self._offset_verts
+
+    def true_verts(self) -> list[Vector]:
+        """
+        Returns a list of the EdgeChain's vertices in world coordinates. Accounts for gameobject position and rotation.
+        """
+        self._geometry()
+        return list(self._true_verts)
+
+    def regen(self):
+        super().regen()
+        self._offset_verts = [self._offset_vert(vert) for vert in self._verts]
+        # a loop is packed as an open chain that ends on its first vertex, with its neighbours as the ghosts
+        if self._loop:
+            self._offset_points = self._offset_verts + [self._offset_verts[0]]
+            self._offset_ghosts = (self._offset_verts[-1], self._offset_verts[1])
+        else:
+            self._offset_points = self._offset_verts
+            self._offset_ghosts = (
+                self._offset_vert(self._prev_vert) if self._prev_vert is not None else None,
+                self._offset_vert(self._next_vert) if self._next_vert is not None else None,
+            )
+
+    def _offset_vert(self, vert: Vector) -> Vector:
+        return (vert * self.scale).rotate(self.rot_offset) + self.offset
+
+    def _transform(self):
+        pos = self.gameobj.pos
+        radians = math.radians(-self.gameobj.rotation)
+        c, s = math.cos(radians), math.sin(radians)
+
+        def world(v: Vector) -> Vector:
+            w = Vector(round(v.x * c - v.y * s, 10), round(v.x * s + v.y * c, 10))
+            w.x += pos.x
+            w.y += pos.y
+            return w
+
+        prev_ghost, next_ghost = self._offset_ghosts
+        packed = array("d", (math.nan, math.nan))
+        if prev_ghost is not None:
+            g = world(prev_ghost)
+            packed[0], packed[1] = g.x, g.y
+
+        x0, y0, x1, y1 = Math.INF, Math.INF, -Math.INF, -Math.INF
+        for v in self._offset_points:
+            w = world(v)
+            packed.append(w.x)
+            packed.append(w.y)
+            x0, y0, x1, y1 = min(x0, w.x), min(y0, w.y), max(x1, w.x), max(y1, w.y)
+
+        if next_ghost is not None:
+            g = world(next_ghost)
+            packed.append(g.x)
+            packed.append(g.y)
+        else:
+            packed.append(math.nan)
+            packed.append(math.nan)
+
+        self._true_verts = [Vector(packed[2 * i + 2], packed[2 * i + 3]) for i in range(len(self._offset_verts))]
+        self._packed = packed
+        self._bb = (x0, y0, x1, y1)
+
+    def redraw(self):
+        super().redraw()
+
+        points = [v * self.scale for v in self.verts]
+        if self._loop:
+            points.append(points[0])
+        w = round(max(abs(v.x) for v in points)) * 2 + 1
+        h = round(max(abs(v.y) for v in points)) * 2 + 1
+        if w != self._image.width or h != self._image.height:
+            self._image = Surface(w, h)
+            self._debug_image = Surface(w, h)
+
+        for start, end in zip(points, points[1:]):
+            if self.color is not None:
+                self._image.draw_line(start, end, self.color, aa=True, thickness=2, blending=False)
+            self._debug_image.draw_line(start, end, Color.debug, thickness=2, blending=False)
+
+    def clone(self) -> EdgeChain:
+        """Clones the EdgeChain"""
+        return EdgeChain(
+            verts=[v.clone() for v in self.verts],
+            loop=self.loop,
+            prev_vert=self.prev_vert.clone() if self.prev_vert is not None else None,
+            next_vert=self.next_vert.clone() if self.next_vert is not None else None,
+            color=self.color.clone() if self.color is not None else None,
+            tag=self.tag,
+            debug=self.debug,
+            trigger=self.trigger,
+            category=self.category,
+            mask=self.mask,
+            enter_exit_only=self.enter_exit_only,
+            scale=self.scale,
+            on_collide=self.on_collide,
+            on_exit=self.on_exit,
+            offset=self.offset.clone(),
+            rot_offset=self.rot_offset,
+            z_index=self.z_index,
+        )
@@ -0,0 +1,853 @@
+"""
+Compiled overlap tests for batches of hitbox pairs.
+
+Hitboxes are packed into one buffer of floats: a circle is its world center and radius, a polygon is its world
+vertices followed by its world face normals, and an edge chain is its world vertices between its two ghost vertices.
+The tests then run over every pair without the GIL.
+
+Polygon pairs are tested with the separating axis theorem, which projects every vertex of each polygon onto every
+face normal of the other. When both polygons have more than `GJK_VERTICES` vertices that gets expensive, so GJK and
+EPA are used instead, which only look at the few vertices they climb to. A small polygon against a large one is still
+cheaper to test with the separating axis theorem.
+"""
+import cython
+
+if cython.compiled:
+    from cython.cimports.libc.math import sqrt, fabs, INFINITY  # type: ignore
+else:
+    from math import sqrt, fabs, inf as INFINITY
+
+GJK_VERTICES = 12
+"""Polygon pairs where both polygons have more vertices than this are tested with GJK and EPA."""
+
+_EPA_CAPACITY = cython.declare(cython.int, 256)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def overlap_pairs(
+    data: cython.double[:],
+    offsets: cython.int[:],
+    counts: cython.int[:],
+    pairs: cython.int[:],
+    results: cython.double[:],
+    features: cython.int[:],
+    gjk_vertices: cython.int = GJK_VERTICES,
+):
+    """
+    Tests every pair of packed hitboxes for overlap.
+
+    Args:
+        data: The packed world geometry of the hitboxes.
+        offsets: Where each hitbox starts in the data.
+        counts: The number of vertices of each hitbox, 0 for circles, or minus the number of vertices for edge
+            chains.
+        pairs: The indices of the two hitboxes of each pair, one after the other.
+        results: Filled with the penetration and the x and y of the normal of each pair that overlaps. The normal
+            points from the second hitbox toward the first.
+        features: Filled with the hitbox the feature of each pair is on (0 for the first, 1 for the second and -1 for
+            none), or -2 if the pair doesn't overlap, followed by the index of the face, or -1 - the index of the
+            vertex.
+        gjk_vertices: Polygon pairs where both polygons have more vertices than this are tested with GJK and EPA.
+            Defaults to `GJK_VERTICES`.
+    """
+    i: cython.Py_ssize_t
+    a: cython.int
+    b: cython.int
+    n: cython.Py_ssize_t = pairs.shape[0] // 2
+    if n == 0:
+        return
+
+    d: cython.p_double = cython.address(data[0])
+    res: cython.p_double = cython.address(results[0])
+    feat: cython.p_int = cython.address(features[0])
+
+    with cython.nogil:
+        for i in range(n):
+            a, b = pairs[2 * i], pairs[2 * i + 1]
+            _overlap(d + offsets[a], counts[a], d + offsets[b], counts[b], gjk_vertices, res + 3 * i, feat + 2 * i)
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def overlap_pair(
+    a: cython.double[:],
+    a_count: cython.int,
+    b: cython.double[:],
+    b_count: cython.int,
+    gjk_vertices: cython.int = GJK_VERTICES,
+):
+    """
+    Tests two packed hitboxes for overlap.
+
+    Args:
+        a: The packed world geometry of the first hitbox.
+        a_count: The number of vertices of the first hitbox, 0 for a circle, or minus it for an edge chain.
+        b: The packed world geometry of the second hitbox.
+        b_count: The number of vertices of the second hitbox, 0 for a circle, or minus it for an edge chain.
+        gjk_vertices: Polygon pairs where both polygons have more vertices than this are tested with GJK and EPA.
+            Defaults to `GJK_VERTICES`.
+
+    Returns:
+        None if they don't overlap. Otherwise, the hitbox the feature is on, the index of the feature, the
+        penetration and the x and y of the normal, like `overlap_pairs()` fills them in.
+    """
+    # cython declares these arrays without assigning them, which pylint can't see
+    # pylint: disable=used-before-assignment
+    res: cython.double[3]
+    feat: cython.int[2]
+    _overlap(cython.address(a[0]), a_count, cython.address(b[0]), b_count, gjk_vertices, res, feat)
+    if feat[0] == -2:
+        return None
+    return feat[0], feat[1], res[0], res[1], res[2]
+
+
+@cython.boundscheck(False)
+@cython.wraparound(False)
+def touching_pairs(
+    data: cython.double[:],
+    offsets: cython.int[:],
+    counts: cython.int[:],
+    pairs: cython.int[:],
+    touching: cython.int[:],
+    gjk_vertices: cython.int = GJK_VERTICES,
+):
+    """
+    Tests every pair of packed hitboxes for overlap, without measuring how much they overlap.
+
+    Args:
+        data: The packed world geometry of the hitboxes.
+        offsets: Where each hitbox starts in the data.
+        counts: The number of vertices of each hitbox, 0 for circles, or minus the number of vertices for edge
+            chains.
+        pairs: The indices of the two hitboxes of each pair, one after the other.
+        touching: Filled with 1 for each pair that overlaps and 0 for each pair that doesn't.
+        gjk_vertices: Polygon pairs where both polygons have more vertices than this are tested with GJK.
+            Defaults to `GJK_VERTICES`.
+    """
+    i: cython.Py_ssize_t
+    a: cython.int
+    b: cython.int
+    n: cython.Py_ssize_t = pairs.shape[0] // 2
+    if n == 0:
+        return
+
+    d: cython.p_double = cython.address(data[0])
+
+    with cython.nogil:
+        for i in range(n):
+            a, b = pairs[2 * i], pairs[2 * i + 1]
+            touching[i] = _touching(d + offsets[a], counts[a], d + offsets[b], counts[b], gjk_vertices)
+
+
+@cython.cfunc
+@cython.nogil
+@cython.exceptval(check=False)
+def _touching(
+    a: cython.p_double,
+    a_count: cython.int,
+    b: cython.p_double,
+    b_count: cython.int,
+    gjk_vertices: cython.int,
+) -> cython.bint:
+    """Tests two packed hitboxes for overlap. Large polygons stop after GJK, without EPA."""
+    # cython declares these arrays without assigning them, which pylint can't see
+    # pylint: disable=used-before-assignment
+    res: cython.double[3]
+    feat: cython.int[2]
+    pts: cython.double[512]
+    ids: cython.int[512]
+    n: cython.int
+
+    if a_count > gjk_vertices and b_count > gjk_vertices and a_count + b_count + 3 <= _EPA_CAPACITY:
+        n = _gjk(a, a_count, b, b_count, pts, ids)
+        if n >= 0:
+            return n == 3
+
+    _overlap(a, a_count, b, b_count, gjk_vertices, res, feat)
+    return feat[0] != -2
+
+
+@cython.cfunc
+@cython.nogil
+@cython.exceptval(check=False)
+def _overlap(
+    a: cython.p_double,
+    a_count: cython.int,
+    b: cython.p_double,
+    b_count: cython.int,
+    gjk_vertices: cython.int,
+    res: cython.p_double,
+    feat: cython.p_int,
+) -> cython.void:
+    """Tests two packed hitboxes for overlap with the test for their shapes."""
+    if a_count < 0:
+        # edge chains don't collide with each other
+        if b_count < 0:
+            feat[0] = -2
+        else:
+            _chain_shape(a, -a_count, b, b_count, 0, res, feat)
+            if feat[0] != -2:
+                res[1], res[2] = -res[1], -res[2]
+    elif b_count < 0:
+        _chain_shape(b, -b_count, a, a_count, 1, res, feat)
+    elif a_count == 0:
+        if b_count == 0:
+            _circle_circle(a, b, res, feat)
+        else:
+            _circle_polygon(a, b, b_count, 1, res, feat)
+    elif b_count == 0:
+        _circle_polygon(b, a, a_count, 0, res, feat)
+        if feat[0] != -2:
+            res[1], res[2] = -res[1], -res[2]
+    elif a_count > gjk_vertices and b_count > gjk_vertices and _gjk_epa(a, a_count, b, b_count, res, feat):
+        return
+    else:
+        _polygon_polygon(a, a_count, b, b_count, res, feat)
+
+
+@cython.cfunc
+@cython.nogil
+@cython.exceptval(check=False)
+def _circle_circle(a: cython.p_double, b: cython.p_double, res: cython.p_double, feat: cython.p_int) -> cython.void:
+    """Checks for overlap between two circles."""
+    t_rad: cython.double = a[2] + b[2]
+    dx: cython.double = a[0] - b[0]
+    dy: cython.double = a[1] - b[1]
+    dist: cython.double = dx * dx + dy * dy
+
+    if dist > t_rad * t_rad:
+        feat[0] = -2
+        return
+
+    dist = sqrt(dist)
+    feat[0], feat[1] = -1, 0
+    if dist == 0:
+        res[0], res[1], res[2] = a[2], 1, 0
+    else:
+        res[0], res[1], res[2] = t_rad - dist, dx / dist, dy / dist
+
+
+@cython.cfunc
+@cython.nogil
+@cython.exceptval(check=False)
+def _circle_polygon(
+    c: cython.p_double,
+    p: cython.p_double,
+    count: cython.int,
+    ref: cython.int,
+    res: cython.p_double,
+    feat: cython.p_int,
+) -> cython.void:
+    """
+    Checks for overlap between a circle and a polygon. The normal points from the polygon toward the circle, and the
+    polygon is recorded as the given side of the feature.
+    """
+    i: cython.int
+    cx: cython.double = c[0]
+    cy: cython.double = c[1]
+    rad: cython.double = c[2]
+    normals: cython.p_double = p + 2 * count
+    s: cython.double
+    separation: cython.double = -INFINITY
+    face: cython.int = 0
+
+    for i in range(count):
+        s = normals[2 * i] * (cx - p[2 * i]) + normals[2 * i + 1] * (cy - p[2 * i + 1])
+        if s > rad:
+            feat[0] = -2
+            return
+        if s > separation:
+            separation = s
+            face = i
+
+    feat[0], feat[1] = ref, face
+    res[1], res[2] = normals[2 * face], normals[2 * face + 1]
+    if separation <= 0:
+        res[0] = rad
+        return
+
+    res[0] = rad - separation
+    nxt: cython.int = (face + 1) % count
+    x1: cython.double = p[2 * face]
+    y1: cython.double = p[2 * face + 1]
+    x2: cython.double = p[2 * nxt]
+    y2: cython.double = p[2 * nxt + 1]
+    ex: cython.double = x2 - x1
+    ey: cython.double = y2 - y1
+    vertex: cython.int
+
+    if (cx - x1) * ex + (cy - y1) * ey <= 0:
+        vertex = face
+    elif (cx - x2) * ex + (cy - y2) * ey >= 0:
+        vertex, x1, y1 = nxt, x2, y2
+    else:
+        return
+
+    ox: cython.double = cx - x1
+    oy: cython.double = cy - y1
+    dist: cython.double = ox * ox + oy * oy
+    if dist > rad * rad:
+        feat[0] = -2
+        return
+
+    dist = sqrt(dist)
+    feat[1] = -1 - vertex
+    if dist == 0:
+        res[1], res[2] = 0, 0
+    else:
+        res[1], res[2] = ox / dist, oy / dist
+
+
+@cython.cfunc
+@cython.nogil
+@cython.exceptval(check=False)
+def _polygon_polygon(
+    a: cython.p_double,
+    a_count: cython.int,
+    b: cython.p_double,
+    b_count: cython.int,
+    res: cython.p_double,
+    feat: cython.p_int,
+) -> cython.void:
+    """Checks for overlap between two polygons."""
+    # cython declares these locals without assigning them, which pylint can't see
+    # pylint: disable=used-before-assignment
+    face_a: cython.int
+    face_b: cython.int
+    pen_a: cython.double = _axis_least_penetration(a, a_count, b, b_count, cython.address(face_a))
+    if face_a < 0:
+        feat[0] = -2
+        return
+
+    pen_b: cython.double = _axis_least_penetration(b, b_count, a, a_count, cython.address(face_b))
+    if face_b < 0:
+        feat[0] = -2
+        return
+
+    # both penetrations are negative, and the shallower one gives the collision normal
+    if pen_b < pen_a:
+        feat[0], feat[1] = 0, face_a
+        res[0], res[1], res[2] = -pen_a, -a[2 * a_count + 2 * face_a], -a[2 * a_count + 2 * face_a + 1]
+    else:
+        feat[0], feat[1] = 1, face_b
+        res[0], res[1], res[2] = -pen_b, b[2 * b_count + 2 * face_b], b[2 * b_count + 2 * face_b + 1]
+
+
+@cython.cfunc
+@cython.nogil
+@cython.exceptval(check=False)
+def _axis_least_penetration(
+    a: cython.p_double,
+    a_count: cython.int,
+    b: cython.p_double,
+    b_count: cython.int,
+    face: cython.p_int,
+) -> cython.double:
+    """
+    Finds the face of a with the least penetration into b. Sets the face to -1 if one of them separates the
+    polygons.
+    """
+    i: cython.int
+    j: cython.int
+    normals: cython.p_double = a + 2 * a_count
+    nx: cython.double
+    ny: cython.double
+    proj: cython.double
+    support: cython.double
+    dist: cython.double
+    best_dist: cython.double = -INFINITY
+    face[0] = 0
+
+    for i in range(a_count):
+        nx, ny = normals[2 * i], normals[2 * i + 1]
+
+        # the support point of b along -n is the vertex with the smallest projection onto n
+        support = INFINITY
+        for j in range(b_count):
+            proj = nx * b[2 * j] + ny * b[2 * j + 1]
+            support = min(support, proj)
+
+        dist = support - (nx * a[2 * i] + ny * a[2 * i + 1])
+        if dist > best_dist:
+            best_dist = dist
+            face[0] = i
+            if dist >= 0:
+                face[0] = -1
+                return dist
+
+    return best_dist
+
+
+@cython.cfunc
+@cython.nogil
+@cython.exceptval(check=False)
+def _chain_shape(
+    chain: cython.p_double,
+    chain_count: cython.int,
+    s: cython.p_double,
+    s_count: cython.int,
+    ref: cython.int,
+    res: cython.p_double,
+    feat: cython.p_int,
+) -> cython.void:
+    """
+    Checks for overlap between an edge chain and a circle or polygon. Only the edges whose bounding boxes overlap the
+    shape's are tested, and the one the shape penetrates deepest is kept. The normal points from the chain toward the
+    shape, and the chain is recorded as the given side of the feature.
+    """
+    i: cython.int
+    e: cython.p_double
+    x0: cython.double
+    y0: cython.double
+    x1: cython.double
+    y1: cython.double
+    cx: cython.double = 0
+    cy: cython.double = 0
+    # cython declares these arrays without assigning them, which pylint can't see
+    # pylint: disable=used-before-assignment
+    out: cython.double[3]
+    hit: cython.bint
+
+    if s_count == 0:
+        x0, y0, x1, y1 = s[0] - s[2], s[1] - s[2], s[0] + s[2], s[1] + s[2]
+    else:
+        x0, y0, x1, y1 = INFINITY, INFINITY, -INFINITY, -INFINITY
+        for i in range(s_count):
+            x0, x1 = min(x0, s[2 * i]), max(x1, s[2 * i])
+            y0, y1 = min(y0, s[2 * i + 1]), max(y1, s[2 * i + 1])
+            cx += s[2 * i]
+            cy += s[2 * i + 1]
+        cx /= s_count
+        cy /= s_count
+
+    feat[0] = -2
+    res[0] = -INFINITY
+    for i in range(chain_count - 1):
+        # the edge runs from the point after 2 * i to the one after it, between the points before and after those
+        e = chain + 2 * i
+        if max(e[2], e[4]) < x0 or min(e[2], e[4]) > x1 or max(e[3], e[5]) < y0 or min(e[3], e[5]) > y1:
+            continue
+
+        if s_count == 0:
+            hit = _edge_circle(e, s, out)
+        else:
+            hit = _edge_polygon(e, s, s_count, cx, cy, out)
+
+        if hit and out[0] > res[0]:
+            feat[0], feat[1] = ref, i
+            res[0], res[1], res[2] = out[0], out[1], out[2]
+
+
+@cython.cfunc
+@cython.nogil
+@cython.exceptval(check=False)
+def _edge_circle(e: cython.p_double, c: cython.p_double, out: cython.p_double) -> cython.bint:
+    """
+    Checks for overlap between a one-sided edge and a circle. Circles behind the edge, or in front of one of its
+    ends that is shared with the next edge over, are left to the other edge.
+    """
+    x1: cython.double = e[2]
+    y1: cython.double = e[3]
+    x2: cython.double = e[4]
+    y2: cython.double = e[5]
+    ex: cython.double = x2 - x1
+    ey: cython.double = y2 - y1
+    length: cython.double = sqrt(ex * ex + ey * ey)
+    if length == 0:
+        return False
+
+    nx: cython.double = ey / length
+    ny: cython.double = -ex / length
+    qx: cython.double = c[0]
+    qy: cython.double = c[1]
+    rad: cython.double = c[2]
+    offset: cython.double = nx * (qx - x1) + ny * (qy - y1)
+    if offset < 0 or offset > rad:
+        return False
+
+    px: cython.double
+    py: cython.double
+    if ex * (qx - x1) + ey * (qy - y1) <= 0:
+        # a missing ghost vertex is stored as nan, which never equals itself
+        if e[0] == e[0] and (x1 - e[0]) * (x1 - qx) + (y1 - e[1]) * (y1 - qy) > 0:
+            return False
+        px, py = x1, y1
+    elif ex * (x2 - qx) + ey * (y2 - qy) <= 0:
+        if e[6] == e[6] and (e[6] - x2) * (qx - x2) + (e[7] - y2) * (qy - y2) > 0:
+            return False
+        px, py = x2, y2
+    else:
+        out[0], out[1], out[2] = rad - offset, nx, ny
+        return True
+
+    dx: cython.double = qx - px
+    dy: cython.double = qy - py
+    dist: cython.double = dx * dx + dy * dy
+    if dist > rad * rad:
+        return False
+
+    dist = sqrt(dist)
+    if dist == 0:
+        out[0], out[1], out[2] = rad, nx, ny
+    else:
+        out[0], out[1], out[2] = rad - dist, dx / dist, dy / dist
+    return True
+
+
+@cython.cfunc
+@cython.nogil
+@cython.exceptval(check=False)
+def _edge_polygon(
+    e: cython.p_double,
+    p: cython.p_double,
+    count: cython.int,
+    cx: cython.double,
+    cy: cython.double,
+    out: cython.p_double,
+) -> cython.bint:
+    """
+    Checks for overlap between a one-sided edge and a polygon with the separating axis theorem. Polygons whose
+    centroid is behind the edge are ignored. The normal is then checked against the ghost vertices: at a corner that
+    bends away from the polygon, normals between the two edges' are kept and the rest are left to the other edge,
+    and at a flat or inward corner the normal snaps to the edge's, so bodies slide over the seams between edges.
+    """
+    i: cython.int
+    x1: cython.double = e[2]
+    y1: cython.double = e[3]
+    x2: cython.double = e[4]
+    y2: cython.double = e[5]
+    ex: cython.double = x2 - x1
+    ey: cython.double = y2 - y1
+    length: cython.double = sqrt(ex * ex + ey * ey)
+    if length == 0:
+        return False
+
+    ex, ey = ex / length, ey / length
+    nx: cython.double = ey
+    ny: cython.double = -ex
+    if nx * (cx - x1) + ny * (cy - y1) < 0:
+        return False
+
+    # the edge's normal
+    edge_sep: cython.double = INFINITY
+    for i in range(count):
+        edge_sep = min(edge_sep, nx * (p[2 * i] - x1) + ny * (p[2 * i + 1] - y1))
+    if edge_sep > 0:
+        return False
+
+    # the polygon's face normals
+    normals: cython.p_double = p + 2 * count
+    poly_sep: cython.double = -INFINITY
+    mx: cython.double
+    my: cython.double
+    sep: cython.double
+    px: cython.double = 0
+    py: cython.double = 0
+    for i in range(count):
+        mx, my = normals[2 * i], normals[2 * i + 1]
+        sep = min(mx * (x1 - p[2 * i]) + my * (y1 - p[2 * i + 1]), mx * (x2 - p[2 * i]) + my * (y2 - p[2 * i + 1]))
+        if sep > 0:
+            return False
+        if sep > poly_sep:
+            poly_sep, px, py = sep, -mx, -my
+
+    # the edge's normal is preferred unless a face's is clearly better, so the normal doesn't flicker between them
+    if poly_sep <= 0.98 * edge_sep + 0.001:
+        poly_sep, px, py = edge_sep, nx, ny
+
+    gx: cython.double
+    gy: cython.double
+    glen: cython.double
+    convex: cython.bint = True
+    if px * ex + py * ey <= 0:
+        # toward the first end, where the normals between the previous edge's and this one's belong to this edge
+        gx, gy = -ex, -ey
+        if e[0] == e[0]:
+            gx, gy = x1 - e[0], y1 - e[1]
+            glen = sqrt(gx * gx + gy * gy)
+            if glen > 0:
+                gx, gy = gx / glen, gy / glen
+                convex = gx * ey - gy * ex >= 0
+                gx, gy = gy, -gx
+            else:
+                gx, gy = -ex, -ey
+        if convex and px * gy - py * gx > 0.1:
+            return False
+    else:
+        gx, gy = ex, ey
+        if e[6] == e[6]:
+            gx, gy = e[6] - x2, e[7] - y2
+            glen = sqrt(gx * gx + gy * gy)
+            if glen > 0:
+                gx, gy = gx / glen, gy / glen
+                convex = ex * gy - ey * gx >= 0
+                gx, gy = gy, -gx
+            else:
+                gx, gy = ex, ey
+        if convex and gx * py - gy * px > 0.1:
+            return False
+
+    if not convex:
+        poly_sep, px, py = edge_sep, nx, ny
+
+    out[0], out[1], out[2] = -poly_sep, px, py
+    return True
+
+
+@cython.cfunc
+@cython.nogil
+@cython.exceptval(check=False)
+def _support(
+    p: cython.p_double,
+    count: cython.int,
+    dx: cython.double,
+    dy: cython.double,
+    start: cython.int,
+) -> cython.int:
+    """
+    Finds the vertex of a convex polygon furthest along a direction, by climbing from a starting vertex toward it.
+    The projections of the vertices only rise once and fall once around the polygon, so the climb can't get stuck.
+    """
+    i: cython.int = start
+    best: cython.double = p[2 * i] * dx + p[2 * i + 1] * dy
+    j: cython.int = (i + 1) % count
+    dot: cython.double = p[2 * j] * dx + p[2 * j + 1] * dy
+    steps: cython.int = 0
+
+    # equal projections are walked over too, so a start on the flat bottom of the polygon still reaches the top
+    if dot >= best:
+        while dot >= best and steps < count:
+            i, best = j, dot
+            j = (i + 1) % count
+            dot = p[2 * j] * dx + p[2 * j + 1] * dy
+            steps += 1
+        return i
+
+    j = (i + count - 1) % count
+    dot = p[2 * j] * dx + p[2 * j + 1] * dy
+    while dot >= best and steps < count:
+        i, best = j, dot
+        j = (i + count - 1) % count
+        dot = p[2 * j] * dx + p[2 * j + 1] * dy
+        steps += 1
+    return i
+
+
+@cython.cfunc
+@cython.nogil
+@cython.exceptval(check=False)
+def _gjk_epa(
+    a: cython.p_double,
+    a_count: cython.int,
+    b: cython.p_double,
+    b_count: cython.int,
+    res: cython.p_double,
+    feat: cython.p_int,
+) -> cython.bint:
+    """
+    Checks for overlap between two polygons with GJK, and finds their penetration with EPA.
+    Both work on the Minkowski difference a - b, whose points are stored with the indices of the vertices of a and b
+    they come from. The closest edge EPA finds is traced back to the face of a or b it comes from, and that face is
+    measured exactly, so the results are the same as the separating axis test's.
+
+    Returns:
+        Whether an answer was found. Degenerate cases are left to the separating axis test.
+    """
+    # cython declares these arrays without assigning them, which pylint can't see
+    # pylint: disable=used-before-assignment
+    pts: cython.double[512]
+    ids: cython.int[512]
+    edges: cython.double[768]
+    n: cython.int
+    i: cython.int
+    j: cython.int
+    k: cython.int
+    ia: cython.int
+    ib: cython.int
+    px: cython.double
+    py: cython.double
+    nx: cython.double
+    ny: cython.double
+    dist: cython.double
+    best: cython.double
+    edge: cython.int
+    face: cython.int
+    side: cython.int
+    count: cython.int
+
+    if a_count + b_count + 3 > _EPA_CAPACITY:
+        return False
+    n = _gjk(a, a_count, b, b_count, pts, ids)
+    if n < 0:
+        return False
+    if n == 0:
+        feat[0] = -2
+        return True
+
+    # push out the edge of the simplex closest to the origin until it is an edge of the difference
+    if (pts[2] - pts[0]) * (pts[5] - pts[1]) - (pts[3] - pts[1]) * (pts[4] - pts[0]) < 0:
+        pts[2], pts[3], pts[4], pts[5] = pts[4], pts[5], pts[2], pts[3]
+        ids[2], ids[3], ids[4], ids[5] = ids[4], ids[5], ids[2], ids[3]
+
+    # the distance to the origin and outward normal of every edge, updated as points are inserted
+    for i in range(3):
+        _epa_edge(pts, i, (i + 1) % 3, edges + 3 * i)
+
+    edge = 0
+    while True:
+        best = INFINITY
+        for i in range(n):
+            if edges[3 * i] < best:
+                best, edge = edges[3 * i], i
+
+        if best == INFINITY:
+            return False
+        nx, ny = edges[3 * edge + 1], edges[3 * edge + 2]
+        ia = _support(a, a_count, nx, ny, ids[2 * edge])
+        ib = _support(b, b_count, -nx, -ny, ids[2 * edge + 1])
+        px, py = a[2 * ia] - b[2 * ib], a[2 * ia + 1] - b[2 * ib + 1]
+        if px * nx + py * ny - best <= 1e-9 * (1 + fabs(best)) or n + 1 > a_count + b_count:
+            break
+
+        for k in range(n, edge + 1, -1):
+            pts[2 * k], pts[2 * k + 1], ids[2 * k], ids[2 * k + 1] = \
+                pts[2 * k - 2], pts[2 * k - 1], ids[2 * k - 2], ids[2 * k - 1]
+            edges[3 * k], edges[3 * k + 1], edges[3 * k + 2] = edges[3 * k - 3], edges[3 * k - 2], edges[3 * k - 1]
+        pts[2 * edge + 2], pts[2 * edge + 3], ids[2 * edge + 2], ids[2 * edge + 3] = px, py, ia, ib
+        n += 1
+        _epa_edge(pts, edge, edge + 1, edges + 3 * edge)
+        _epa_edge(pts, edge + 1, edge + 2 if edge + 2 < n else 0, edges + 3 * edge + 3)
+
+    # an edge of the difference is a face of a moved by a vertex of b, or a face of b moved by a vertex of a
+    i, j = edge, (edge + 1 if edge + 1 < n else 0)
+    if ids[2 * i + 1] == ids[2 * j + 1] and ids[2 * i] != ids[2 * j]:
+        side, ia, ib = 0, ids[2 * i], ids[2 * j]
+        count = a_count
+    elif ids[2 * i] == ids[2 * j] and ids[2 * i + 1] != ids[2 * j + 1]:
+        side, ia, ib = 1, ids[2 * i + 1], ids[2 * j + 1]
+        count = b_count
+    else:
+        return False
+
+    if ib == (ia + 1) % count:
+        face = ia
+    elif ia == (ib + 1) % count:
+        face = ib
+    else:
+        return False
+
+    # the penetration of the other polygon past the face, like the separating axis test measures it
+    if side == 0:
+        nx, ny = a[2 * a_count + 2 * face], a[2 * a_count + 2 * face + 1]
+        k = _support(b, b_count, -nx, -ny, ids[2 * i + 1])
+        dist = nx * (b[2 * k] - a[2 * face]) + ny * (b[2 * k + 1] - a[2 * face + 1])
+        nx, ny = -nx, -ny
+    else:
+        nx, ny = b[2 * b_count + 2 * face], b[2 * b_count + 2 * face + 1]
+        k = _support(a, a_count, -nx, -ny, ids[2 * i])
+        dist = nx * (a[2 * k] - b[2 * face]) + ny * (a[2 * k + 1] - b[2 * face + 1])
+
+    if dist >= 0:
+        feat[0] = -2
+    else:
+        feat[0], feat[1] = side, face
+        res[0], res[1], res[2] = -dist, nx, ny
+    return True
+
+
+@cython.cfunc
+@cython.nogil
+@cython.exceptval(check=False)
+def _epa_edge(pts: cython.p_double, i: cython.int, j: cython.int, out: cython.p_double) -> cython.void:
+    """Measures the distance to the origin and the outward normal of an edge of a counterclockwise polygon."""
+    ex: cython.double = pts[2 * j] - pts[2 * i]
+    ey: cython.double = pts[2 * j + 1] - pts[2 * i + 1]
+    length: cython.double = sqrt(ex * ex + ey * ey)
+    if length == 0:
+        out[0] = INFINITY
+    else:
+        out[0], out[1], out[2] = (ey * pts[2 * i] - ex * pts[2 * i + 1]) / length, ey / length, -ex / length
+
+
+@cython.cfunc
+@cython.nogil
+@cython.exceptval(check=False)
+def _gjk(
+    a: cython.p_double,
+    a_count: cython.int,
+    b: cython.p_double,
+    b_count: cython.int,
+    pts: cython.p_double,
+    ids: cython.p_int,
+) -> cython.int:
+    """
+    Checks for overlap between two polygons with GJK, on their Minkowski difference a - b.
+
+    Returns:
+        3 if they overlap, with the triangle of the difference that encloses the origin in the points and the
+        indices of the vertices of a and b its corners come from in the ids. 0 if they don't, and -1 if the simplex
+        degenerated.
+    """
+    n: cython.int = 0
+    ia: cython.int = 0
+    ib: cython.int = 0
+    px: cython.double
+    py: cython.double
+    abx: cython.double
+    aby: cython.double
+    acx: cython.double
+    acy: cython.double
+    ex: cython.double
+    ey: cython.double
+    nx: cython.double
+    ny: cython.double
+    cross: cython.double
+
+    # grow a simplex toward the origin until it encloses it, or a support point fails to pass it
+    dx: cython.double = b[0] - a[0]
+    dy: cython.double = b[1] - a[1]
+    if dx == 0 and dy == 0:
+        dx = 1
+    for _ in range(2 * (a_count + b_count)):
+        ia = _support(a, a_count, dx, dy, ia)
+        ib = _support(b, b_count, -dx, -dy, ib)
+        px, py = a[2 * ia] - b[2 * ib], a[2 * ia + 1] - b[2 * ib + 1]
+        if px * dx + py * dy <= 0:
+            return 0
+
+        pts[2 * n], pts[2 * n + 1], ids[2 * n], ids[2 * n + 1] = px, py, ia, ib
+        n += 1
+        if n == 1:
+            dx, dy = -px, -py
+        elif n == 2:
+            abx, aby = pts[0] - px, pts[1] - py
+            cross = abx * py - aby * px
+            if cross == 0:
+                return -1
+            # the perpendicular of the segment on the side of the origin
+            if cross < 0:
+                dx, dy = -aby, abx
+            else:
+                dx, dy = aby, -abx
+        else:
+            abx, aby = pts[2] - px, pts[3] - py
+            acx, acy = pts[0] - px, pts[1] - py
+            cross = abx * acy - aby * acx
+            if cross == 0:
+                return -1
+            # the perpendiculars of the two edges at the newest point, pointing out of the triangle
+            if cross > 0:
+                ex, ey, nx, ny = aby, -abx, -acy, acx
+            else:
+                ex, ey, nx, ny = -aby, abx, acy, -acx
+            if -(ex * px + ey * py) > 0:
+                pts[0], pts[1], ids[0], ids[1] = pts[2], pts[3], ids[2], ids[3]
+                pts[2], pts[3], ids[2], ids[3] = px, py, ia, ib
+                n, dx, dy = 2, ex, ey
+            elif -(nx * px + ny * py) > 0:
+                pts[2], pts[3], ids[2], ids[3] = px, py, ia, ib
+                n, dx, dy = 2, nx, ny
+            else:
+                return 3
+    return -1
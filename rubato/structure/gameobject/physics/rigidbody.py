@@ -2,6 +2,8 @@
 The Rigidbody component describes how the physics engine handles a game object.
 """
 from __future__ import annotations
+from typing import Iterator
+from array import array
 
 from .. import Component
 from .... import Vector, Time, Math
@@ -25,6 +27,13 @@ class RigidBody(Component):
         offset: The offset of the rigidbody from the gameobject. Defaults to (0, 0).
         rot_offset: The offset of the rigidbody's rotation from the gameobject. Defaults to 0.
         z_index: The z-index of the rigidbody. Defaults to 0.
+        can_sleep: Whether the rigidbody can fall asleep when it comes to rest. Defaults to True.
+        sleep_speed: The speed (and angular speed) under which the rigidbody counts as resting. Defaults to 10.
+        sleep_time: How long the rigidbody has to rest before falling asleep, in seconds. Defaults to 0.5.
+        continuous: Whether to sweep the rigidbody's hitboxes along its motion, so it can't tunnel through thin
+            hitboxes when moving fast. Defaults to False.
+        interpolate: Whether to draw the game object between where the last two physics steps left it, instead of
+            where the last one did. Defaults to False.
     """
 
     def __init__(
@@ -40,7 +49,12 @@ def __init__(
         pos_correction: float = 0.25,
         offset: Vector | tuple[float, float] = (0, 0),
         rot_offset: float = 0,
-        z_index: int = 0
+        z_index: int = 0,
+        can_sleep: bool = True,
+        sleep_speed: float = 10,
+        sleep_time: float = 0.5,
+        continuous: bool = False,
+        interpolate: bool = False,
     ):
         super().__init__(offset=offset, rot_offset=rot_offset, z_index=z_index)
 
@@ -57,11 +71,46 @@ def __init__(
         self.pos_correction: float = pos_correction
         """The positional correction of the rigidbody."""
 
-        self.velocity: Vector = Vector.create(velocity)
-        """The current velocity of the Rigidbody."""
+        self._velocity: Vector = Vector.create(velocity)
         self.ang_vel: float = ang_vel
         """The current angular velocity of the Rigidbody."""
 
+        self.can_sleep: bool = can_sleep
+        """
+        Whether the rigidbody can fall asleep. A group of touching rigidbodies falls asleep once all of them have
+        been resting for a while. Sleeping rigidbodies are not moved and are not tested for collision against each
+        other or static game objects, until they are touched by an awake rigidbody or woken up.
+        """
+        self.sleep_speed: float = sleep_speed
+        """The speed (and angular speed) under which the rigidbody counts as resting."""
+        self.sleep_time: float = sleep_time
+        """How long the rigidbody has to rest before falling asleep, in seconds."""
+        self._asleep: bool = False
+        self._rest_time: float = 0
+
+        self.continuous: bool = continuous
+        """
+        Whether to use continuous collision detection. The rigidbody is then moved back to where it first touches a
+        solid hitbox along its motion each step, instead of possibly passing through it. Rotation is not swept.
+        """
+        self._prev_pos: Vector = Vector()
+
+        self.interpolate: bool = interpolate
+        """
+        Whether to draw the game object between its positions and rotations of the last two physics steps, by
+        Time.physics_alpha, so its motion looks smooth when the physics fps is lower than the fps. Like this, it is
+        drawn up to one physics step behind.
+        """
+        self._prev_state: tuple[float, float, float] = (0, 0, 0)
+        self._state_step: int = -1
+
+        # the vectors that integration may write to in place, as they were created by it
+        self._own_pos: Vector | None = None
+        self._own_vel: Vector | None = None
+
+        # set by the group of the game object when it integrates its rigidbodies together instead
+        self._batched: bool = False
+
         self.singular: bool = True
 
         if mass == 0 or self.static:
@@ -73,6 +122,33 @@ def __init__(
         self.bounciness: float = bounciness
         """How bouncy the rigidbody is (usually a value between 0 and 1)."""
 
+    @property
+    def velocity(self) -> Vector:
+        """The current velocity of the Rigidbody. Setting to this wakes the rigidbody up."""
+        return self._velocity
+
+    @velocity.setter
+    def velocity(self, new: Vector):
+        self._velocity = new
+        self.wake()
+
+    @property
+    def asleep(self) -> bool:
+        """Whether the rigidbody is asleep. (get-only)"""
+        return self._asleep
+
+    def wake(self):
+        """Wakes the rigidbody up, restarting its rest timer. Does nothing if it is already awake."""
+        if self._asleep:
+            self._asleep = False
+            self._rest_time = 0
+
+    def sleep(self):
+        """Puts the rigidbody to sleep, stopping it. Does nothing if it can't sleep."""
+        if self.can_sleep and not self.static:
+            self._asleep = True
+            self.stop()
+
     @property
     def mass(self) -> float:
         """The mass of the Rigidbody."""
@@ -90,11 +166,36 @@ def mass(self, new: float):
 
     def _tick(self):
         """Applies general kinematic laws to the rigidbody."""
-        self.velocity += self.gravity * Time.fixed_delta
-        self.velocity.clamp(-self.max_speed, self.max_speed)  # pylint: disable=invalid-unary-operand-type
+        dt: float = Time.fixed_delta
+        pos, vel = self._own_vectors()
+        if self.continuous:
+            self._prev_pos.x, self._prev_pos.y = pos.x, pos.y
+
+        gravity, max_speed = self.gravity, self.max_speed
+        mx: float = max_speed.x
+        my: float = max_speed.y
+        vx: float = vel.x + gravity.x * dt
+        vy: float = vel.y + gravity.y * dt
+        vx = min(max(vx, -mx), mx)
+        vy = min(max(vy, -my), my)
+
+        vel.x, vel.y = vx, vy
+        pos.x, pos.y = pos.x + vx * dt, pos.y + vy * dt
+        ang_vel: float = self.ang_vel
+        if ang_vel != 0:
+            self.gameobj.rotation += ang_vel * dt
 
-        self.gameobj.pos += self.velocity * Time.fixed_delta
-        self.gameobj.rotation += self.ang_vel * Time.fixed_delta
+    def _own_vectors(self) -> tuple[Vector, Vector]:
+        """
+        The position of the game object and the velocity, which integration updates in place. Vectors that were given
+        from outside are copied once first, so vectors shared with other code aren't moved along with them.
+        """
+        go = self.gameobj
+        if go.pos is not self._own_pos:
+            go.pos = self._own_pos = go.pos.clone()
+        if self._velocity is not self._own_vel:
+            self._velocity = self._own_vel = self._velocity.clone()
+        return self._own_pos, self._own_vel  # type: ignore
 
     def add_force(self, force: Vector | tuple[float, float]):
         """
@@ -103,8 +204,9 @@ def add_force(self, force: Vector | tuple[float, float]):
         Args:
             force: The force to add.
         """
-        self.velocity.x += force[0] * self.inv_mass * Time.fixed_delta
-        self.velocity.y += force[1] * self.inv_mass * Time.fixed_delta
+        self.wake()
+        self._velocity.x += force[0] * self.inv_mass * Time.fixed_delta
+        self._velocity.y += force[1] * self.inv_mass * Time.fixed_delta
 
     def add_impulse(self, impulse: Vector | tuple[float, float]):
         """
@@ -113,8 +215,9 @@ def add_impulse(self, impulse: Vector | tuple[float, float]):
         Args:
             impulse: The impulse to add.
         """
-        self.velocity.x += impulse[0] * Time.fixed_delta
-        self.velocity.y += impulse[1] * Time.fixed_delta
+        self.wake()
+        self._velocity.x += impulse[0] * Time.fixed_delta
+        self._velocity.y += impulse[1] * Time.fixed_delta
 
     def add_cont_force(self, force: Vector | tuple[float, float], time: float):
         """
@@ -150,13 +253,48 @@ def add_cont_impulse(self, impulse: Vector | tuple[float, float], time: float):
 
     def fixed_update(self):
         """The physics loop for the rigidbody component."""
-        if not self.static:
-            self._tick()
+        if self.static:
+            return
+
+        if self.interpolate:
+            go = self.gameobj
+            self._prev_state = (go.pos.x, go.pos.y, go.rotation)
+            self._state_step = Time._physics_steps
+            go._interpolator = self
+
+        if self._asleep:
+            # a sleeping rigidbody is stopped, so any velocity means it was written to
+            if self._velocity.x == 0 and self._velocity.y == 0 and self.ang_vel == 0:
+                return
+            self.wake()
+
+        if self._batched:
+            return
+
+        vel = self._velocity
+        vx: float = vel.x
+        vy: float = vel.y
+        speed: float = self.sleep_speed
+        if vx * vx + vy * vy < speed * speed and abs(self.ang_vel) < speed:
+            self._rest_time += Time.fixed_delta
+        else:
+            self._rest_time = 0
+
+        self._tick()
+
+    def _save_state(self, data: array, refs: list):
+        data.extend((self._velocity.x, self._velocity.y, self.ang_vel, self._asleep, self._rest_time))
+
+    def _load_state(self, data: Iterator[float], refs: Iterator):
+        self._velocity.x, self._velocity.y = next(data), next(data)
+        self.ang_vel = next(data)
+        self._asleep = next(data) == 1
+        self._rest_time = next(data)
 
     def stop(self):
         """Stops the rigidbody by setting velocity and ang_vel to 0."""
-        self.velocity.x = 0
-        self.velocity.y = 0
+        self._velocity.x = 0
+        self._velocity.y = 0
         self.ang_vel = 0
 
     def clone(self) -> RigidBody:
@@ -172,5 +310,10 @@ def clone(self) -> RigidBody:
             pos_correction=self.pos_correction,
             offset=self.offset.clone(),
             rot_offset=self.rot_offset,
-            z_index=self.z_index
+            z_index=self.z_index,
+            can_sleep=self.can_sleep,
+            sleep_speed=self.sleep_speed,
+            sleep_time=self.sleep_time,
+            continuous=self.continuous,
+            interpolate=self.interpolate,
         )
@@ -0,0 +1,215 @@
+"""
+A spatial hash broadphase. It excels with swarms of similarly sized items, like bullets or asteroids.
+"""
+from __future__ import annotations
+from typing import Any
+import math
+
+from . import Broadphase
+from .broadphase import _segment_entry
+
+
+class _Proxy:
+    """The bounds of an item in the spatial hash, and the range of cells it covers."""
+
+    def __init__(self, item: Any, key: int, x0: float, y0: float, x1: float, y1: float):
+        self.item: Any = item
+        self.key: int = key
+        self.x0: float = x0
+        self.y0: float = y0
+        self.x1: float = x1
+        self.y1: float = y1
+        self.cx0: int = 0
+        self.cy0: int = 0
+        self.cx1: int = -1
+        self.cy1: int = -1
+        self.stamp: int = 0
+        self.category: int = -1
+        self.mask: int = -1
+
+    def overlaps(self, x0: float, y0: float, x1: float, y1: float) -> bool:
+        return not (self.x1 < x0 or self.y1 < y0 or self.x0 > x1 or self.y0 > y1)
+
+    def accepts(self, category: int, mask: int) -> bool:
+        return bool(self.category & mask and category & self.mask)
+
+
+class _Cell:
+    """A bucket of the proxies covering one cell of the grid."""
+
+    def __init__(self):
+        self.cx: int = 0
+        self.cy: int = 0
+        self.proxies: list[_Proxy] = []
+
+
+class SpatialHash(Broadphase):
+    """
+    Buckets the bounds of every item into the cells of a uniform grid.
+
+    Only the occupied cells are stored. Items are only moved between buckets when the range of cells they cover
+    changes, and emptied buckets are recycled, so a step allocates close to nothing.
+
+    Args:
+        cell_size: The side length of a cell. Works best at about twice the size of a typical item. Defaults to 64.
+    """
+
+    def __init__(self, cell_size: float = 64):
+        self.cell_size: float = cell_size
+        self._cells: dict[int, _Cell] = {}
+        self._pool: list[_Cell] = []
+        self._next_key: int = 0
+        self._stamp: int = 0
+
+    def insert(self, item: Any, x0: float, y0: float, x1: float, y1: float) -> _Proxy:
+        proxy = _Proxy(item, self._next_key, x0, y0, x1, y1)
+        self._next_key += 1
+        self.move(proxy, x0, y0, x1, y1)
+        return proxy
+
+    def remove(self, handle: _Proxy):
+        self._unplace(handle)
+
+    def move(self, handle: _Proxy, x0: float, y0: float, x1: float, y1: float) -> bool:
+        handle.x0, handle.y0, handle.x1, handle.y1 = x0, y0, x1, y1
+
+        size = self.cell_size
+        cx0, cy0 = math.floor(x0 / size), math.floor(y0 / size)
+        cx1, cy1 = math.floor(x1 / size), math.floor(y1 / size)
+        if cx0 == handle.cx0 and cy0 == handle.cy0 and cx1 == handle.cx1 and cy1 == handle.cy1:
+            return False
+
+        self._unplace(handle)
+        handle.cx0, handle.cy0, handle.cx1, handle.cy1 = cx0, cy0, cx1, cy1
+        self._place(handle)
+        return True
+
+    def filter(self, handle: _Proxy, category: int, mask: int):
+        handle.category, handle.mask = category, mask
+
+    def query(self, x0: float, y0: float, x1: float, y1: float, category: int = -1, mask: int = -1) -> list:
+        size = self.cell_size
+        cx0, cy0 = math.floor(x0 / size), math.floor(y0 / size)
+        cx1, cy1 = math.floor(x1 / size), math.floor(y1 / size)
+
+        # the stamp makes sure items spanning several cells are only reported once
+        self._stamp += 1
+        stamp = self._stamp
+        found = []
+
+        if (cx1 - cx0 + 1) * (cy1 - cy0 + 1) > len(self._cells):
+            cells = self._cells.values()
+        else:
+            cells = [
+                cell for cx in range(cx0, cx1 + 1) for cy in range(cy0, cy1 + 1)
+                if (cell := self._cells.get(self._hash(cx, cy))) is not None
+            ]
+
+        for cell in cells:
+            for proxy in cell.proxies:
+                if proxy.stamp != stamp:
+                    proxy.stamp = stamp
+                    if proxy.overlaps(x0, y0, x1, y1) and proxy.accepts(category, mask):
+                        found.append(proxy.item)
+
+        return found
+
+    def query_segment(self, x0: float, y0: float, x1: float, y1: float, category: int = -1, mask: int = -1) -> list:
+        size = self.cell_size
+        cx, cy = math.floor(x0 / size), math.floor(y0 / size)
+        ex, ey = math.floor(x1 / size), math.floor(y1 / size)
+
+        self._stamp += 1
+        stamp = self._stamp
+        found = []
+
+        def visit(cell: _Cell):
+            for proxy in cell.proxies:
+                if proxy.stamp != stamp:
+                    proxy.stamp = stamp
+                    if proxy.accepts(category, mask) and \
+                            _segment_entry(x0, y0, x1, y1, proxy.x0, proxy.y0, proxy.x1, proxy.y1) >= 0:
+                        found.append(proxy.item)
+
+        steps = abs(ex - cx) + abs(ey - cy) + 1
+        if steps > len(self._cells):
+            for cell in self._cells.values():
+                visit(cell)
+            return found
+
+        # walk the cells along the segment. next_x and next_y are the fractions of the segment at which it crosses
+        # the next vertical and horizontal cell border
+        dx, dy = x1 - x0, y1 - y0
+        step_x, step_y = (1 if dx > 0 else -1), (1 if dy > 0 else -1)
+        if dx != 0:
+            next_x, delta_x = ((cx + (dx > 0)) * size - x0) / dx, size / abs(dx)
+        else:
+            next_x = delta_x = math.inf
+        if dy != 0:
+            next_y, delta_y = ((cy + (dy > 0)) * size - y0) / dy, size / abs(dy)
+        else:
+            next_y = delta_y = math.inf
+
+        for _ in range(steps):
+            cell = self._cells.get(self._hash(cx, cy))
+            if cell is not None:
+                visit(cell)
+            if next_x < next_y:
+                cx += step_x
+                next_x += delta_x
+            else:
+                cy += step_y
+                next_y += delta_y
+
+        return found
+
+    def pairs(self) -> list[tuple[Any, Any]]:
+        found = []
+        for cell in self._cells.values():
+            proxies = cell.proxies
+            n = len(proxies)
+            for i in range(n - 1):
+                a = proxies[i]
+                for j in range(i + 1, n):
+                    b = proxies[j]
+
+                    # items sharing several cells are only reported from the first cell they share
+                    if (a.cx0 if a.cx0 > b.cx0 else b.cx0) != cell.cx:
+                        continue
+                    if (a.cy0 if a.cy0 > b.cy0 else b.cy0) != cell.cy:
+                        continue
+                    if not a.overlaps(b.x0, b.y0, b.x1, b.y1) or not a.accepts(b.category, b.mask):
+                        continue
+
+                    found.append((a.item, b.item) if a.key < b.key else (b.item, a.item))
+
+        return found
+
+    def clone(self) -> SpatialHash:
+        return SpatialHash(self.cell_size)
+
+    @staticmethod
+    def _hash(cx: int, cy: int) -> int:
+        """Packs the coordinates of a cell into a single integer, which is cheaper to hash than a tuple."""
+        return (cx << 32) + (cy & 0xFFFFFFFF)
+
+    def _place(self, proxy: _Proxy):
+        for cx in range(proxy.cx0, proxy.cx1 + 1):
+            for cy in range(proxy.cy0, proxy.cy1 + 1):
+                h = self._hash(cx, cy)
+                cell = self._cells.get(h)
+                if cell is None:
+                    cell = self._pool.pop() if self._pool else _Cell()
+                    cell.cx, cell.cy = cx, cy
+                    self._cells[h] = cell
+                cell.proxies.append(proxy)
+
+    def _unplace(self, proxy: _Proxy):
+        for cx in range(proxy.cx0, proxy.cx1 + 1):
+            for cy in range(proxy.cy0, proxy.cy1 + 1):
+                h = self._hash(cx, cy)
+                cell = self._cells[h]
+                cell.proxies.remove(proxy)
+                if not cell.proxies:
+                    del self._cells[h]
+                    self._pool.append(cell)
@@ -0,0 +1,166 @@
+"""
+A sweep and prune broadphase. It excels when items are spread out along an axis, like in a side-scroller.
+"""
+from __future__ import annotations
+from typing import Any
+from bisect import bisect_left, bisect_right
+
+from . import Broadphase
+
+
+class _Proxy:
+    """The bounds of an item in the sweep and prune broadphase."""
+
+    def __init__(self, item: Any, key: int, x0: float, y0: float, x1: float, y1: float):
+        self.item: Any = item
+        self.key: int = key
+        self.x0: float = x0
+        self.y0: float = y0
+        self.x1: float = x1
+        self.y1: float = y1
+        self.category: int = -1
+        self.mask: int = -1
+        self.endpoints: list[_Endpoint] = []
+
+    def overlaps(self, other: _Proxy) -> bool:
+        return not (self.x1 < other.x0 or self.y1 < other.y0 or self.x0 > other.x1 or self.y0 > other.y1)
+
+    def accepts(self, category: int, mask: int) -> bool:
+        return bool(self.category & mask and category & self.mask)
+
+
+class _Endpoint:
+    """One end of a proxy's bounds along an axis."""
+
+    def __init__(self, proxy: _Proxy, value: float, is_max: int):
+        self.proxy: _Proxy = proxy
+        self.value: float = value
+        self.is_max: int = is_max
+
+    def after(self, other: _Endpoint) -> bool:
+        """Whether this endpoint sorts after the other. Mins sort first on ties so that touching counts as overlap."""
+        return self.value > other.value or (self.value == other.value and self.is_max > other.is_max)
+
+
+class SweepAndPrune(Broadphase):
+    """
+    Keeps the bounds of every item as sorted lists of endpoints along both axes.
+
+    The lists are re-sorted with an insertion sort every step. Since items move little between steps, the lists are
+    almost sorted already and the sort runs in close to linear time. Every swap of a min and a max endpoint is exactly
+    where a pair of items starts or stops overlapping, so the overlapping pairs are kept up to date as a side effect.
+    Queries and removals bisect the sorted lists, so they only look at the endpoints near the box or the item.
+    """
+
+    def __init__(self):
+        self._axes: tuple[list[_Endpoint], list[_Endpoint]] = ([], [])
+        self._pairs: dict[_Proxy, set[_Proxy]] = {}
+        self._next_key: int = 0
+        self._dirty: bool = False
+        self._max_width: float = 0
+
+    def insert(self, item: Any, x0: float, y0: float, x1: float, y1: float) -> _Proxy:
+        proxy = _Proxy(item, self._next_key, x0, y0, x1, y1)
+        self._next_key += 1
+
+        # new endpoints start at the end of the lists (past everything, so overlapping nothing)
+        # and are sorted into place with everything else
+        proxy.endpoints = [
+            _Endpoint(proxy, x0, 0),
+            _Endpoint(proxy, x1, 1),
+            _Endpoint(proxy, y0, 0),
+            _Endpoint(proxy, y1, 1),
+        ]
+        self._axes[0].extend(proxy.endpoints[:2])
+        self._axes[1].extend(proxy.endpoints[2:])
+
+        self._pairs[proxy] = set()
+        self._max_width = max(self._max_width, x1 - x0)
+        self._dirty = True
+        return proxy
+
+    def remove(self, handle: _Proxy):
+        self._sort()
+        for other in self._pairs.pop(handle):
+            self._pairs[other].discard(handle)
+
+        for i, e in enumerate(handle.endpoints):
+            axis = self._axes[i // 2]
+            del axis[self._index(axis, e)]
+
+    def move(self, handle: _Proxy, x0: float, y0: float, x1: float, y1: float) -> bool:
+        if handle.x0 == x0 and handle.y0 == y0 and handle.x1 == x1 and handle.y1 == y1:
+            return False
+
+        handle.x0, handle.y0, handle.x1, handle.y1 = x0, y0, x1, y1
+        ends = handle.endpoints
+        ends[0].value, ends[1].value, ends[2].value, ends[3].value = x0, x1, y0, y1
+
+        self._max_width = max(self._max_width, x1 - x0)
+        self._dirty = True
+        return True
+
+    def filter(self, handle: _Proxy, category: int, mask: int):
+        handle.category, handle.mask = category, mask
+
+    def query(self, x0: float, y0: float, x1: float, y1: float, category: int = -1, mask: int = -1) -> list:
+        self._sort()
+
+        # only items that start before the right side of the box, and not further left of it than the widest item
+        # ever was, can overlap it
+        axis = self._axes[0]
+        start = bisect_left(axis, x0 - self._max_width, key=lambda e: e.value)
+        end = bisect_right(axis, x1, lo=start, key=lambda e: e.value)
+
+        found = []
+        for i in range(start, end):
+            e = axis[i]
+            if e.is_max:
+                continue
+            p = e.proxy
+            if p.x1 >= x0 and p.y0 <= y1 and p.y1 >= y0 and p.accepts(category, mask):
+                found.append(p.item)
+        return found
+
+    def pairs(self) -> list[tuple[Any, Any]]:
+        self._sort()
+        return [
+            (proxy.item, other.item) for proxy, others in self._pairs.items() for other in others
+            if proxy.key < other.key and proxy.accepts(other.category, other.mask)
+        ]
+
+    def clone(self) -> SweepAndPrune:
+        return SweepAndPrune()
+
+    @staticmethod
+    def _index(axis: list[_Endpoint], e: _Endpoint) -> int:
+        """Finds the index of an endpoint in a sorted axis."""
+        i = bisect_left(axis, (e.value, e.is_max), key=lambda o: (o.value, o.is_max))
+        while axis[i] is not e:
+            i += 1
+        return i
+
+    def _sort(self):
+        """Insertion sorts both axes, updating the overlapping pairs on every swap of a min and a max endpoint."""
+        if not self._dirty:
+            return
+        self._dirty = False
+
+        for axis in self._axes:
+            for i in range(1, len(axis)):
+                cur = axis[i]
+                j = i - 1
+                while j >= 0 and axis[j].after(cur):
+                    prev = axis[j]
+                    if prev.is_max != cur.is_max:
+                        if cur.is_max:
+                            # a max moved before a min: the two items separated on this axis
+                            self._pairs[cur.proxy].discard(prev.proxy)
+                            self._pairs[prev.proxy].discard(cur.proxy)
+                        elif cur.proxy.overlaps(prev.proxy):
+                            # a min moved before a max: the two items may have started overlapping
+                            self._pairs[cur.proxy].add(prev.proxy)
+                            self._pairs[prev.proxy].add(cur.proxy)
+                    axis[j + 1] = prev
+                    j -= 1
+                axis[j + 1] = cur
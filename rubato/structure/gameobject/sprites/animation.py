@@ -2,7 +2,8 @@
 This is the animation component module for game objects.
 """
 from __future__ import annotations
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Iterator
+from array import array
 from os import path as os_path, walk
 
 from .. import Component
@@ -244,6 +245,18 @@ def update(self):
 
             self._time_count -= self._time_step
 
+    def _save_state(self, data: array, refs: list):
+        refs.append(self.current_state)
+        data.extend((self._current_frame, self.animation_frames_left, self._time_count, self.loop, self._freeze))
+
+    def _load_state(self, data: Iterator[float], refs: Iterator):
+        self.current_state = next(refs)
+        self._current_frame = int(next(data))
+        self.animation_frames_left = int(next(data))
+        self._time_count = next(data)
+        self.loop = next(data) == 1
+        self._freeze = int(next(data))
+
     def draw(self, camera: Camera):
         """Draws the animation frame."""
         Draw.queue_surface(self.anim_frame(), self.true_pos(), self.true_z(), camera)
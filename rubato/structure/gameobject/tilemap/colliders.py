@@ -0,0 +1,102 @@
+"""Builds hitboxes for the solid tiles of a tilemap."""
+from __future__ import annotations
+
+
+def _outlines(solid: set[tuple[int, int]]) -> list[list[tuple[int, int]]]:
+    """
+    Traces the outlines of groups of solid tiles. Tiles are given by their column and row, with rows going up.
+
+    Every side of a solid tile that doesn't touch another solid tile is part of an outline. The sides are followed
+    around the solid with the empty side on their right, like the fronts of an EdgeChain, and straight runs of sides
+    are joined into one edge. Where two tiles only touch at a corner, the outline keeps to the tile it came from,
+    so every group of tiles gets its own outlines. Holes in a group get outlines of their own.
+
+    Args:
+        solid: The column and row of every solid tile.
+
+    Returns:
+        The corners of each outline, in order, where the corner at a column and row is the bottom left corner of that
+        tile.
+    """
+    sides: dict[tuple[int, int], list[tuple[int, int]]] = {}
+    for c, r in solid:
+        if (c, r + 1) not in solid:
+            sides.setdefault((c + 1, r + 1), []).append((c, r + 1))
+        if (c, r - 1) not in solid:
+            sides.setdefault((c, r), []).append((c + 1, r))
+        if (c - 1, r) not in solid:
+            sides.setdefault((c, r + 1), []).append((c, r))
+        if (c + 1, r) not in solid:
+            sides.setdefault((c + 1, r), []).append((c + 1, r + 1))
+
+    outlines: list[list[tuple[int, int]]] = []
+    while sides:
+        start = next(iter(sides))
+        corners = [start]
+        corner, dx, dy = start, 0, 0
+        while True:
+            ends = sides[corner]
+            end = ends[0]
+            if len(ends) > 1:
+                # turn left, toward the solid side, before going straight or turning right
+                for e in ends:
+                    if (e[0] - corner[0], e[1] - corner[1]) == (-dy, dx):
+                        end = e
+                        break
+            ends.remove(end)
+            if not ends:
+                del sides[corner]
+
+            ndx, ndy = end[0] - corner[0], end[1] - corner[1]
+            if (ndx, ndy) == (dx, dy):
+                corners[-1] = end
+            else:
+                corners.append(end)
+            corner, dx, dy = end, ndx, ndy
+            if corner == start:
+                break
+
+        # the outline ends where it started, so the start might be in the middle of a straight run
+        corners.pop()
+        if len(corners) > 2:
+            x0, y0 = corners[-1]
+            x1, y1 = corners[0]
+            x2, y2 = corners[1]
+            if (x1 - x0) * (y2 - y1) == (y1 - y0) * (x2 - x1):
+                corners.pop(0)
+        outlines.append(corners)
+
+    return outlines
+
+
+def _merge(solid: set[tuple[int, int]]) -> list[tuple[int, int, int, int]]:
+    """
+    Covers solid tiles with rectangles of tiles, greedily. Going through the tiles row by row, every tile that isn't
+    covered yet starts a rectangle, which is grown along its row as far as it can, and then grown a row at a time
+    for as long as every tile of the next row is solid and uncovered.
+
+    Args:
+        solid: The column and row of every solid tile.
+
+    Returns:
+        The column and row of the first tile of each rectangle, followed by its width and height in tiles.
+    """
+    left = set(solid)
+    rects: list[tuple[int, int, int, int]] = []
+    for c, r in sorted(solid, key=lambda tile: (tile[1], tile[0])):
+        if (c, r) not in left:
+            continue
+
+        w = 1
+        while (c + w, r) in left:
+            w += 1
+        h = 1
+        while all((c + i, r + h) in left for i in range(w)):
+            h += 1
+
+        for i in range(w):
+            for j in range(h):
+                left.remove((c + i, r + j))
+        rects.append((c, r, w, h))
+
+    return rects
@@ -3,8 +3,12 @@
 numbers to keep track of tile types.
 """
 from __future__ import annotations
-from .. import Component, Rectangle
-from .... import Vector, Surface, Draw
+from typing import Literal
+import math
+
+from .colliders import _outlines, _merge
+from .. import Component, Hitbox, Rectangle, EdgeChain, RigidBody
+from .... import Vector, Surface, Draw, Time, Math
 
 
 class SimpleTilemap(Component):
@@ -24,6 +28,14 @@ class SimpleTilemap(Component):
         rot_offset: The rotation offset of the tilemap.
         z_index: The z-index of the tilemap.
         hidden: Whether the tilemap is hidden.
+        colliders: How the solid tiles collide. "tiles" gives every solid tile its own Rectangle. "chains" outlines
+            each group of touching solid tiles with the same collider tag with one looped EdgeChain, which is much
+            cheaper for large maps and doesn't snag bodies on the seams between tiles. "merged" covers the solid tiles
+            with the same collider tag with as few Rectangles as it greedily can. "grid" adds no hitboxes at all:
+            the rigidbodies of the tilemap's group (and its child groups) are instead moved out of the solid tiles
+            directly, one axis at a time, straight from the tilemap array, so tiles changed with set_tile collide
+            right away. Grid collisions ignore the rotation of the tilemap, the collision filters and collider tags
+            of the hitboxes, and don't call any collision callbacks. Defaults to "tiles".
     """
 
     def __init__(
@@ -37,7 +49,8 @@ def __init__(
         offset: Vector | tuple[float, float] = (0, 0),
         rot_offset: float = 0,
         z_index: int = 0,
-        hidden: bool = False
+        hidden: bool = False,
+        colliders: Literal["tiles", "chains", "merged", "grid"] = "tiles",
     ):
         super().__init__(offset, rot_offset, z_index, hidden)
 
@@ -46,9 +59,12 @@ def __init__(
         self._tile_size = Vector.create(tile_size)
         self._collision = collision
         self._collider_tag = collider_tag
+        self._colliders: Literal["tiles", "chains", "merged", "grid"] = colliders
         self.scale = Vector.create(scale)
         """The scale of the tilemap."""
         self._result = Surface(1, 1, scale)
+        self._hitboxes: list[Hitbox] = []
+        self._edits: list[tuple[int, int]] = []
 
         self.uptodate = False
         """Whether the tilemap is up to date."""
@@ -57,20 +73,172 @@ def _regen(self):
         dims = max([len(row) for row in self._map]), len(self._map)
         self._result = Surface(int(dims[0] * self._tile_size.x), int(dims[1] * self._tile_size.y))
 
+        # the solid tiles of each collider tag, by column and row
+        solid: dict[str, set[tuple[int, int]]] = {}
+
         for i, row in enumerate(self._map):
             y = (i * self._tile_size.y) - self._result.height / 2 + self._tile_size.y / 2
             for j, tile in enumerate(row):
                 x = (j * self._tile_size.x) - self._result.width / 2 + self._tile_size.x / 2
                 self._result.blit(self._tiles[tile], dst=(int(x), int(y)))
                 if tile in self._collision:
-                    self.gameobj.add( # TODO: add to a child gameobject when that's a thing
+                    tag = self._collider_tag[tile] if tile < len(self._collider_tag) else ""
+                    solid.setdefault(tag, set()).add((j, i))
+
+        self._regen_colliders(solid)
+
+    def _regen_colliders(self, solid: dict[str, set[tuple[int, int]]]):
+        """Replaces the hitboxes of the solid tiles of each collider tag."""
+        # TODO: add to a child gameobject when that's a thing
+        if self._hitboxes:
+            self.gameobj.remove_by_ref(*self._hitboxes)
+        if self._colliders == "grid":
+            self._hitboxes = []
+            return
+
+        left, bottom = -self._result.width / 2, -self._result.height / 2
+        tw, th = self._tile_size.x, self._tile_size.y
+        sx, sy = self.scale.x, self.scale.y
+        hitboxes: list[Hitbox] = []
+        for tag, tiles in solid.items():
+            if self._colliders == "chains":
+                for outline in _outlines(tiles):
+                    hitboxes.append(
+                        EdgeChain(
+                            [((left + c * tw) * sx, (bottom + r * th) * sy) for c, r in outline],
+                            loop=True,
+                            tag=tag,
+                        )
+                    )
+            elif self._colliders == "merged":
+                for c, r, w, h in _merge(tiles):
+                    hitboxes.append(
+                        Rectangle(
+                            *(Vector(w * tw, h * th) * self.scale).tuple_int(),
+                            tag=tag,
+                            offset=((left + (c + w / 2) * tw) * sx, (bottom + (r + h / 2) * th) * sy),
+                        )
+                    )
+            else:
+                for c, r in tiles:
+                    hitboxes.append(
                         Rectangle(
                             *(self._tile_size * self.scale).tuple_int(),
-                            tag=self._collider_tag[tile] if tile < len(self._collider_tag) else "",
-                            offset=(x, y) * self.scale,
+                            tag=tag,
+                            offset=((left + (c + 0.5) * tw) * sx, (bottom + (r + 0.5) * th) * sy),
                         )
                     )
 
+        self._hitboxes = hitboxes
+        if hitboxes:
+            self.gameobj.add(*hitboxes)
+
+    def set_tile(self, x: int, y: int, tile: int):
+        """
+        Changes a tile of the tilemap. The tilemap and its hitboxes are regenerated in the next update, except with
+        "grid" colliders, where the new tile collides from the next physics step and wakes the rigidbodies next to it.
+
+        Args:
+            x: The column of the tile.
+            y: The row of the tile.
+            tile: The number of the new tile.
+        """
+        self._map[y][x] = tile
+        self.uptodate = False
+        if self._colliders == "grid":
+            self._edits.append((x, y))
+
+    def _grid(self) -> tuple[float, float, float, float]:
+        """The world position of the bottom left corner of the tilemap, and the world size of a tile."""
+        tw, th = self._tile_size.x * self.scale.x, self._tile_size.y * self.scale.y
+        pos = self.gameobj.pos
+        return (
+            pos.x - max(len(row) for row in self._map) * tw / 2,
+            pos.y - len(self._map) * th / 2,
+            tw,
+            th,
+        )
+
+    def _wake(self, bodies: list[RigidBody]):
+        """Wakes the sleeping rigidbodies touching a tile changed since the last physics step."""
+        if not self._edits:
+            return
+
+        ox, oy, tw, th = self._grid()
+        for rb in bodies:
+            if not rb.asleep:
+                continue
+            for hb in rb.gameobj.get_all(Hitbox):
+                x0, y0, x1, y1 = hb._bounds()
+                if any(
+                    x0 <= ox + (c + 1) * tw and ox + c * tw <= x1 and y0 <= oy + (r + 1) * th and oy + r * th <= y1
+                    for c, r in self._edits
+                ):
+                    rb.wake()
+                    break
+        self._edits = []
+
+    def _collide(self, rb: RigidBody, hts: list[Hitbox]):
+        """
+        Moves a rigidbody back out of the solid tiles its solid hitboxes moved into this step, first along x and then
+        along y, and stops, bounces or slows it along each axis it was stopped on.
+        Tiles its hitboxes already overlapped at the start of the step don't stop it, so it can leave them.
+        """
+        x0 = y0 = Math.INF
+        x1 = y1 = -Math.INF
+        for hb in hts:
+            bx0, by0, bx1, by1 = hb._bounds()
+            x0, y0, x1, y1 = min(x0, bx0), min(y0, by0), max(x1, bx1), max(y1, by1)
+
+        go, vel, dt = rb.gameobj, rb._velocity, Time.fixed_delta
+        if rb.continuous:
+            dx, dy = go.pos.x - rb._prev_pos.x, go.pos.y - rb._prev_pos.y
+        else:
+            dx, dy = vel.x * dt, vel.y * dt
+        if dx == 0 and dy == 0:
+            return
+
+        ox, oy, tw, th = self._grid()
+        tilemap, collision = self._map, set(self._collision)
+        eps = 1e-6
+
+        def solid(c: int, r: int) -> bool:
+            return 0 <= r < len(tilemap) and 0 <= c < len(tilemap[r]) and tilemap[r][c] in collision
+
+        def sweep(lo: float, hi: float, d: float, o: float, size: float, across, col: bool) -> float:
+            # how far back along d the range [lo, hi] has to move to stop at the first solid line it moved into
+            if d > 0:
+                lines = range(math.ceil((hi - d - o) / size - eps), math.ceil((hi - o) / size - eps))
+            else:
+                lines = range(math.floor((lo - d - o) / size + eps) - 1, math.floor((lo - o) / size + eps) - 1, -1)
+            for i in lines:
+                if any(solid(i, j) if col else solid(j, i) for j in across):
+                    return o + i * size - hi if d > 0 else o + (i + 1) * size - lo
+            return 0
+
+        def cells(lo: float, hi: float, o: float, size: float):
+            return range(math.floor((lo - o) / size + eps), math.ceil((hi - o) / size - eps))
+
+        shift_x = sweep(x0, x1, dx, ox, tw, cells(y0 - dy, y1 - dy, oy, th), True) if dx else 0
+        shift_y = sweep(y0, y1, dy, oy, th, cells(x0 + shift_x, x1 + shift_x, ox, tw), False) if dy else 0
+        if shift_x == 0 and shift_y == 0:
+            return
+
+        go.pos = Vector(go.pos.x + shift_x, go.pos.y + shift_y)
+
+        vx, vy = vel.x, vel.y
+        mu = rb.friction
+        if shift_x:
+            # slower hits than gravity adds in a step don't bounce, so bodies resting against tiles come to rest
+            new = -vx * rb.bounciness if abs(vx) > abs(rb.gravity.x) * dt * 2 else 0
+            vy = math.copysign(max(abs(vy) - mu * abs(new - vx), 0), vy)
+            vx = new
+        if shift_y:
+            new = -vy * rb.bounciness if abs(vy) > abs(rb.gravity.y) * dt * 2 else 0
+            vx = math.copysign(max(abs(vx) - mu * abs(new - vy), 0), vx)
+            vy = new
+        rb._velocity = Vector(vx, vy)
+
     def update(self):
         if not self.uptodate:
             self._regen()
@@ -93,6 +261,7 @@ def clone(self) -> SimpleTilemap:
             self.rot_offset,
             self.z_index,
             self.hidden,
+            self._colliders,
         )
         s._result = self._result.clone()
         return s
@@ -1,6 +1,8 @@
 """A Tiled tilemap."""
 from __future__ import annotations
-from .. import Component, Spritesheet, Rectangle, Polygon
+from typing import Literal
+from .colliders import _outlines, _merge
+from .. import Component, Spritesheet, Rectangle, Polygon, EdgeChain
 from .... import Vector, get_path, Surface, Color, Draw, Display
 import pytiled_parser as parse
 import pytiled_parser.tiled_object as parse_obj
@@ -10,8 +12,8 @@
 class Tilemap(Component):
     """
     A tilemap that is loaded from a Tiled map file. Once a tilemap component is created, it won't stay updated with the
-    map file. To automatically add hitboxes to the gameobject, use Tiled Objects. We support Rectangles and Polygons in
-    layers or on the individual tiles.
+    map file. To automatically add hitboxes to the gameobject, use Tiled Objects. We support Rectangles, Polygons and
+    Polylines (as EdgeChains) in layers or on the individual tiles.
 
     We do not support all of Tiled's features, but we do support the most common ones. Here is a list of major features
     that we DO NOT support:
@@ -33,6 +35,10 @@ class Tilemap(Component):
         collider_tag: The tag of the colliders.
         z_index: The z index of the tilemap.
         hidden: Whether the tilemap is hidden.
+        colliders: How Rectangle objects collide. "shapes" gives every one its own Rectangle. "chains" outlines each
+            group of touching Rectangles that line up with the tile grid with one looped EdgeChain, which is much
+            cheaper for large maps and doesn't snag bodies on the seams between them. "merged" covers the Rectangles
+            that line up with the tile grid with as few Rectangles as it greedily can. Defaults to "shapes".
     """
 
     def __init__(
@@ -41,7 +47,8 @@ def __init__(
         scale: Vector | tuple[float, float] = (1, 1),
         collider_tag: str = "",
         z_index: int = 0,
-        hidden: bool = False
+        hidden: bool = False,
+        colliders: Literal["shapes", "chains", "merged"] = "shapes",
     ):
         super().__init__((0, 0), 0, z_index, hidden)
         if map_path == "":
@@ -49,7 +56,10 @@ def __init__(
 
         self._scale = scale
         self._collider_tag = collider_tag
+        self._colliders: Literal["shapes", "chains", "merged"] = colliders
         self._rects = []
+        # the tiles covered by rectangle objects that line up with the grid, by column and row
+        self._solid: set[tuple[int, int]] = set()
         m = parse.parse_map(Path(get_path(map_path)))
 
         self._tileset = m.tilesets[1]
@@ -74,6 +84,9 @@ def __init__(
             elif isinstance(layer, parse.ObjectLayer):
                 self._process_objectlayer(layer)
 
+        if self._solid:
+            self._process_solid(m.map_size.height)
+
     def _process_layergroup(self, layer: parse.LayerGroup, extra_offset: tuple = (0, 0)):
         if not layer.visible or layer.opacity == 0 or layer.layers is None:
             return
@@ -166,16 +179,25 @@ def _process_objectlayer(self, layer: parse.ObjectLayer, extra_offset: tuple = (
                     extra_offset[0] + obj.coordinates.x + layer.offset.x + layer.coordinates.x,
                     extra_offset[1] + obj.coordinates.y + layer.offset.y + layer.coordinates.y,
                 )
-                p = Display._top_left_to_center(p, (obj.size.width, obj.size.height))
+                if self._colliders != "shapes" and self._mark_solid(p, (obj.size.width, obj.size.height)):
+                    continue
+                self._add_rect(p, (obj.size.width, obj.size.height))
+            elif isinstance(obj, parse_obj.Polyline):
+                p = (
+                    extra_offset[0] + obj.coordinates.x + layer.offset.x + layer.coordinates.x,
+                    extra_offset[1] + obj.coordinates.y + layer.offset.y + layer.coordinates.y,
+                )
                 p = self._out._convert_to_cartesian_space(p)
                 p = (p[0] * self._scale[0], p[1] * self._scale[1])
                 self._rects.append(
-                    Rectangle(
-                        round(obj.size.width * self._scale[0]),
-                        round(obj.size.height * self._scale[1]),
+                    EdgeChain(
+                        [(
+                            x * self._scale[0],
+                            -y * self._scale[1],
+                        ) for x, y in obj.points],
                         offset=p,
                         tag=self._collider_tag,
-                    )
+                    ),
                 )
             elif isinstance(obj, parse_obj.Polygon):
                 p = (
@@ -196,6 +218,55 @@ def _process_objectlayer(self, layer: parse.ObjectLayer, extra_offset: tuple = (
                     ),
                 )
 
+    def _mark_solid(self, top_left: tuple[float, float], size: tuple[float, float]) -> bool:
+        """
+        Marks the tiles covered by a rectangle as solid, if it lines up with the tile grid.
+
+        Returns:
+            Whether the rectangle lined up with the grid.
+        """
+        tw, th = self._tileset.tile_width, self._tileset.tile_height
+        x, y, w, h = top_left[0] / tw, top_left[1] / th, size[0] / tw, size[1] / th
+        if not (x.is_integer() and y.is_integer() and w.is_integer() and h.is_integer()) or w == 0 or h == 0:
+            return False
+
+        for c in range(int(x), int(x + w)):
+            for r in range(int(y), int(y + h)):
+                self._solid.add((c, r))
+        return True
+
+    def _add_rect(self, top_left: tuple[float, float], size: tuple[float, float]):
+        """Adds a Rectangle hitbox, given the top left corner and size of a rectangle in the map."""
+        p = Display._top_left_to_center(top_left, size)
+        p = self._out._convert_to_cartesian_space(p)
+        p = (p[0] * self._scale[0], p[1] * self._scale[1])
+        self._rects.append(
+            Rectangle(
+                round(size[0] * self._scale[0]),
+                round(size[1] * self._scale[1]),
+                offset=p,
+                tag=self._collider_tag,
+            )
+        )
+
+    def _process_solid(self, rows: int):
+        """
+        Covers the solid tiles with merged Rectangles, or outlines them with EdgeChains. Rows go down in Tiled, so they
+        are flipped before they are outlined.
+        """
+        tw, th = self._tileset.tile_width, self._tileset.tile_height
+        if self._colliders == "merged":
+            for c, r, w, h in _merge(self._solid):
+                self._add_rect((c * tw, r * th), (w * tw, h * th))
+            return
+
+        for outline in _outlines({(c, rows - 1 - r) for c, r in self._solid}):
+            verts = []
+            for c, r in outline:
+                x, y = self._out._convert_to_cartesian_space((c * tw, (rows - r) * th))
+                verts.append((x * self._scale[0], y * self._scale[1]))
+            self._rects.append(EdgeChain(verts, loop=True, tag=self._collider_tag))
+
     def setup(self):
         self.gameobj.add(*self._rects)
 
@@ -209,6 +280,7 @@ def clone(self) -> Tilemap:
         t._scale = self._scale
         t.z_index = self.z_index
         t._collider_tag = self._collider_tag
+        t._colliders = self._colliders
         t._rects = self._rects
         t.rot_offset = self.rot_offset
         t.hidden = self.hidden
@@ -2,10 +2,14 @@
 Groups contain game objects or other groups and allow separation between game objects.
 """
 from __future__ import annotations
+from typing import Any, Iterator
+from array import array
+import time
 
-from . import GameObject, Hitbox
-from .gameobject.physics.qtree import _QTree
-from .. import Error, Camera, Game
+from . import GameObject, Hitbox, RigidBody, Broadphase, AABBTree, SimpleTilemap, Tilemap
+from .gameobject.physics.engine import _Engine, Manifold, RaycastHit
+from .gameobject.physics.broadphase import _segment_entry
+from .. import Error, Camera, Game, Math, Vector, PhysicsStats
 
 
 class Group:
@@ -13,14 +17,35 @@ class Group:
     A divider between separate categories of game objects.
     Can be used to differentiate between different "groups" of elements that you don't want to interact;
     i.e. you don't want a gameobject representing an enemy to collide with the coins in the scene.
+    To filter collisions without splitting up the scene, use the ``category`` and ``mask`` of the hitboxes instead.
+
+    Game objects with a static RigidBody, and tilemaps without a RigidBody, are static: they are kept in a separate
+    broadphase that is only updated when they move or their hitboxes are added or removed, and they never collide
+    with each other. Game objects with hitboxes and no RigidBody still collide with everything.
+    Changes to the shape, offset, scale or collision filter of a static hitbox are picked up the next time its game
+    object moves. Sleeping rigidbodies are treated as static until they wake up.
 
     Args:
         name: The name of the group. Defaults to "" and is set to "Group #" when it is added to another Group or Scene.
         active: Whether the group is active or not. Defaults to True.
         hidden: Whether the group is hidden or not. Defaults to False.
+        broadphase: The broadphase used to find potential collisions between the hitboxes of the group's game
+            objects. Static game objects are kept in a clone of it. Defaults to a new AABBTree.
+        velocity_iterations: How many times the contact solver goes over the collisions found in the group each
+            physics step. Defaults to 8.
+        batch_integration: Whether to integrate the rigidbodies of the group's game objects together, after the
+            fixed updates of all of them. Defaults to False.
     """
 
-    def __init__(self, name: str = "", active: bool = True, hidden: bool = False):
+    def __init__(
+        self,
+        name: str = "",
+        active: bool = True,
+        hidden: bool = False,
+        broadphase: Broadphase | None = None,
+        velocity_iterations: int = 8,
+        batch_integration: bool = False,
+    ):
         self.name: str = name
         """The name of the group."""
         self.active: bool = active
@@ -31,7 +56,42 @@ def __init__(self, name: str = "", active: bool = True, hidden: bool = False):
         """A list of game objects that are children of this group."""
         self.hidden: bool = hidden
         """Whether to hide (not draw) this group's contents."""
+        self.velocity_iterations: int = velocity_iterations
+        """
+        How many times the contact solver goes over the collisions found in the group each physics step.
+        More iterations make stacks of rigidbodies steadier.
+        """
+        self.batch_integration: bool = batch_integration
+        """
+        Whether to integrate the rigidbodies of the group's game objects together, after the fixed updates of all of
+        them, instead of each in its own fixed update. This is much faster for many rigidbodies.
+        """
         self._add_queue: list[GameObject | Group] = []
+        self._broadphase: Broadphase = broadphase if broadphase is not None else AABBTree()
+        self._proxies: dict[Hitbox, Any] = {}
+        self._static: Broadphase = self._broadphase.clone()
+        self._static_proxies: dict[Hitbox, Any] = {}
+        self._static_keys: dict[GameObject, tuple] = {}
+        self._contacts: set[tuple[Hitbox, Hitbox]] = set()
+        self._moved: set[Hitbox] = set()
+        self._bodies: list[RigidBody] = []
+        self._manifolds: dict[tuple[Hitbox, Hitbox], Manifold] = {}
+
+    @property
+    def broadphase(self) -> Broadphase:
+        """
+        The broadphase used to find potential collisions between the hitboxes of the group's game objects.
+        Setting to this value will rebuild the broadphase on the next physics step.
+        """
+        return self._broadphase
+
+    @broadphase.setter
+    def broadphase(self, new: Broadphase):
+        self._broadphase = new
+        self._proxies = {}
+        self._static = new.clone()
+        self._static_proxies = {}
+        self._static_keys = {}
 
     def add(self, *items: GameObject | Group):
         """
@@ -127,22 +187,352 @@ def _fixed_update(self):
         if not self.active:
             return
 
+        self._moved = set()
         for group in self.groups:
             group._fixed_update()
-
-        all_hts = []
+            self._moved |= group._moved
+
+        all_hts: dict[GameObject, list[Hitbox]] = {}
+        self._bodies = []
+        batch: list[RigidBody] = []
+        grids: list[SimpleTilemap] = []
+        # game objects with hitboxes that are never static, having neither a rigidbody nor tiles
+        loose: list[GameObject] = []
         for game_obj in self.game_objects:
+            rb = game_obj.get(RigidBody) if RigidBody in game_obj else None
+            if rb is not None:
+                rb._batched = self.batch_integration
             game_obj._fixed_update()
+            if rb is not None and not rb.static:
+                self._bodies.append(rb)
+                if rb._batched and game_obj.active and not rb.asleep:
+                    batch.append(rb)
+            if game_obj.active and SimpleTilemap in game_obj:
+                grids.extend(tilemap for tilemap in game_obj.get_all(SimpleTilemap) if tilemap._colliders == "grid")
             hts = game_obj.get_all(Hitbox)
             if hts:
-                all_hts.append(hts)
-
-        qtree = _QTree(all_hts)
-
+                all_hts[game_obj] = hts
+                if rb is None and not (SimpleTilemap in game_obj or Tilemap in game_obj):
+                    loose.append(game_obj)
+        if batch:
+            _Engine.integrate(batch)
+        if grids:
+            self._collide_grids(grids)
+
+        # the phases are timed while the physics step is being recorded
+        step = PhysicsStats._step
+        start = time.perf_counter() if step is not None else 0
+
+        awake = {rb.gameobj for rb in self._bodies if not rb.asleep and rb.gameobj in all_hts}
+        awake.update(loose)
+        dynamic = self._update_broadphase(all_hts, awake)
+
+        swept: set[RigidBody] = set()
+        for rb in self._bodies:
+            if rb.continuous and not rb.asleep and rb.gameobj in all_hts and self._sweep(rb, all_hts[rb.gameobj]):
+                swept.add(rb)
+
+        # every unordered pair of hitboxes is tested at most once per step, in the group whose direct
+        # children include one of them. hitboxes of the same game object are never paired, and neither are the
+        # hitboxes of two static game objects.
+        candidates: list[tuple[Hitbox, Hitbox]] = []
+
+        # the bounding boxes of the dynamic hitboxes were just brought up to date, with their proxies
+        for hb, other in self._broadphase.pairs():
+            if hb.gameobj is not other.gameobj:
+                self._narrowphase(hb, hb._bb, other, other._bb, candidates)
+
+        if self._static_proxies:
+            for hb in dynamic:
+                for other in self._static.query(*hb._bb, hb.category, hb.mask):
+                    self._narrowphase(hb, hb._bb, other, other._bounds(), candidates)
+
+        present = set(all_hts)
         for go in self.all_gameobjects():
             hts = go.get_all(Hitbox)
+            if not hts:
+                continue
+
+            present.add(go)
+            static = self._is_static(go)
+            if not static and RigidBody in go and (rb := go.get(RigidBody)).continuous and self._sweep(rb, hts):
+                swept.add(rb)
+            for hb in hts:
+                bounds = hb._bounds()
+                for other in self._broadphase.query(*bounds, hb.category, hb.mask):
+                    self._narrowphase(hb, bounds, other, other._bounds(), candidates)
+                if not static:
+                    for other in self._static.query(*bounds, hb.category, hb.mask):
+                        self._narrowphase(hb, bounds, other, other._bounds(), candidates)
+
+        if step is not None:
+            end = time.perf_counter()
+            step.broadphase += end - start
+            step.pairs += len(candidates)
+            start = end
+
+        # the candidates are all tested at once, and only the pairs that touch go on to the solver and callbacks
+        contacts: set[tuple[Hitbox, Hitbox]] = set()
+        manifolds: list[Manifold] = []
+        for (hb, other), touching in zip(candidates, _Engine.collide_all(candidates, manifolds)):
+            if touching:
+                contacts.add((hb, other) if id(hb) < id(other) else (other, hb))
+
+        if step is not None:
+            end = time.perf_counter()
+            step.narrowphase += end - start
+            step.contacts += len(contacts)
+            start = end
+
+        self._solve(manifolds, swept)
+
+        if step is not None:
+            end = time.perf_counter()
+            step.solve += end - start
+            step.resolved += len(manifolds)
+            start = end
+
+        # pairs that touched last step but were culled this step have either separated, or are both at rest
+        for key in self._contacts - contacts:
+            hb, other = key
+            go_a, go_b = hb.gameobj, other.gameobj
+            if go_a in present and go_b in present and self._is_static(go_a) and self._is_static(go_b):
+                contacts.add(key)
+                if hb in self._moved or other in self._moved:
+                    self._wake(go_a)
+                    self._wake(go_b)
+            else:
+                self._wake(go_a)
+                self._wake(go_b)
+                _Engine.separate(hb, other)
+        self._contacts = contacts
+
+        if step is not None:
+            step.narrowphase += time.perf_counter() - start
+
+    def _solve(self, manifolds: list[Manifold], swept: set[RigidBody]):
+        """
+        Resolves this step's collisions together, warm starting every contact that was also found last step against
+        the same face or vertex with the impulses it ended with.
+        """
+        cache: dict[tuple[Hitbox, Hitbox], Manifold] = {}
+        for col in manifolds:
+            hb, other = col.shape_a, col.shape_b
+            key = (hb, other) if id(hb) < id(other) else (other, hb)
+            old = self._manifolds.get(key)
+            if old is not None and old.feature == col.feature:
+                col._jn, col._jt = old._jn, old._jt
+            cache[key] = col
+
+        _Engine.solve(manifolds, self.velocity_iterations, swept)
+        self._manifolds = cache
+
+    def _update_sleep(self):
+        """
+        Puts the islands of touching rigidbodies in this group and all of its children to sleep once they have come
+        to rest, and wakes the islands touched by an awake rigidbody.
+        Called automatically by rubato after every physics iteration of a scene.
+        """
+        bodies: list[RigidBody] = []
+        contacts: list[tuple[Hitbox, Hitbox]] = []
+        self._gather_physics(bodies, contacts)
+        _Engine.update_sleep(bodies, contacts)
+
+    def _collide_grids(self, grids: list[SimpleTilemap]):
+        """
+        Moves the awake rigidbodies of this group and all of its children out of the solid tiles of the tilemaps
+        with grid colliders among this group's game objects.
+        """
+        bodies: list[RigidBody] = []
+        self._gather_physics(bodies, [])
+        for tilemap in grids:
+            tilemap._wake(bodies)
+
+        for rb in bodies:
+            if rb.asleep:
+                continue
+            hts = [hb for hb in rb.gameobj.get_all(Hitbox) if not hb.trigger]
             if hts:
-                qtree.collide(hts, qtree.calc_bb(hts))
+                for tilemap in grids:
+                    tilemap._collide(rb, hts)
+
+    def _save_state(self, data: array, refs: list):
+        # the contacts and manifolds are replaced every step instead of changed, so they don't have to be copied
+        refs.extend((self.game_objects[:], self.groups[:], self._contacts, self._manifolds))
+        data.append(self.active)
+        for game_obj in self.game_objects:
+            game_obj._save_state(data, refs)
+        for group in self.groups:
+            group._save_state(data, refs)
+
+    def _load_state(self, data: Iterator[float], refs: Iterator):
+        self.game_objects[:] = next(refs)
+        self.groups[:] = next(refs)
+        self._contacts, self._manifolds = next(refs), next(refs)
+        self.active = next(data) == 1
+        for game_obj in self.game_objects:
+            game_obj._load_state(data, refs)
+        for group in self.groups:
+            group._load_state(data, refs)
+
+    def _gather_physics(self, bodies: list[RigidBody], contacts: list[tuple[Hitbox, Hitbox]]):
+        if not self.active:
+            return
+
+        bodies.extend(self._bodies)
+        contacts.extend(self._contacts)
+        for group in self.groups:
+            group._gather_physics(bodies, contacts)
+
+    def _sweep(self, rb: RigidBody, hts: list[Hitbox]) -> bool:
+        """
+        Moves a continuous rigidbody back to where its solid hitboxes first touch a solid hitbox of this group
+        along this step's motion, so the narrowphase then finds the contact instead of the body tunneling through.
+
+        Returns:
+            Whether the rigidbody was moved back.
+        """
+        go = rb.gameobj
+        start, end = rb._prev_pos, go.pos
+        dx, dy = end.x - start.x, end.y - start.y
+        hts = [hb for hb in hts if not hb.trigger]
+        if not hts:
+            return False
+
+        # a move shorter than half the smallest hitbox can't skip over anything
+        extent = Math.INF
+        for hb in hts:
+            x0, y0, x1, y1 = hb._bounds()
+            extent = min(extent, x1 - x0, y1 - y0)
+        if dx * dx + dy * dy <= extent * extent / 4:
+            return False
+
+        others: set[Hitbox] = set()
+        for hb in hts:
+            x0, y0, x1, y1 = hb._bounds()
+            x0, y0, x1, y1 = min(x0, x0 - dx), min(y0, y0 - dy), max(x1, x1 - dx), max(y1, y1 - dy)
+            for bp in (self._broadphase, self._static):
+                for other in bp.query(x0, y0, x1, y1, hb.category, hb.mask):
+                    if other.gameobj is not go and not other.trigger and other.category & hb.mask:
+                        others.add(other)
+        if not others:
+            return False
+
+        t = _Engine.time_of_impact(hts, list(others), start, end)
+        if t < 1:
+            end.x, end.y = start.x + dx * t, start.y + dy * t
+            self._move_proxies(hts)
+            return True
+        return False
+
+    def _move_proxies(self, hts: list[Hitbox]):
+        """Moves the items of hitboxes moved during the step in the broadphases of this group and its children."""
+        for hb in hts:
+            proxy = self._proxies.get(hb)
+            if proxy is not None:
+                self._broadphase.move(proxy, *hb._bounds())
+        for group in self.groups:
+            group._move_proxies(hts)
+
+    @staticmethod
+    def _narrowphase(
+        hb: Hitbox,
+        bounds: tuple[float, float, float, float],
+        other: Hitbox,
+        other_bounds: tuple[float, float, float, float],
+        candidates: list[tuple[Hitbox, Hitbox]],
+    ):
+        """
+        Adds two hitboxes to the pairs to collide if their collision filters accept each other and their bounding
+        boxes overlap. The bounding boxes are passed in, so the callers can skip checking the ones they know are
+        up to date.
+        """
+        if not (hb.category & other.mask and other.category & hb.mask):
+            return
+
+        x0, y0, x1, y1 = bounds
+        ox0, oy0, ox1, oy1 = other_bounds
+        if x1 < ox0 or ox1 < x0 or y1 < oy0 or oy1 < y0:
+            return
+
+        candidates.append((hb, other))
+
+    def _update_broadphase(self, all_hts: dict[GameObject, list[Hitbox]], awake: set[GameObject]) -> list[Hitbox]:
+        """
+        Brings the persistent broadphases up to date with the hitboxes of this group's game objects.
+        Every hitbox is its own item, so game objects with many hitboxes (like tilemaps) are culled hitbox by hitbox.
+
+        Args:
+            all_hts: The hitboxes of every game object of the group that has any.
+            awake: The game objects that aren't static.
+
+        Returns:
+            The hitboxes of the dynamic game objects.
+        """
+        dynamic: list[Hitbox] = []
+        static: dict[GameObject, list[Hitbox]] = {}
+        for game_obj, hts in all_hts.items():
+            if game_obj in awake:
+                dynamic.extend(hts)
+            else:
+                static[game_obj] = hts
+
+        for hb in self._proxies.keys() - dynamic:
+            self._broadphase.remove(self._proxies.pop(hb))
+
+        for hb in dynamic:
+            x0, y0, x1, y1 = hb._bounds()
+            proxy = self._proxies.get(hb)
+            if proxy is None:
+                proxy = self._proxies[hb] = self._broadphase.insert(hb, x0, y0, x1, y1)
+            else:
+                self._broadphase.move(proxy, x0, y0, x1, y1)
+            self._broadphase.filter(proxy, hb.category, hb.mask)
+
+        # static game objects are only measured again when they move or their hitboxes are added or removed
+        for game_obj in self._static_keys.keys() - static.keys():
+            for hb in self._static_keys.pop(game_obj)[3]:
+                self._static.remove(self._static_proxies.pop(hb))
+
+        for game_obj, hts in static.items():
+            key = (game_obj.pos.x, game_obj.pos.y, game_obj.rotation, hts)
+            old = self._static_keys.get(game_obj)
+            if old == key:
+                continue
+            self._static_keys[game_obj] = key
+
+            if old is not None:
+                for hb in set(old[3]).difference(hts):
+                    self._static.remove(self._static_proxies.pop(hb))
+
+                # sleeping rigidbodies touching a static game object that moved have to wake up,
+                # as does a sleeping rigidbody that was moved by hand
+                self._moved.update(hts)
+                self._wake(game_obj)
+
+            for hb in hts:
+                x0, y0, x1, y1 = hb._bounds()
+                proxy = self._static_proxies.get(hb)
+                if proxy is None:
+                    proxy = self._static_proxies[hb] = self._static.insert(hb, x0, y0, x1, y1)
+                else:
+                    self._static.move(proxy, x0, y0, x1, y1)
+                self._static.filter(proxy, hb.category, hb.mask)
+
+        return dynamic
+
+    @staticmethod
+    def _is_static(game_obj: GameObject) -> bool:
+        """Whether a game object has a RigidBody that is static or asleep, or is a tilemap without a RigidBody."""
+        if RigidBody in game_obj:
+            rb = game_obj.get(RigidBody)
+            return rb.static or rb.asleep
+        return SimpleTilemap in game_obj or Tilemap in game_obj
+
+    @staticmethod
+    def _wake(game_obj: GameObject):
+        if RigidBody in game_obj:
+            game_obj.get(RigidBody).wake()
 
     def all_gameobjects(self, include_self: bool = False) -> list[GameObject]:
         """
@@ -154,11 +544,226 @@ def all_gameobjects(self, include_self: bool = False) -> list[GameObject]:
         Returns:
             list[GameObject]: The resultant list.
         """
-        ret: list[GameObject] = self.game_objects if include_self else []
+        ret: list[GameObject] = self.game_objects[:] if include_self else []
         for group in self.groups:
             ret.extend(group.all_gameobjects(True))
         return ret
 
+    def query_point(self, pt: Vector | tuple[float, float], mask: int = -1, triggers: bool = True) -> list[Hitbox]:
+        """
+        Finds the hitboxes of the group and all of its children that contain a point.
+        Hitboxes are found through the broadphases, which are brought up to date every physics step.
+
+        Args:
+            pt: The point, in game-world coordinates.
+            mask: The categories of the hitboxes to find. Defaults to -1 (every category).
+            triggers: Whether to find trigger hitboxes. Defaults to True.
+
+        Returns:
+            The hitboxes containing the point, the ones whose bounding box is centered closest to it first.
+        """
+        pt = Vector.create(pt)
+        found = []
+        for bp in self._broadphases():
+            for hb in bp.query(pt.x, pt.y, pt.x, pt.y, -1, mask):
+                if self._accepts(hb, mask, triggers) and hb.contains_pt(pt):
+                    found.append(hb)
+        return self._by_distance(found, pt.x, pt.y)
+
+    def query_aabb(
+        self,
+        min_pt: Vector | tuple[float, float],
+        max_pt: Vector | tuple[float, float],
+        mask: int = -1,
+        triggers: bool = True,
+    ) -> list[Hitbox]:
+        """
+        Finds the hitboxes of the group and all of its children whose bounding boxes overlap a box.
+        Hitboxes are found through the broadphases, which are brought up to date every physics step.
+
+        Args:
+            min_pt: The bottom left corner of the box.
+            max_pt: The top right corner of the box.
+            mask: The categories of the hitboxes to find. Defaults to -1 (every category).
+            triggers: Whether to find trigger hitboxes. Defaults to True.
+
+        Returns:
+            The hitboxes overlapping the box, the ones whose bounding box is centered closest to its center first.
+        """
+        x0, y0 = min_pt
+        x1, y1 = max_pt
+        found = []
+        for bp in self._broadphases():
+            for hb in bp.query(x0, y0, x1, y1, -1, mask):
+                if not self._accepts(hb, mask, triggers):
+                    continue
+                bx0, by0, bx1, by1 = hb._bounds()
+                if not (bx1 < x0 or x1 < bx0 or by1 < y0 or y1 < by0):
+                    found.append(hb)
+        return self._by_distance(found, (x0 + x1) / 2, (y0 + y1) / 2)
+
+    def raycast(
+        self,
+        origin: Vector | tuple[float, float],
+        direction: Vector | tuple[float, float],
+        distance: float,
+        mask: int = -1,
+        triggers: bool = True,
+    ) -> RaycastHit | None:
+        """
+        Casts a ray through the group and all of its children, and finds the first hitbox it hits.
+        Hitboxes that the ray starts inside of are not hit.
+        Hitboxes are found through the broadphases, which are brought up to date every physics step.
+
+        Args:
+            origin: Where the ray starts.
+            direction: The direction of the ray.
+            distance: How far the ray goes.
+            mask: The categories of the hitboxes to hit. Defaults to -1 (every category).
+            triggers: Whether to hit trigger hitboxes. Defaults to True.
+
+        Returns:
+            The closest hit, or None if the ray hits nothing.
+        """
+        hits = self._raycast(Vector.create(origin), Vector.create(direction), distance, mask, triggers, True)
+        return hits[0] if hits else None
+
+    def raycast_all(
+        self,
+        origin: Vector | tuple[float, float],
+        direction: Vector | tuple[float, float],
+        distance: float,
+        mask: int = -1,
+        triggers: bool = True,
+    ) -> list[RaycastHit]:
+        """
+        Casts a ray through the group and all of its children, and finds every hitbox it hits.
+        Hitboxes that the ray starts inside of are not hit.
+        Hitboxes are found through the broadphases, which are brought up to date every physics step.
+
+        Args:
+            origin: Where the ray starts.
+            direction: The direction of the ray.
+            distance: How far the ray goes.
+            mask: The categories of the hitboxes to hit. Defaults to -1 (every category).
+            triggers: Whether to hit trigger hitboxes. Defaults to True.
+
+        Returns:
+            The hits, closest first.
+        """
+        return self._raycast(Vector.create(origin), Vector.create(direction), distance, mask, triggers, False)
+
+    def shape_cast(
+        self,
+        hitbox: Hitbox,
+        direction: Vector | tuple[float, float],
+        distance: float,
+        mask: int = -1,
+        triggers: bool = True,
+    ) -> list[RaycastHit]:
+        """
+        Moves a hitbox in a straight line through the group and all of its children, and finds every hitbox it
+        touches on the way. The hitbox is not rotated. Hitboxes it already touches and the other hitboxes of its
+        game object are ignored.
+        Hitboxes are found through the broadphases, which are brought up to date every physics step.
+
+        Args:
+            hitbox: The hitbox to cast. It has to be on a game object, which is where the cast starts.
+            direction: The direction to cast the hitbox in.
+            distance: How far to cast the hitbox.
+            mask: The categories of the hitboxes to hit. Defaults to -1 (every category).
+            triggers: Whether to hit trigger hitboxes. Defaults to True.
+
+        Returns:
+            The hits, closest first.
+        """
+        go = hitbox.gameobj
+        start = go.pos
+        move = Vector.create(direction).normalized() * distance
+        end = start + move
+
+        x0, y0, x1, y1 = hitbox._bounds()
+        x0, y0 = min(x0, x0 + move.x), min(y0, y0 + move.y)
+        x1, y1 = max(x1, x1 + move.x), max(y1, y1 + move.y)
+
+        hits = []
+        try:
+            for bp in self._broadphases():
+                for other in bp.query(x0, y0, x1, y1, -1, mask):
+                    if other.gameobj is go or not self._accepts(other, mask, triggers):
+                        continue
+
+                    go.pos = end
+                    t = _Engine.time_of_impact([hitbox], [other], start, end)
+                    if t >= 1:
+                        continue
+
+                    go.pos = start + move * t
+                    col = _Engine.overlap(hitbox, other)
+                    normal = col.normal if col is not None else -move.normalized()
+                    hits.append(RaycastHit(other, go.pos, normal, distance * t))
+        finally:
+            go.pos = start
+
+        hits.sort(key=lambda hit: hit.distance)
+        return hits
+
+    def _raycast(
+        self, origin: Vector, direction: Vector, distance: float, mask: int, triggers: bool, closest: bool
+    ) -> list[RaycastHit]:
+        """Casts a ray, stopping at the first hit if closest is set."""
+        direction = direction.normalized()
+        end = origin + direction * distance
+
+        # test the hitboxes in the order the ray reaches their bounding boxes, so the closest hit is found early
+        candidates = []
+        for bp in self._broadphases():
+            for hb in bp.query_segment(origin.x, origin.y, end.x, end.y, -1, mask):
+                if not self._accepts(hb, mask, triggers):
+                    continue
+                entry = _segment_entry(origin.x, origin.y, end.x, end.y, *hb._bounds())
+                if entry >= 0:
+                    candidates.append((entry * distance, hb))
+        candidates.sort(key=lambda c: c[0])
+
+        hits = []
+        for entry, hb in candidates:
+            if closest and hits and hits[0].distance <= entry:
+                break
+            hit = _Engine.raycast(hb, origin, direction, distance)
+            if hit is not None:
+                if closest:
+                    if not hits or hit.distance < hits[0].distance:
+                        hits = [hit]
+                else:
+                    hits.append(hit)
+
+        hits.sort(key=lambda hit: hit.distance)
+        return hits
+
+    def _broadphases(self) -> list[Broadphase]:
+        """The broadphases of this group and all of its active children."""
+        found = [self._broadphase, self._static]
+        for group in self.groups:
+            if group.active:
+                found.extend(group._broadphases())
+        return found
+
+    @staticmethod
+    def _accepts(hb: Hitbox, mask: int, triggers: bool) -> bool:
+        return bool(hb.category & mask) and (triggers or not hb.trigger)
+
+    @staticmethod
+    def _by_distance(hitboxes: list[Hitbox], x: float, y: float) -> list[Hitbox]:
+        """Sorts hitboxes by how far the center of their bounding box is from a point."""
+
+        def dist(hb: Hitbox) -> float:
+            x0, y0, x1, y1 = hb._bounds()
+            dx, dy = (x0 + x1) / 2 - x, (y0 + y1) / 2 - y
+            return dx * dx + dy * dy
+
+        return sorted(hitboxes, key=dist)
+
     def _draw(self, camera: Camera):
         if not self.active or self.hidden:
             return
@@ -185,7 +790,13 @@ def clone(self) -> Group:
         Warning:
             This is a relatively expensive operation as it clones every game object and component in the group.
         """
-        new_group = Group(f"{self.name} (clone)", self.active)
+        new_group = Group(
+            f"{self.name} (clone)",
+            self.active,
+            broadphase=self._broadphase.clone(),
+            velocity_iterations=self.velocity_iterations,
+            batch_integration=self.batch_integration,
+        )
 
         for group in self.groups:
             new_group.add(group.clone())
@@ -2,9 +2,10 @@
 An abstraction for a "level", or scene, in rubato.
 """
 from __future__ import annotations
+from array import array
 
-from . import Group, GameObject
-from .. import Game, Color, Draw, Camera
+from . import Group, GameObject, Broadphase, Hitbox, RaycastHit, Snapshot
+from .. import Game, Color, Draw, Camera, Vector, PhysicsStats, Time
 
 
 class Scene:
@@ -17,6 +18,10 @@ class Scene:
             Once this is set, it cannot be changed.
         background_color: The color of the background of the window. Defaults to Color(255, 255, 255).
         border_color: The color of the border of the window. Defaults to Color(0, 0, 0).
+        broadphase: The broadphase used by the root group to find potential collisions. Defaults to a new AABBTree.
+        velocity_iterations: How many times the root group's contact solver goes over its collisions each physics
+            step. Defaults to 8.
+        batch_integration: Whether the root group integrates its rigidbodies together. Defaults to False.
     """
 
     def __init__(
@@ -24,8 +29,16 @@ def __init__(
         name: str | None = None,
         background_color: Color = Color.white,
         border_color: Color = Color.black,
+        broadphase: Broadphase | None = None,
+        velocity_iterations: int = 8,
+        batch_integration: bool = False,
     ):
-        self.root: Group = Group(name="root")
+        self.root: Group = Group(
+            name="root",
+            broadphase=broadphase,
+            velocity_iterations=velocity_iterations,
+            batch_integration=batch_integration,
+        )
         """The base group of game objects in the scene."""
         self.ui: Group = Group(name="ui")
         """
@@ -100,6 +113,68 @@ def remove_ui(self, *items: GameObject) -> bool:
         """
         return self.ui.remove(*items)
 
+    def query_point(self, pt: Vector | tuple[float, float], mask: int = -1, triggers: bool = True) -> list[Hitbox]:
+        """
+        Finds the hitboxes of the root group that contain a point.
+        See :meth:`Group.query_point() <rubato.structure.group.Group.query_point>`.
+        """
+        return self.root.query_point(pt, mask, triggers)
+
+    def query_aabb(
+        self,
+        min_pt: Vector | tuple[float, float],
+        max_pt: Vector | tuple[float, float],
+        mask: int = -1,
+        triggers: bool = True,
+    ) -> list[Hitbox]:
+        """
+        Finds the hitboxes of the root group whose bounding boxes overlap a box.
+        See :meth:`Group.query_aabb() <rubato.structure.group.Group.query_aabb>`.
+        """
+        return self.root.query_aabb(min_pt, max_pt, mask, triggers)
+
+    def raycast(
+        self,
+        origin: Vector | tuple[float, float],
+        direction: Vector | tuple[float, float],
+        distance: float,
+        mask: int = -1,
+        triggers: bool = True,
+    ) -> RaycastHit | None:
+        """
+        Casts a ray through the root group and finds the first hitbox it hits.
+        See :meth:`Group.raycast() <rubato.structure.group.Group.raycast>`.
+        """
+        return self.root.raycast(origin, direction, distance, mask, triggers)
+
+    def raycast_all(
+        self,
+        origin: Vector | tuple[float, float],
+        direction: Vector | tuple[float, float],
+        distance: float,
+        mask: int = -1,
+        triggers: bool = True,
+    ) -> list[RaycastHit]:
+        """
+        Casts a ray through the root group and finds every hitbox it hits.
+        See :meth:`Group.raycast_all() <rubato.structure.group.Group.raycast_all>`.
+        """
+        return self.root.raycast_all(origin, direction, distance, mask, triggers)
+
+    def shape_cast(
+        self,
+        hitbox: Hitbox,
+        direction: Vector | tuple[float, float],
+        distance: float,
+        mask: int = -1,
+        triggers: bool = True,
+    ) -> list[RaycastHit]:
+        """
+        Moves a hitbox in a straight line through the root group and finds every hitbox it touches on the way.
+        See :meth:`Group.shape_cast() <rubato.structure.group.Group.shape_cast>`.
+        """
+        return self.root.shape_cast(hitbox, direction, distance, mask, triggers)
+
     def _dump(self):
         self.root._dump()
         self.ui._dump()
@@ -123,9 +198,73 @@ def _paused_update(self):
         self.paused_update()
 
     def _fixed_update(self):
+        PhysicsStats._begin_step()
         self.fixed_update()
         self.root._fixed_update()
+        self.root._update_sleep()
         self.ui._fixed_update()
+        PhysicsStats._end_step()
+
+    def simulate(self, steps: int, dt: float | None = None, update: bool = True):
+        """
+        Runs the scene for a number of physics steps as fast as possible, without drawing, waiting for the next frame
+        or handling events, so it works without a window. Each step runs the update functions once (if update is
+        True) and then the fixed update functions once, with both Time.delta_time and Time.fixed_delta set to dt.
+        The result only depends on the scene and the arguments, which makes it useful for training agents, checking
+        games on a server and testing.
+
+        Args:
+            steps: How many steps to run.
+            dt: How many seconds each step lasts. Defaults to Time.fixed_delta.
+            update: Whether to run the update functions too. Defaults to True.
+        """
+        fixed_delta, delta_time = Time.fixed_delta, Time._delta_time
+        if dt is not None:
+            Time.fixed_delta = dt
+        Time._delta_time = Time.fixed_delta
+
+        if not self.started:
+            self._setup()
+
+        try:
+            for _ in range(steps):
+                if update:
+                    self._update()
+                self._fixed_update()
+                Time._physics_steps += 1
+                self._dump()
+        finally:
+            Time.fixed_delta, Time._delta_time = fixed_delta, delta_time
+
+    def snapshot(self) -> Snapshot:
+        """
+        Captures the state of the scene, to put it back later with `restore()`. This is much faster than cloning the
+        game objects, so it can be done every frame for rollback or replays.
+
+        The snapshot holds which game objects and groups are in each group; the position, rotation and active flag of
+        every game object; the velocity, angular velocity and sleep state of each rigidbody; the hitboxes each hitbox
+        is colliding with; the particles of each particle system; and the current frame of each animation.
+
+        Returns:
+            The snapshot.
+        """
+        data, refs = array("d"), []
+        self.root._save_state(data, refs)
+        self.ui._save_state(data, refs)
+        return Snapshot(data, refs)
+
+    def restore(self, snapshot: Snapshot):
+        """
+        Puts the scene back in the state it was in when a snapshot of it was taken, changing its groups, game objects
+        and components in place. Game objects and groups added since are removed, and ones removed since are added
+        back. Components added to or removed from a game object since are left as they are.
+
+        Args:
+            snapshot: A snapshot taken of this scene with `snapshot()`.
+        """
+        data, refs = iter(snapshot.data), iter(snapshot.refs)
+        self.root._load_state(data, refs)
+        self.ui._load_state(data, refs)
 
     def _draw(self):
         Draw.clear(self.background_color, self.border_color)
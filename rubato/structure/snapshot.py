@@ -0,0 +1,89 @@
+"""
+Snapshots capture the state of a scene so that it can be put back later, for rollback and replays.
+"""
+from __future__ import annotations
+from array import array
+
+
+class Snapshot:
+    """
+    The state of the groups and game objects of a scene at one point in time. Take one with `Scene.snapshot()` and
+    put it back with `Scene.restore()`.
+
+    The numbers of the state (positions, rotations, velocities, timers and so on) are packed one after another in
+    `data`. Everything else (the game objects of each group, the components of each game object, the hitboxes each
+    hitbox is colliding with, the live particles and the current animation states) is kept in `refs` as references
+    to the objects themselves. Restoring a snapshot writes the numbers back into the existing objects and vectors
+    instead of creating new ones, and a snapshot can only be restored in the program that took it.
+
+    Args:
+        data: The numbers of the state.
+        refs: The references of the state.
+    """
+
+    def __init__(self, data: array, refs: list):
+        self.data: array = data
+        """The numbers of the state, as an array of floats."""
+        self.refs: list = refs
+        """The references of the state."""
+
+    def delta(self, baseline: Snapshot) -> SnapshotDelta:
+        """
+        Finds what changed since another snapshot of the same scene.
+
+        Args:
+            baseline: The snapshot to compare to.
+
+        Returns:
+            The numbers that differ from the baseline, which rebuild this snapshot when applied to it.
+        """
+        data, base = self.data, baseline.data
+        indices, values = array("i"), array("d")
+        for i in range(min(len(data), len(base))):
+            if data[i] != base[i]:
+                indices.append(i)
+                values.append(data[i])
+        for i in range(len(base), len(data)):
+            indices.append(i)
+            values.append(data[i])
+        return SnapshotDelta(len(data), indices, values, self.refs)
+
+
+class SnapshotDelta:
+    """
+    The difference between a snapshot and an older baseline snapshot, made with `Snapshot.delta()`. It only holds the
+    numbers that changed, so it is much smaller than the snapshot when little changed.
+
+    Args:
+        length: The number of numbers in the snapshot.
+        indices: Where each changed number is in the snapshot.
+        values: The changed numbers.
+        refs: The references of the snapshot.
+    """
+
+    def __init__(self, length: int, indices: array, values: array, refs: list):
+        self.length: int = length
+        """The number of numbers in the snapshot."""
+        self.indices: array = indices
+        """Where each changed number is in the snapshot."""
+        self.values: array = values
+        """The changed numbers."""
+        self.refs: list = refs
+        """The references of the snapshot."""
+
+    def apply(self, baseline: Snapshot) -> Snapshot:
+        """
+        Rebuilds the snapshot this delta was made from.
+
+        Args:
+            baseline: The snapshot the delta was made against.
+
+        Returns:
+            The rebuilt snapshot.
+        """
+        data = baseline.data[:self.length]
+        if len(data) < self.length:
+            data.extend(array("d", [0]) * (self.length - len(data)))
+        for i, value in zip(self.indices, self.values):
+            data[i] = value
+        return Snapshot(data, self.refs)
@@ -9,3 +9,4 @@
 from .radio import *
 from .color import Color
 from .rendering import *
+from .physics_stats import PhysicsStats, StepStats
@@ -2,14 +2,19 @@
 Static class that allows for intuitive window management.
 """
 from __future__ import annotations
+from typing import TYPE_CHECKING
+from array import array
 
-import ctypes
+import ctypes, math, cython
 
 import sdl2, sdl2.ext, sdl2.sdlimage
 import os
 
 from .. import Vector, get_path, InitError, Math
 
+if TYPE_CHECKING:
+    from .. import Surface
+
 
 class _DisplayProperties(type):  # pylint: disable=missing-class-docstring
     # pyright: reportGeneralTypeIssues=false
@@ -79,6 +84,10 @@ class Display(metaclass=_DisplayProperties):
         window_pos (Vector): The current position of the window in terms of screen pixels.
         window_name (str): The name of the window.
         hidden (bool): Whether the window is currently hidden.
+        batching (bool): Whether to batch the drawing of surfaces. While it is True, surfaces drawn one after the
+            other that share a texture are drawn with a single draw call, in the order they were drawn in.
+            Defaults to True.
+        draw_calls (int): The number of draw calls the last frame made.
     """
 
     window: sdl2.ext.Window
@@ -89,12 +98,24 @@ class Display(metaclass=_DisplayProperties):
         0, 1, 1, 32, sdl2.SDL_PIXELFORMAT_RGBA8888
     ).contents.format.contents
     hidden: bool = True
+    batching: bool = True
+    draw_calls: int = 0
 
     _saved_window_size: Vector | None = None
     _saved_window_pos: Vector | None = None
 
     _half_res: tuple[float, float]
 
+    # the quads drawn since the last flush, which all use the same texture. the buffers only ever grow: each vertex
+    # is its x, y, u and v, and its color
+    _batch_tx: sdl2.SDL_Texture | None = None
+    _batch_addr: int = 0
+    _batch_vertices: array = array("f", bytes(4 * 16 * 256))
+    _batch_colors: array = array("B", bytes(16 * 256))
+    _batch_surfs: list[Surface] = []
+    _batch_indices: array = array("i")
+    _calls: int = 0
+
     def __init__(self) -> None:
         raise InitError(self)
 
@@ -109,11 +130,15 @@ def _update(
         angle: float = 0,
         flipx: bool = False,
         flipy: bool = False,
+        src: sdl2.SDL_Rect | None = None,
+        alpha: int = 255,
     ):
         """
         Note:
-            pos is the center of the texture in cartesian coordinates.
+            pos is the center of the texture in cartesian coordinates. src is the part of the texture to draw.
         """
+        cls._flush()
+
         flipx |= Math.sign(scale[0]) == -1
         flipy |= Math.sign(scale[1]) == -1
 
@@ -128,10 +153,11 @@ def _update(
 
         final_pos = cls._center_cart_to_tl_sdl(pos, (x_dim, y_dim))
 
+        sdl2.SDL_SetTextureAlphaMod(tx, alpha)
         sdl2.SDL_RenderCopyEx(
             cls.renderer.sdlrenderer,
             tx,
-            None,
+            src,
             sdl2.SDL_Rect(
                 round(final_pos[0]),
                 round(final_pos[1]),
@@ -142,6 +168,129 @@ def _update(
             None,
             flip,
         )
+        sdl2.SDL_SetTextureAlphaMod(tx, 255)
+        cls._calls += 1
+
+    @classmethod
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def _batch(
+        cls,
+        surf: Surface,
+        pos: Vector | tuple[float, float],
+        scale: Vector | tuple[float, float],
+    ):
+        """
+        Queues a surface to be drawn with the surfaces drawn right before it that share its texture. The quad is
+        placed the same way `_update` places it, with rotation, scale and flips.
+
+        Note:
+            pos is the center of the surface in cartesian coordinates.
+        """
+        tx = surf._tx
+        addr = ctypes.addressof(tx)
+        if addr != cls._batch_addr:
+            cls._flush()
+            cls._batch_tx, cls._batch_addr = tx, addr
+
+        sx: cython.double = scale[0]
+        sy: cython.double = scale[1]
+        w: cython.int = round(surf._width * abs(sx))
+        h: cython.int = round(surf._height * abs(sy))
+        cx: cython.double = round(pos[0] + cls._half_res[0] - w / 2) + w / 2
+        cy: cython.double = round(cls._half_res[1] - pos[1] - h / 2) + h / 2
+
+        # the half width and half height of the quad, turned clockwise on the screen
+        angle: cython.double = round(surf.rotation)
+        ax: cython.double = w / 2
+        ay: cython.double = 0
+        bx: cython.double = 0
+        by: cython.double = h / 2
+        if angle % 360 != 0:
+            rad: cython.double = math.radians(angle)
+            c: cython.double = math.cos(rad)
+            s: cython.double = math.sin(rad)
+            ax, ay, bx, by = ax * c, ax * s, -by * s, by * c
+
+        u0: cython.double
+        v0: cython.double
+        u1: cython.double
+        v1: cython.double
+        u0, v0, u1, v1 = surf._uv
+        if sx < 0:
+            u0, u1 = u1, u0
+        if sy < 0:
+            v0, v1 = v1, v0
+
+        q: cython.Py_ssize_t = len(cls._batch_surfs)
+        if 16 * (q + 1) > len(cls._batch_vertices):
+            cls._batch_vertices.frombytes(bytes(4 * len(cls._batch_vertices)))
+            cls._batch_colors.frombytes(bytes(len(cls._batch_colors)))
+        # keeps the surface, and its slot in the atlas, alive until it is drawn
+        cls._batch_surfs.append(surf)
+
+        # top left, top right, bottom left, bottom right
+        vx: cython.float[:] = cls._batch_vertices
+        i: cython.Py_ssize_t = 16 * q
+        vx[i], vx[i + 1], vx[i + 2], vx[i + 3] = cx - ax - bx, cy - ay - by, u0, v0
+        vx[i + 4], vx[i + 5], vx[i + 6], vx[i + 7] = cx + ax - bx, cy + ay - by, u1, v0
+        vx[i + 8], vx[i + 9], vx[i + 10], vx[i + 11] = cx - ax + bx, cy - ay + by, u0, v1
+        vx[i + 12], vx[i + 13], vx[i + 14], vx[i + 15] = cx + ax + bx, cy + ay + by, u1, v1
+
+        col: cython.uchar[:] = cls._batch_colors
+        a: cython.uchar = surf._alpha
+        for i in range(16 * q, 16 * q + 16, 4):
+            col[i], col[i + 1], col[i + 2], col[i + 3] = 255, 255, 255, a
+
+    @classmethod
+    def _flush(cls):
+        """Draws the queued quads with one draw call."""
+        quads = len(cls._batch_surfs)
+        if quads == 0:
+            return
+
+        indices = cls._batch_indices
+        for q in range(len(indices) // 6, quads):
+            v = 4 * q
+            indices.extend((v, v + 1, v + 3, v, v + 3, v + 2))
+
+        float_p = ctypes.POINTER(ctypes.c_float)
+        vertices = cls._batch_vertices.buffer_info()[0]
+        sdl2.SDL_RenderGeometryRaw(
+            cls.renderer.sdlrenderer,
+            cls._batch_tx,
+            ctypes.cast(vertices, float_p),
+            16,
+            ctypes.cast(cls._batch_colors.buffer_info()[0], ctypes.POINTER(sdl2.SDL_Color)),
+            4,
+            ctypes.cast(vertices + 8, float_p),
+            16,
+            4 * quads,
+            indices.buffer_info()[0],
+            6 * quads,
+            4,
+        )
+        cls._calls += 1
+        cls._clear_batch()
+
+    @classmethod
+    def _flush_texture(cls, tx: sdl2.SDL_Texture):
+        """Draws the queued quads if they use the given texture."""
+        if cls._batch_surfs and ctypes.addressof(tx) == cls._batch_addr:
+            cls._flush()
+
+    @classmethod
+    def _clear_batch(cls):
+        """Forgets the queued quads."""
+        cls._batch_surfs.clear()
+        cls._batch_tx, cls._batch_addr = None, 0
+
+    @classmethod
+    def _present(cls):
+        """Draws what is left in the batch and shows the frame."""
+        cls._flush()
+        cls.renderer.present()
+        cls.draw_calls, cls._calls = cls._calls, 0
 
     @classmethod
     def _tl_sdl_to_center_cart(
@@ -311,6 +460,8 @@ def save_screenshot(
         if extension not in ["png", "jpg", "bmp"]:
             raise ValueError("Invalid extension. Only png, jpg, bmp are supported.")
 
+        cls._flush()
+
         w, h = ctypes.c_int(0), ctypes.c_int(0)
 
         sdl2.SDL_GetRendererOutputSize(cls.renderer.sdlrenderer, ctypes.byref(w), ctypes.byref(h))
@@ -0,0 +1,168 @@
+"""
+Records what the physics engine does each step, to find out where the time of a physics step goes.
+"""
+from __future__ import annotations
+import math
+import time
+
+from . import InitError, Draw, Display, Font, Vector
+
+
+class StepStats:
+    """
+    What the physics engine did in one physics step, summed over every group of the scene.
+    """
+
+    def __init__(self):
+        self.pairs: int = 0
+        """The number of candidate pairs of hitboxes the broadphases found."""
+        self.tests: dict[str, int] = {}
+        """The number of overlap tests, by the types of the two hitboxes (for example "Circle-Polygon")."""
+        self.contacts: int = 0
+        """The number of pairs of hitboxes that touched."""
+        self.resolved: int = 0
+        """The number of collisions the solver resolved."""
+        self.callbacks: int = 0
+        """The number of collision callbacks that were called."""
+        self.broadphase: float = 0
+        """The seconds spent updating the broadphases and finding the candidate pairs."""
+        self.narrowphase: float = 0
+        """The seconds spent testing the candidate pairs and calling their callbacks."""
+        self.solve: float = 0
+        """The seconds spent resolving the collisions."""
+        self.total: float = 0
+        """The seconds the whole physics step took."""
+
+    def __repr__(self) -> str:
+        return (
+            f"StepStats(pairs={self.pairs}, tests={self.tests}, contacts={self.contacts}, "
+            f"resolved={self.resolved}, callbacks={self.callbacks}, broadphase={self.broadphase}, "
+            f"narrowphase={self.narrowphase}, solve={self.solve}, total={self.total})"
+        )
+
+
+# THIS IS A STATIC CLASS
+class PhysicsStats:
+    """
+    Records what the physics engine does in each physics step of the current scene, for the last steps.
+    Nothing is recorded until `enabled` is set to True. While it is, the stats are drawn over the game when
+    `Game.debug` is True.
+    """
+
+    enabled: bool = False
+    """Whether to record the physics steps. Defaults to False."""
+    history_length: int = 120
+    """How many of the last physics steps to keep. Defaults to 120."""
+    history: list[StepStats] = []
+    """The stats of the last physics steps, from oldest to newest."""
+
+    # the stats of the step being recorded, if any
+    _step: StepStats | None = None
+    _start: float = 0
+
+    def __init__(self) -> None:
+        raise InitError(self)
+
+    @classmethod
+    def last(cls) -> StepStats | None:
+        """The stats of the last recorded physics step, or None if no step was recorded."""
+        return cls.history[-1] if cls.history else None
+
+    @classmethod
+    def average(cls) -> StepStats:
+        """The average of the stats of the recorded physics steps."""
+        avg = StepStats()
+        n = len(cls.history)
+        if n == 0:
+            return avg
+
+        tests: dict[str, float] = {}
+        for step in cls.history:
+            avg.pairs += step.pairs
+            avg.contacts += step.contacts
+            avg.resolved += step.resolved
+            avg.callbacks += step.callbacks
+            avg.broadphase += step.broadphase
+            avg.narrowphase += step.narrowphase
+            avg.solve += step.solve
+            avg.total += step.total
+            for shapes, count in step.tests.items():
+                tests[shapes] = tests.get(shapes, 0) + count
+
+        avg.pairs /= n
+        avg.contacts /= n
+        avg.resolved /= n
+        avg.callbacks /= n
+        avg.broadphase /= n
+        avg.narrowphase /= n
+        avg.solve /= n
+        avg.total /= n
+        avg.tests = {shapes: count / n for shapes, count in tests.items()}
+        return avg
+
+    @classmethod
+    def clear(cls):
+        """Forgets the recorded physics steps."""
+        cls.history = []
+
+    @classmethod
+    def _begin_step(cls):
+        if cls.enabled:
+            cls._step = StepStats()
+            cls._start = time.perf_counter()
+
+    @classmethod
+    def _end_step(cls):
+        step = cls._step
+        if step is None:
+            return
+
+        step.total = time.perf_counter() - cls._start
+        cls._step = None
+        cls.history.append(step)
+        if len(cls.history) > cls.history_length:
+            del cls.history[:len(cls.history) - cls.history_length]
+
+    @classmethod
+    def _count_tests(cls, types: list[tuple[type, type]]):
+        """Counts overlap tests between hitboxes of the given pairs of types."""
+        tests = cls._step.tests
+        for a, b in types:
+            shapes = f"{a.__name__}-{b.__name__}" if a.__name__ <= b.__name__ else f"{b.__name__}-{a.__name__}"
+            tests[shapes] = tests.get(shapes, 0) + 1
+
+    @classmethod
+    def _draw(cls, font: Font):
+        """
+        Draws the average stats of the recorded physics steps in the top right corner of the screen.
+        Called automatically if `Game.debug` is True.
+
+        Args:
+            font: The font to use.
+        """
+        avg = cls.average()
+        lines = [
+            f"physics {avg.total * 1000:.2f} ms",
+            f"broadphase {avg.broadphase * 1000:.2f} ms",
+            f"narrowphase {avg.narrowphase * 1000:.2f} ms",
+            f"solve {avg.solve * 1000:.2f} ms",
+            f"pairs {avg.pairs:.0f} contacts {avg.contacts:.0f} resolved {avg.resolved:.0f}",
+            f"callbacks {avg.callbacks:.0f}",
+        ] + [f"{shapes} {count:.0f}" for shapes, count in sorted(avg.tests.items())]
+
+        height: int = math.ceil(Display.res.y / 48)
+        pad = max(height / 4, 1)
+        scale = height / font.size
+
+        for i, line in enumerate(lines):
+            Draw.text(
+                line,
+                font=font,
+                pos=Display.top_right + (-pad, -pad - i * (height + 2 * pad)),
+                align=Vector(-1, 1),
+                justify="right",
+                scale=(scale, scale),
+                shadow=True,
+                shadow_pad=(pad, pad),
+                af=False
+            )
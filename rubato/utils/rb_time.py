@@ -104,6 +104,7 @@ class Time:
     _frame_start: float = 0
 
     _physics_counter: float = 0
+    _physics_steps: int = 0
 
     _past_fps = [0] * 120
     _fps_index: int = 0
@@ -114,6 +115,13 @@ class Time:
     _physics_fps = 0
     """The fps that the physics should run at."""
 
+    max_substeps: int = 8
+    """
+    The most fixed updates run in one frame. When the physics falls further behind than that, for example after a
+    long frame, the time it couldn't catch up on is dropped instead of making the next frames slower still.
+    0 means that there is no limit. Defaults to 8.
+    """
+
     def __init__(self) -> None:
         raise InitError(self)
 
@@ -123,6 +131,16 @@ def delta_time(cls) -> float:
         """The number of seconds between the last frame and the current frame (get-only)."""
         return cls._delta_time
 
+    @classmethod
+    @property
+    def physics_alpha(cls) -> float:
+        """
+        How far the current frame is between the last fixed update and the next one, from 0 to 1 (get-only).
+        Use it to draw between the previous and the current physics state, so motion looks smooth when the physics
+        fps is lower than the fps.
+        """
+        return min(cls._physics_counter / cls.fixed_delta, 1)
+
     @classmethod
     def smooth_fps(cls) -> int:
         """The average fps over the past 120 frames."""
@@ -0,0 +1,123 @@
+"""Packs small surfaces into a few shared textures, so that they can be drawn together."""
+from __future__ import annotations
+import ctypes
+
+import sdl2, sdl2.ext
+
+from .. import Display
+
+
+class _Page:
+    """
+    One texture of the atlas. It is split into columns, and each column is filled from the top with shelves of slots
+    that all have the same size.
+    """
+
+    def __init__(self, size: int, columns: int):
+        sdl2.SDL_SetHint(b"SDL_RENDER_SCALE_QUALITY", b"nearest")
+        self.tx: sdl2.SDL_Texture = sdl2.SDL_CreateTexture(
+            Display.renderer.sdlrenderer, Display.pixel_format, sdl2.SDL_TEXTUREACCESS_STREAMING, size, size
+        ).contents
+        sdl2.SDL_SetTextureBlendMode(self.tx, sdl2.SDL_BLENDMODE_BLEND)
+        self.heights: list[int] = [0] * columns
+        """How far down each column is filled with shelves."""
+        self.alive: bool = True
+        """Whether the page still belongs to the current renderer."""
+
+
+# THIS IS A STATIC CLASS
+class _Atlas:
+    """
+    Hands out slots in shared textures to surfaces that are small enough, so that drawing many of them in a row only
+    takes one draw call.
+
+    Slots are rounded up to a multiple of `_GRAIN` pixels and have a transparent border of one pixel around the
+    surface, so that nothing of the neighbouring slots shows at the edges of a rotated or scaled surface. Freed slots
+    are reused by the next surface that needs a slot of the same size.
+    """
+
+    page_size: int = 1024
+    """The width and height of each texture of the atlas."""
+    column_width: int = 256
+    """The width of the columns the textures are split into."""
+    max_size: int = 128
+    """Surfaces wider or taller than this get a texture of their own."""
+
+    _GRAIN: int = 8
+
+    _pages: list[_Page] = []
+    _free: dict[tuple[int, int], list[tuple[_Page, int, int]]] = {}
+    _renderer: sdl2.ext.Renderer | None = None
+    _zeros: ctypes.Array | None = None
+
+    @classmethod
+    def _alloc(cls, width: int, height: int) -> tuple[_Page, int, int, int, int] | None:
+        """
+        Finds a slot for a surface.
+
+        Args:
+            width: The width of the surface.
+            height: The height of the surface.
+
+        Returns:
+            The page, the x and y of the top left corner and the width and height of the cleared slot, or None if the
+            surface is too big for the atlas. The surface goes one pixel in from the corner of the slot.
+        """
+        if width > cls.max_size or height > cls.max_size:
+            return None
+
+        if cls._renderer is not Display.renderer:
+            cls._reset()
+
+        grain = cls._GRAIN
+        sw = -(-(width + 2) // grain) * grain
+        sh = -(-(height + 2) // grain) * grain
+        free = cls._free.setdefault((sw, sh), [])
+        if not free:
+            cls._shelf(sw, sh, free)
+
+        page, x, y = free.pop()
+        sdl2.SDL_UpdateTexture(page.tx, sdl2.SDL_Rect(x, y, sw, sh), cls._zeros, (cls.max_size + 2 * grain) * 4)
+        return page, x, y, sw, sh
+
+    @classmethod
+    def _release(cls, slot: tuple[_Page, int, int, int, int]):
+        """
+        Gives a slot back to the atlas.
+
+        Args:
+            slot: The slot, as returned by `_alloc`.
+        """
+        page, x, y, sw, sh = slot
+        if page.alive:
+            cls._free[(sw, sh)].append((page, x, y))
+
+    @classmethod
+    def _shelf(cls, sw: int, sh: int, free: list[tuple[_Page, int, int]]):
+        """Adds a new shelf of slots of the given size to the free slots."""
+        size, cw = cls.page_size, cls.column_width
+        for page in cls._pages:
+            for c, height in enumerate(page.heights):
+                if height + sh <= size:
+                    break
+            else:
+                continue
+            break
+        else:
+            page = _Page(size, size // cw)
+            cls._pages.append(page)
+            c, height = 0, 0
+
+        page.heights[c] = height + sh
+        free.extend((page, x, height) for x in range(c * cw + cw - sw, c * cw - 1, -sw))
+
+    @classmethod
+    def _reset(cls):
+        """Forgets the pages, which belong to an old renderer."""
+        for page in cls._pages:
+            page.alive = False
+        cls._pages = []
+        cls._free = {}
+        cls._renderer = Display.renderer
+        side = cls.max_size + 2 * cls._GRAIN
+        cls._zeros = (ctypes.c_uint32 * (side * side))()
@@ -72,6 +72,7 @@ def clear(cls, background_color: Color = Color.white, border_color: Color = Colo
             border_color: The border color. Defaults to black.
                 Shown when the aspect ratio of the game does not match the aspect ratio of the window.
         """
+        Display._clear_batch()
         Display.renderer.clear(border_color.to_tuple())
         Display.renderer.fill(
             (0, 0, *Display.renderer.logical_size),
@@ -544,7 +545,19 @@ def surface(cls, surface: Surface, pos: Vector | tuple[float, float] = (0, 0), c
         else:
             scale = surface.scale
 
-        Display._update(surface._tx, surface.width, surface.height, pos, scale, surface.rotation)
+        if Display.batching:
+            Display._batch(surface, pos, scale)
+        else:
+            Display._update(
+                surface._tx,
+                surface.width,
+                surface.height,
+                pos,
+                scale,
+                surface.rotation,
+                src=surface._src,
+                alpha=surface._alpha,
+            )
 
     @classmethod
     def clear_cache(cls):
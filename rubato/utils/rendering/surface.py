@@ -1,11 +1,12 @@
 """An abstraction for a grid of pixels that can be drawn onto."""
 from __future__ import annotations
 from typing import Optional
-import sdl2, sdl2.ext, sdl2.sdlimage, ctypes
+import sdl2, sdl2.ext, sdl2.sdlimage
 import os
 
 from ...c_src import c_draw
 from .. import Vector, Color, Display, get_path
+from .atlas import _Atlas
 
 
 class Surface:
@@ -18,6 +19,10 @@ class Surface:
         scale: The scale of the surface. Defaults to (1, 1).
         rotation: The clockwise rotation of the sprite.
         af: Whether to use anisotropic filtering. Defaults to False.
+
+    Note:
+        Surfaces that are no bigger than 128 by 128 pixels and don't use anisotropic filtering share a few large
+        textures instead of each having their own, so that drawing many of them in a row only takes one draw call.
     """
 
     def __init__(
@@ -39,12 +44,14 @@ def __init__(
         self._width: int = width
         self._height: int = height
         self._color_key: Optional[int] = None
-
-        sdl2.SDL_SetHint(b"SDL_RENDER_SCALE_QUALITY", b"linear" if self._af else b"nearest")
-        self._tx: sdl2.SDL_Texture = sdl2.SDL_CreateTexture(
-            Display.renderer.sdlrenderer, Display.pixel_format, sdl2.SDL_TEXTUREACCESS_STREAMING, width, height
-        ).contents
-        sdl2.SDL_SetTextureBlendMode(self._tx, sdl2.SDL_BLENDMODE_BLEND)
+        self._alpha: int = 255
+
+        self._tx: sdl2.SDL_Texture
+        # the slot of the surface in the atlas, if it has one, and where it is in its texture
+        self._slot: tuple | None = None
+        self._src: sdl2.SDL_Rect | None = None
+        self._uv: tuple[float, float, float, float] = (0, 0, 1, 1)
+        self._make_texture()
         self._pixels: int = c_draw.create_pixel_buffer(width, height)
         self._pixels_colorkey: int = 0
         self.uptodate: bool = False
@@ -70,14 +77,40 @@ def af(self):
 
     @af.setter
     def af(self, new: bool):
+        self._free_texture()
         self._af = new
+        self._make_texture()
+        self.uptodate = False
+
+    def _make_texture(self):
+        """Gives the surface a slot in the atlas, or a texture of its own if it can't have one."""
+        if not self._af and (slot := _Atlas._alloc(self._width, self._height)) is not None:
+            page, x, y = slot[:3]
+            size = _Atlas.page_size
+            self._slot = slot
+            self._tx = page.tx
+            self._src = sdl2.SDL_Rect(x + 1, y + 1, self._width, self._height)
+            self._uv = ((x + 1) / size, (y + 1) / size, (x + 1 + self._width) / size, (y + 1 + self._height) / size)
+            return
+
         sdl2.SDL_SetHint(b"SDL_RENDER_SCALE_QUALITY", b"linear" if self._af else b"nearest")
-        self._tx: sdl2.SDL_Texture = sdl2.SDL_CreateTexture(
-            Display.renderer.sdlrenderer, Display.pixel_format, sdl2.SDL_TEXTUREACCESS_STREAMING, self.width,
-            self.height
+        self._tx = sdl2.SDL_CreateTexture(
+            Display.renderer.sdlrenderer, Display.pixel_format, sdl2.SDL_TEXTUREACCESS_STREAMING, self._width,
+            self._height
         ).contents
         sdl2.SDL_SetTextureBlendMode(self._tx, sdl2.SDL_BLENDMODE_BLEND)
-        self.uptodate = False
+        self._slot = None
+        self._src = None
+        self._uv = (0, 0, 1, 1)
+
+    def _free_texture(self):
+        """Gives the slot of the surface back to the atlas, or destroys its texture."""
+        # queued draws of the surface must happen before its pixels are gone
+        Display._flush_texture(self._tx)
+        if self._slot is not None:
+            _Atlas._release(self._slot)
+        else:
+            sdl2.SDL_DestroyTexture(self._tx)
 
     def size_scaled(self) -> Vector:
         """
@@ -185,8 +218,10 @@ def _regen(self):
         if self._color_key is not None:
             c_draw.colorkey_copy(self._pixels, self._pixels_colorkey, self._width, self._height, self._color_key)
 
+        # queued draws of the surface must use the pixels it had when they were queued
+        Display._flush_texture(self._tx)
         sdl2.SDL_UpdateTexture(
-            self._tx, None, self._pixels if self._color_key is None else self._pixels_colorkey, self.width * 4
+            self._tx, self._src, self._pixels if self._color_key is None else self._pixels_colorkey, self.width * 4
         )
         self.uptodate = True
 
@@ -449,16 +484,13 @@ def set_alpha(self, new: int):
         Args:
             new: The new alpha. (value between 0-255)
         """
-        new = max(min(new, 255), 0)
-        sdl2.SDL_SetTextureAlphaMod(self._tx, new)
+        self._alpha = max(min(new, 255), 0)
 
     def get_alpha(self) -> int:
         """
         Gets the surface wide alpha.
         """
-        y = ctypes.c_uint8()
-        sdl2.SDL_GetTextureAlphaMod(self._tx, ctypes.byref(y))
-        return y.value
+        return self._alpha
 
     def save_as(
         self,
@@ -590,5 +622,5 @@ def _from_surf(
         return s
 
     def __del__(self):
-        sdl2.SDL_DestroyTexture(self._tx)
+        self._free_texture()
         c_draw.free_pixel_buffer(self._pixels)
@@ -152,3 +152,34 @@ def update_override():
     end_frame.assert_called()
     assert end_frame.call_count == 4
     assert Game.state == Game.STOPPED
+
+
+def test_max_substeps(monkeypatch: pytest.MonkeyPatch, rub):
+    for name in ("_start_frame", "_process_calls", "_end_frame"):
+        monkeypatch.setattr(Time, name, Mock())
+    monkeypatch.setattr(rubato.game.sdl2, "SDL_PushEvent", Mock())
+    monkeypatch.setattr(rubato.game.sdl2, "SDL_PumpEvents", Mock())
+    monkeypatch.setattr(Radio, "_handle", Mock(return_value=False))
+    monkeypatch.setattr(Display.renderer, "present", Mock())
+    monkeypatch.setattr(Draw, "_dump", Mock())
+
+    Game._scenes = {}
+    scene = Scene()
+    monkeypatch.setattr(scene, "_fixed_update", fixed := Mock())
+    monkeypatch.setattr(scene, "_draw", Mock())
+    monkeypatch.setattr(Game, "state", Game.RUNNING)
+    monkeypatch.setattr(Game, "show_fps", False)
+    monkeypatch.setattr(Time, "fixed_delta", 0.1)
+    monkeypatch.setattr(Time, "_physics_counter", 0)
+
+    # a long frame only catches up on as many steps as allowed, keeping the fraction of a step left over
+    monkeypatch.setattr(Time, "_delta_time", 5.05)
+    Game._tick()
+    assert fixed.call_count == Time.max_substeps == 8
+    assert Time._physics_counter == pytest.approx(0.05)
+    assert Time.physics_alpha == pytest.approx(0.5)
+
+    monkeypatch.setattr(Time, "max_substeps", 0)
+    fixed.reset_mock()
+    Game._tick()
+    assert fixed.call_count == 51
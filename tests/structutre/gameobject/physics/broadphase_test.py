@@ -0,0 +1,179 @@
+"""Tests for the broadphases."""
+import random
+import pytest
+from rubato.structure.gameobject.physics.aabb_tree import AABBTree
+from rubato.structure.gameobject.physics.sweep_prune import SweepAndPrune
+from rubato.structure.gameobject.physics.spatial_hash import SpatialHash
+# pylint: disable=redefined-outer-name
+
+
+@pytest.fixture(params=[lambda: AABBTree(margin=1), SweepAndPrune, lambda: SpatialHash(16)])
+def broadphase(request):
+    return request.param()
+
+
+def brute_pairs(boxes: dict):
+    items = list(boxes)
+    found = set()
+    for i, a in enumerate(items):
+        for b in items[i + 1:]:
+            ax0, ay0, ax1, ay1 = boxes[a]
+            bx0, by0, bx1, by1 = boxes[b]
+            if not (ax1 < bx0 or bx1 < ax0 or ay1 < by0 or by1 < ay0):
+                found.add(frozenset((a, b)))
+    return found
+
+
+def test_insert_query(broadphase):
+    broadphase.insert("a", 0, 0, 10, 10)
+    broadphase.insert("b", 20, 20, 30, 30)
+
+    assert broadphase.query(5, 5, 6, 6) == ["a"]
+    assert sorted(broadphase.query(0, 0, 30, 30)) == ["a", "b"]
+    assert broadphase.query(100, 100, 101, 101) == []
+
+
+def test_pairs(broadphase):
+    broadphase.insert("a", 0, 0, 10, 10)
+    broadphase.insert("b", 5, 5, 15, 15)
+    broadphase.insert("c", 50, 50, 60, 60)
+
+    assert broadphase.pairs() == [("a", "b")]
+
+
+def test_move(broadphase):
+    a = broadphase.insert("a", 0, 0, 10, 10)
+    broadphase.insert("b", 50, 50, 60, 60)
+
+    broadphase.move(a, 0.5, 0.5, 10.5, 10.5)
+    assert broadphase.pairs() == []
+
+    assert broadphase.move(a, 45, 45, 55, 55)
+    assert broadphase.pairs() == [("a", "b")]
+
+    assert broadphase.move(a, 100, 100, 110, 110)
+    assert broadphase.pairs() == []
+
+
+def test_remove(broadphase):
+    a = broadphase.insert("a", 0, 0, 10, 10)
+    b = broadphase.insert("b", 5, 5, 15, 15)
+
+    broadphase.remove(a)
+    assert broadphase.pairs() == []
+    assert broadphase.query(0, 0, 15, 15) == ["b"]
+
+    broadphase.remove(b)
+    assert broadphase.query(0, 0, 15, 15) == []
+
+
+def test_remove_touching(broadphase):
+    handles = [broadphase.insert(i, 0, 0, 10, 10) for i in range(3)]
+    broadphase.query(0, 0, 1, 1)
+    broadphase.remove(handles[1])
+    assert sorted(broadphase.query(0, 0, 1, 1)) == [0, 2]
+    assert broadphase.pairs() in ([(0, 2)], [(2, 0)])
+
+
+def test_query_wide(broadphase):
+    broadphase.insert("wide", -1000, 0, 1000, 10)
+    broadphase.insert("small", 0, 0, 1, 1)
+    assert sorted(broadphase.query(900, 0, 910, 10)) == ["wide"]
+
+
+def test_filter(broadphase):
+    a = broadphase.insert("a", 0, 0, 10, 10)
+    b = broadphase.insert("b", 5, 5, 15, 15)
+    c = broadphase.insert("c", 5, 0, 15, 10)
+    broadphase.filter(a, 0b001, 0b010)
+    broadphase.filter(b, 0b010, 0b001)
+    broadphase.filter(c, 0b100, -1)
+
+    assert broadphase.pairs() == [("a", "b")]
+    assert broadphase.query(0, 0, 15, 15, 0b100, -1) == ["c"]
+    assert sorted(broadphase.query(0, 0, 15, 15)) == ["a", "b", "c"]
+
+    broadphase.filter(c, 0b001, -1)
+    assert sorted(broadphase.pairs()) == [("a", "b"), ("b", "c")]
+
+
+def test_query_segment(broadphase):
+    broadphase.insert("a", 0, 0, 10, 10)
+    broadphase.insert("b", 20, 0, 30, 10)
+    broadphase.insert("c", 0, 40, 10, 50)
+
+    assert sorted(broadphase.query_segment(-5, 5, 35, 5)) == ["a", "b"]
+    assert broadphase.query_segment(25, -5, 25, 5) == ["b"]
+    assert broadphase.query_segment(5, 45, 6, 46) == ["c"]
+
+    # the diagonal passes between the boxes, and "c" is filtered out
+    assert "b" not in broadphase.query_segment(-5, 20, 40, 60)
+    assert "c" not in broadphase.query_segment(-5, 20, 40, 60, mask=0)
+
+
+def test_clone(broadphase):
+    broadphase.insert("a", 0, 0, 10, 10)
+    clone = broadphase.clone()
+    assert type(clone) is type(broadphase)
+    assert clone.query(0, 0, 10, 10) == []
+
+
+def test_tree_fat_move():
+    tree = AABBTree(margin=1)
+    a = tree.insert("a", 0, 0, 10, 10)
+    assert not tree.move(a, 0.5, 0.5, 10.5, 10.5)
+    assert tree.move(a, 2, 2, 12, 12)
+
+
+def test_hash_cells():
+    grid = SpatialHash(10)
+    a = grid.insert("a", 1, 1, 25, 5)
+    assert len(grid._cells) == 3
+    assert not grid.move(a, 2, 2, 26, 6)
+    assert grid.move(a, -5, 2, 5, 6)
+    assert len(grid._cells) == 2
+
+    b = grid.insert("b", 0, 0, 30, 30)
+    assert grid.pairs() == [("a", "b")]
+    assert grid.query(-100, -100, 100, 100) == ["a", "b"]
+
+    grid.remove(a)
+    grid.remove(b)
+    assert not grid._cells
+    assert len(grid._pool) == 17
+
+
+def test_random_against_brute_force(broadphase):
+    rand = random.Random(0)
+    boxes = {}
+    handles = {}
+
+    def rand_box():
+        x, y = rand.uniform(0, 500), rand.uniform(0, 500)
+        return x, y, x + rand.uniform(1, 30), y + rand.uniform(1, 30)
+
+    for i in range(200):
+        boxes[i] = rand_box()
+        handles[i] = broadphase.insert(i, *boxes[i])
+
+    for step in range(5):
+        for i in range(step, 200, 3):
+            boxes[i] = rand_box()
+            broadphase.move(handles[i], *boxes[i])
+        for i in range(step, 200, 50):
+            broadphase.remove(handles.pop(i))
+            handles[i] = broadphase.insert(i, *boxes[i])
+
+        pairs = {frozenset(p) for p in broadphase.pairs()}
+        exact = brute_pairs(boxes)
+        assert exact <= pairs
+        if isinstance(broadphase, SweepAndPrune | SpatialHash):
+            assert pairs == exact
+        else:
+            fat = {i: (l.x0, l.y0, l.x1, l.y1) for i, l in handles.items()}
+            assert pairs == brute_pairs(fat)
+
+        q = (100, 100, 200, 200)
+        assert {i for i, b in boxes.items() if frozenset((i, -1)) in brute_pairs({i: b, -1: q})} <= set(
+            broadphase.query(*q)
+        )
@@ -0,0 +1,298 @@
+"""Tests for the cached world geometry of the hitboxes."""
+from unittest.mock import Mock
+import pytest
+from rubato.structure.gameobject.game_object import GameObject
+from rubato.structure.gameobject.physics.hitbox import Hitbox, Rectangle, Circle, Polygon, EdgeChain
+from rubato.structure.gameobject.physics.engine import _Engine, Manifold
+from rubato.structure.gameobject.physics.narrowphase import overlap_pair
+from rubato.utils.computation.vector import Vector
+# pylint: disable=unused-argument
+
+
+def approx_verts(verts):
+    return [(pytest.approx(v.x, abs=1e-4), pytest.approx(v.y, abs=1e-4)) for v in verts]
+
+
+def test_rect_cache(rub):
+    GameObject(pos=(10, 0)).add(rect := Rectangle(width=4, height=2))
+    assert rect.get_aabb() == (Vector(8, -1), Vector(12, 1))
+
+    rect.true_verts()
+    first = rect._true_verts
+    rect.true_verts()
+    assert rect._true_verts is first
+
+    rect.gameobj.pos = Vector(0, 0)
+    assert rect.get_aabb() == (Vector(-2, -1), Vector(2, 1))
+    assert rect._true_verts is not first
+
+    rect.gameobj.rotation = 90
+    tl, br = rect.get_aabb()
+    assert (tl.x, tl.y, br.x, br.y) == (pytest.approx(-1), pytest.approx(-2), pytest.approx(1), pytest.approx(2))
+
+    rect.offset = Vector(5, 0)
+    rect.regen()
+    assert rect.true_verts()[0] == Vector(5, 0).rotate(90) + Vector(-2, -1).rotate(90)
+
+
+def test_true_verts_copy(rub):
+    GameObject().add(poly := Polygon(Vector.poly(5, 3)))
+    verts = poly.true_verts()
+    verts.pop()
+    assert len(poly.true_verts()) == 5
+
+
+def test_circle_cache(rub):
+    GameObject(pos=(1, 2)).add(circle := Circle(radius=3))
+    assert circle.true_radius() == 3
+    assert circle.get_aabb() == (Vector(-2, -1), Vector(4, 5))
+
+    circle.radius = 5
+    assert circle.true_radius() == 5
+
+    circle.scale = Vector(2, 1)
+    assert circle.true_radius() == 10
+    assert circle.contains_pt(Vector(10, 2))
+
+
+def test_overlap_follows_cache(rub):
+    GameObject(pos=(0, 0)).add(a := Rectangle(width=10, height=10))
+    GameObject(pos=(8, 0)).add(b := Rectangle(width=10, height=10))
+    GameObject(pos=(0, 8)).add(c := Circle(radius=5))
+
+    col = _Engine.overlap(a, b)
+    assert col is not None
+    assert col.penetration == pytest.approx(2)
+    assert (col.normal.x, col.normal.y) == (pytest.approx(-1), pytest.approx(0))
+    assert _Engine.overlap(a, c) is not None
+
+    b.gameobj.pos = Vector(20, 0)
+    c.gameobj.pos = Vector(0, 20)
+    assert _Engine.overlap(a, b) is None
+    assert _Engine.overlap(a, c) is None
+
+    b.gameobj.pos = Vector(0, 8)
+    b.gameobj.rotation = 45
+    col = _Engine.overlap(a, b)
+    assert col is not None
+    assert approx_verts(b.true_verts()) == approx_verts([v.rotate(45) + (0, 8) for v in b.offset_verts()])
+
+
+def test_overlap_all(rub):
+    GameObject(pos=(0, 0)).add(a := Rectangle(width=10, height=10))
+    GameObject(pos=(6, 3)).add(b := Polygon(Vector.poly(6, 6)))
+    GameObject(pos=(0, 9)).add(c := Circle(radius=5))
+    GameObject(pos=(4, 12)).add(d := Circle(radius=2))
+    GameObject(pos=(50, 0)).add(e := Rectangle(width=10, height=10))
+
+    pairs = [(a, b), (b, a), (a, c), (c, a), (b, c), (c, d), (d, c), (a, e), (c, e), (e, b)]
+    cols = _Engine.overlap_all(pairs)
+    assert [col is None for col in cols] == [False, False, False, False, False, False, False, True, True, True]
+    for (x, y), col in zip(pairs, cols):
+        single = _Engine.overlap(x, y)
+        if col is None:
+            assert single is None
+            continue
+        assert (col.shape_a, col.shape_b) == (x, y)
+        assert col.penetration == pytest.approx(single.penetration)
+        assert col.normal == single.normal
+        assert col.feature == single.feature
+
+    # the normal points from the second hitbox toward the first
+    assert cols[0].normal == -cols[1].normal
+    assert cols[5].feature == (None, 0)
+    assert cols[2].feature[0] is a and cols[3].feature[0] is a
+
+    assert _Engine.overlap_all([]) == []
+    with pytest.raises(TypeError):
+        _Engine.overlap_all([(a, Hitbox())])
+
+
+def test_gjk_epa(rub):
+    GameObject().add(a := Polygon(Vector.poly(32, 10)))
+    GameObject().add(b := Polygon(Vector.poly(24, 6)))
+    GameObject().add(c := Rectangle(width=8, height=3))
+
+    hits = 0
+    for x, y, rot in [(12, 3, 0), (15, 0, 10), (5, -14, 45), (-9, 9, 77), (3, 2, 200), (30, 0, 0), (16.5, 0, 0)]:
+        for other in (b, c):
+            other.gameobj.pos, other.gameobj.rotation = Vector(x, y), rot
+            count = _Engine._pack(other)
+            _Engine._pack(a)
+            sat = overlap_pair(a._packed, 32, other._packed, count, 1000)
+            gjk = overlap_pair(a._packed, 32, other._packed, count, 0)
+            if sat is None:
+                assert gjk is None
+                continue
+            assert gjk is not None
+            assert gjk[2:] == pytest.approx(sat[2:], abs=1e-5)
+            hits += 1
+    assert hits == 8
+
+
+def test_collide_callbacks(rub, monkeypatch):
+    GameObject(pos=(0, 0)).add(a := Rectangle(width=10, height=10, trigger=True))
+    GameObject(pos=(10, 0)).add(b := Circle(radius=6))
+
+    col = _Engine.overlap(b, a)
+    assert col is not None
+    assert (col.shape_a, col.shape_b) == (b, a)
+    assert (col.normal.x, col.normal.y) == (pytest.approx(1), pytest.approx(0))
+    col = _Engine.overlap(a, b)
+    assert col is not None
+    assert (col.shape_a, col.shape_b) == (a, b)
+    assert (col.normal.x, col.normal.y) == (pytest.approx(-1), pytest.approx(0))
+
+    # without callbacks, nothing is flipped or built for the exit
+    monkeypatch.setattr(Manifold, "_flip", flip := Mock())
+    assert _Engine.collide(a, b) is not None
+    flip.assert_not_called()
+    assert b in a.colliding and a in b.colliding
+    b.gameobj.pos = Vector(30, 0)
+    monkeypatch.setattr("rubato.structure.gameobject.physics.engine.Manifold", manifold := Mock())
+    _Engine.collide(a, b)
+    manifold.assert_not_called()
+    assert not a.colliding and not b.colliding
+    monkeypatch.undo()
+
+    a.on_collide, b.on_enter, b.on_collide, b.on_exit = Mock(), Mock(), Mock(), Mock()
+    b.gameobj.pos = Vector(10, 0)
+    col = _Engine.collide(a, b)
+    a.on_collide.assert_called_once_with(col)
+    b.on_enter.assert_called_once()
+    loc = b.on_enter.call_args.args[0]
+    assert (loc.shape_a, loc.shape_b) == (b, a)
+    assert loc.normal == -col.normal
+    b.on_collide.assert_called_once_with(loc)
+
+    b.gameobj.pos = Vector(30, 0)
+    _Engine.collide(a, b)
+    b.on_exit.assert_called_once()
+    assert b.on_exit.call_args.args[0].shape_b is a
+
+
+def test_sensor_pairs(rub, monkeypatch):
+    GameObject(pos=(0, 0)).add(a := Rectangle(width=10, height=10, trigger=True))
+    GameObject(pos=(10, 0)).add(b := Circle(radius=6))
+    GameObject(pos=(40, 0)).add(c := Polygon([(0, -6), (6, 0), (0, 6), (-6, 0)]))
+    pairs = [(a, b), (a, c)]
+    assert _Engine.touching_all(pairs) == [True, False]
+    assert _Engine.touching_all([]) == []
+
+    # trigger pairs without on_collide are never measured
+    monkeypatch.setattr(_Engine, "overlap", overlap := Mock())
+    assert _Engine.collide_all(pairs) == [True, False]
+    overlap.assert_not_called()
+    assert a.colliding == {b} and b.colliding == {a} and not c.colliding
+    monkeypatch.undo()
+
+    # on_enter still gets a full manifold, but on_collide can be limited to enter and exit
+    b.gameobj.pos = Vector(30, 0)
+    assert _Engine.collide_all(pairs) == [False, False]
+    a.on_enter, b.on_collide, b.enter_exit_only = Mock(), Mock(), True
+    b.gameobj.pos = Vector(10, 0)
+    assert _Engine.collide_all(pairs) == [True, False]
+    a.on_enter.assert_called_once()
+    assert a.on_enter.call_args.args[0].shape_b is b
+    assert _Engine.collide_all(pairs) == [True, False]
+    a.on_enter.assert_called_once()
+    b.on_collide.assert_not_called()
+
+    # outside of triggers, on_collide is always called
+    a.trigger = False
+    assert _Engine.collide_all(pairs, []) == [True, False]
+    b.on_collide.assert_called_once()
+
+
+def test_raycast(rub):
+    GameObject(pos=(10, 0)).add(rect := Rectangle(width=4, height=4))
+    GameObject(pos=(0, 10)).add(circle := Circle(radius=2))
+
+    hit = _Engine.raycast(rect, Vector(0, 0), Vector(1, 0), 20)
+    assert hit is not None
+    assert hit.distance == pytest.approx(8)
+    assert hit.point == Vector(8, 0)
+    assert hit.normal == Vector(-1, 0)
+
+    hit = _Engine.raycast(circle, Vector(0, 0), Vector(0, 1), 20)
+    assert hit is not None
+    assert hit.distance == pytest.approx(8)
+    assert (hit.normal.x, hit.normal.y) == (pytest.approx(0), pytest.approx(-1))
+
+    # too short, pointing away, and starting inside
+    assert _Engine.raycast(rect, Vector(0, 0), Vector(1, 0), 5) is None
+    assert _Engine.raycast(circle, Vector(0, 0), Vector(0, -1), 20) is None
+    assert _Engine.raycast(rect, Vector(10, 0), Vector(1, 0), 20) is None
+    assert _Engine.raycast(circle, Vector(0, 10), Vector(1, 0), 20) is None
+
+
+def test_edge_chain(rub):
+    # a floor along y = 0 that faces up, split into 10 edges
+    GameObject().add(chain := EdgeChain([(50 - 10 * i, 0) for i in range(11)]))
+    assert chain.get_aabb() == (Vector(-50, 0), Vector(50, 0))
+    assert len(chain.true_verts()) == 11
+
+    # a box sliding over the seams is always pushed straight up, by the edges under it
+    GameObject(pos=(0, 4)).add(box := Rectangle(width=10, height=10))
+    for x in range(-40, 41, 3):
+        box.gameobj.pos = Vector(x + 0.5, 4)
+        col = _Engine.overlap(box, chain)
+        assert col is not None
+        assert (col.normal.x, col.normal.y) == (pytest.approx(0), pytest.approx(1))
+        assert col.penetration == pytest.approx(1)
+        assert col.feature[0] is chain
+
+        col = _Engine.overlap(chain, box)
+        assert col is not None
+        assert (col.normal.x, col.normal.y) == (pytest.approx(0), pytest.approx(-1))
+
+    # the edges are one-sided
+    box.gameobj.pos = Vector(0, -4)
+    assert _Engine.overlap(box, chain) is None
+    GameObject(pos=(0, 3)).add(circle := Circle(radius=4))
+    col = _Engine.overlap(circle, chain)
+    assert col is not None and col.penetration == pytest.approx(1)
+    circle.gameobj.pos = Vector(0, -3)
+    assert _Engine.overlap(circle, chain) is None
+
+    # the free ends of the chain collide all around the front
+    circle.gameobj.pos = Vector(51.8, 2.4)
+    col = _Engine.overlap(circle, chain)
+    assert col is not None
+    assert (col.normal.x, col.normal.y) == (pytest.approx(0.6), pytest.approx(0.8))
+
+    # a ghost vertex continuing the floor leaves the end to the next chain over
+    chain.next_vert = Vector(-60, 0)
+    chain.regen()
+    circle.gameobj.pos = Vector(-51.8, 2.4)
+    assert _Engine.overlap(circle, chain) is None
+    circle.gameobj.pos = Vector(51.8, 2.4)
+    assert _Engine.overlap(circle, chain) is not None
+
+    # chains don't collide with each other
+    GameObject().add(other := EdgeChain([(0, 10), (0, -10)]))
+    assert _Engine.overlap(chain, other) is None
+
+
+def test_edge_chain_loop(rub):
+    GameObject(pos=(0, 0)).add(chain := EdgeChain([(-10, -10), (10, -10), (10, 10), (-10, 10)], loop=True))
+    GameObject(pos=(12, 0)).add(circle := Circle(radius=4))
+    col = _Engine.overlap(circle, chain)
+    assert col is not None
+    assert col.feature == (chain, 1)
+    assert (col.normal.x, col.normal.y) == (pytest.approx(1), pytest.approx(0))
+    assert col.penetration == pytest.approx(2)
+
+    circle.gameobj.pos = Vector(-1, 12)
+    col = _Engine.overlap(circle, chain)
+    assert col is not None and col.feature == (chain, 2)
+
+    # only the fronts of the edges are hit by rays
+    hit = _Engine.raycast(chain, Vector(-20, 0), Vector(1, 0), 40)
+    assert hit is not None
+    assert hit.distance == pytest.approx(10)
+    assert (hit.normal.x, hit.normal.y) == (pytest.approx(-1), pytest.approx(0))
+    assert _Engine.raycast(chain, Vector(0, 0), Vector(1, 0), 40) is None
+
+    with pytest.raises(ValueError):
+        EdgeChain([(0, 0)])
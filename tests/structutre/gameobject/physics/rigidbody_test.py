@@ -0,0 +1,153 @@
+"""Tests for the sleeping of rigidbodies."""
+from unittest.mock import Mock
+import pytest
+from rubato.structure.gameobject.component import Component
+from rubato.structure.gameobject.game_object import GameObject
+from rubato.structure.gameobject.physics.hitbox import Hitbox, Circle
+from rubato.structure.gameobject.physics.rigidbody import RigidBody
+from rubato.structure.gameobject.physics.engine import _Engine
+from rubato.utils.computation.vector import Vector
+from rubato.utils.rb_time import Time
+# pylint: disable=redefined-outer-name, unused-argument
+
+
+@pytest.fixture()
+def body():
+    rb = RigidBody(gravity=(0, -10))
+    GameObject().add(Hitbox(), rb)
+    return rb
+
+
+def rest(rb: RigidBody):
+    rb._rest_time = rb.sleep_time
+
+
+def test_rest_timer(monkeypatch, body):
+    monkeypatch.setattr(Time, "fixed_delta", 0.1)
+    body.fixed_update()
+    assert body._rest_time == pytest.approx(0.1)
+
+    body.velocity.x = 100
+    body.fixed_update()
+    assert body._rest_time == 0
+
+
+def test_tick_in_place(monkeypatch, body):
+    monkeypatch.setattr(Time, "fixed_delta", 0.1)
+    spawn = body.gameobj.pos
+    body.fixed_update()
+    pos, vel = body.gameobj.pos, body.velocity
+
+    body.fixed_update()
+    assert body.gameobj.pos is pos and body.velocity is vel
+    assert (pos.x, pos.y) == pytest.approx((0, -0.3))
+    assert (vel.x, vel.y) == pytest.approx((0, -2))
+
+    # the vector the game object was made with was copied before being written to
+    assert spawn == Vector(0, 0)
+
+
+def test_resolve_in_place(rub):
+    a, b = RigidBody(velocity=(10, 0)), RigidBody(velocity=(-10, 0))
+    GameObject().add(hb_a := Circle(radius=5), a)
+    GameObject(pos=(8, 0)).add(hb_b := Circle(radius=5), b)
+    _Engine.resolve(_Engine.overlap(hb_a, hb_b))
+    pos, vel = a.gameobj.pos, a.velocity
+    assert vel.x < 10
+
+    _Engine.resolve(_Engine.overlap(hb_a, hb_b))
+    assert a.gameobj.pos is pos and a.velocity is vel
+    assert pos.x < 0
+
+
+def test_sleep_and_wake(body):
+    body.velocity.x = 5
+    body.sleep()
+    assert body.asleep
+    assert body.velocity == Vector(0, 0)
+
+    # a sleeping body does not move
+    body.fixed_update()
+    assert body.asleep
+    assert body.gameobj.pos == Vector(0, 0)
+
+    body.velocity = Vector(1, 0)
+    assert not body.asleep
+
+    body.sleep()
+    body.add_impulse((1, 0))
+    assert not body.asleep
+
+    body.sleep()
+    body.add_force((1, 0))
+    assert not body.asleep
+
+    # writing to the velocity in place is noticed on the next step
+    body.sleep()
+    body.velocity.y = 3
+    body.fixed_update()
+    assert not body.asleep
+
+    body.can_sleep = False
+    body.sleep()
+    assert not body.asleep
+
+
+def test_islands():
+    a, b, c = RigidBody(), RigidBody(), RigidBody()
+    hbs = []
+    for rb in (a, b, c):
+        GameObject().add(hb := Hitbox(), rb)
+        hbs.append(hb)
+
+    contacts = [(hbs[0], hbs[1])]
+    rest(a)
+    rest(c)
+
+    # b is not resting, so its island stays awake
+    _Engine.update_sleep([a, b, c], contacts)
+    assert not a.asleep and not b.asleep
+    assert c.asleep
+
+    rest(b)
+    _Engine.update_sleep([a, b, c], contacts)
+    assert a.asleep and b.asleep
+
+    # an awake body touching a sleeping island wakes all of it
+    c.wake()
+    _Engine.update_sleep([a, b, c], contacts + [(hbs[2], hbs[1])])
+    assert not a.asleep and not b.asleep and not c.asleep
+
+    # triggers do not join islands
+    rest(a)
+    hbs[1].trigger = True
+    _Engine.update_sleep([a, b, c], contacts)
+    assert a.asleep
+    assert not b.asleep
+
+
+def test_interpolate(monkeypatch, body):
+    body.interpolate = True
+    go = body.gameobj
+    go.add(comp := Component())
+    drawn = []
+    comp.draw = lambda camera: drawn.append((go.pos.clone(), go.rotation))
+
+    monkeypatch.setattr(Time, "fixed_delta", 0.1)
+    monkeypatch.setattr(Time, "_physics_steps", 0)
+    body.velocity = Vector(10, 0)
+    body.ang_vel = 90
+    body.fixed_update()
+    monkeypatch.setattr(Time, "_physics_steps", 1)
+
+    # drawn between the last two physics steps, without moving the game object
+    monkeypatch.setattr(Time, "_physics_counter", 0.025)
+    go._draw(Mock())
+    pos, rotation = drawn[-1]
+    assert (pos.x, pos.y) == pytest.approx((0.25, -0.025)) and rotation == pytest.approx(2.25)
+    assert (go.pos.x, go.pos.y) == pytest.approx((1, -0.1)) and go.rotation == pytest.approx(9)
+
+    # a state from before the last step is out of date
+    monkeypatch.setattr(Time, "_physics_steps", 2)
+    go._draw(Mock())
+    assert drawn[-1][0] == go.pos
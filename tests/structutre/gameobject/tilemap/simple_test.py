@@ -0,0 +1,107 @@
+"""Tests for the colliders of the simple tilemap."""
+import pytest
+from rubato.structure.gameobject.game_object import GameObject
+from rubato.structure.gameobject.physics.hitbox import Rectangle, EdgeChain
+from rubato.structure.gameobject.physics.rigidbody import RigidBody
+from rubato.structure.gameobject.tilemap.simple import SimpleTilemap
+from rubato.structure.gameobject.tilemap.colliders import _outlines, _merge
+from rubato.structure.group import Group
+from rubato.utils.rendering.surface import Surface
+from rubato.utils.computation.vector import Vector
+# pylint: disable=unused-argument
+
+
+def area(outline: list[tuple[int, int]]) -> float:
+    """The signed area of an outline, positive if it goes counterclockwise."""
+    return sum(x0 * y1 - x1 * y0 for (x0, y0), (x1, y1) in zip(outline, outline[1:] + outline[:1])) / 2
+
+
+def test_outlines():
+    assert _outlines({(i, 0) for i in range(200)}) == [[(0, 1), (0, 0), (200, 0), (200, 1)]]
+
+    # tiles touching at a corner are outlined separately
+    assert len(_outlines({(0, 0), (1, 1)})) == 2
+
+    # holes get their own outline, going the other way around
+    outer, hole = sorted(_outlines({(c, r) for c in range(3) for r in range(3)} - {(1, 1)}), key=area, reverse=True)
+    assert sorted(outer) == [(0, 0), (0, 3), (3, 0), (3, 3)] and area(outer) == 9
+    assert sorted(hole) == [(1, 1), (1, 2), (2, 1), (2, 2)] and area(hole) == -1
+
+    assert len(_outlines({(0, 0), (1, 0), (0, 1)})[0]) == 6
+
+
+def test_chain_colliders(rub):
+    tiles = [Surface(8, 8), Surface(8, 8)]
+    tilemap = [[1] * 200, [0] * 200, [0] * 198 + [1, 1]]
+
+    go = GameObject().add(SimpleTilemap(tilemap, tiles, (8, 8), collision=[1], colliders="chains"))
+    go.get(SimpleTilemap).update()
+    chains = go.get_all(EdgeChain)
+    assert len(chains) == 2 and not go.get_all(Rectangle)
+    floor = min(chains, key=lambda c: c.get_aabb()[0].y)
+    assert floor.loop
+    assert floor.get_aabb() == (Vector(-800, -12), Vector(800, -4))
+
+    go = GameObject().add(SimpleTilemap(tilemap, tiles, (8, 8), collision=[1]))
+    go.get(SimpleTilemap).update()
+    assert len(go.get_all(Rectangle)) == 202
+
+
+def test_merge():
+    assert _merge({(i, 0) for i in range(200)}) == [(0, 0, 200, 1)]
+    assert _merge({(c, r) for c in range(10) for r in range(5)}) == [(0, 0, 10, 5)]
+
+    # an L is covered by its bottom row and the rest of its column
+    assert _merge({(0, 0), (1, 0), (2, 0), (0, 1), (0, 2)}) == [(0, 0, 3, 1), (0, 1, 1, 2)]
+
+    solid = {(c, r) for c in range(8) for r in range(8) if (c + r) % 3}
+    covered = [(c + i, r + j) for c, r, w, h in _merge(solid) for i in range(w) for j in range(h)]
+    assert sorted(covered) == sorted(solid)
+
+
+def test_merged_colliders(rub):
+    tiles = [Surface(8, 8), Surface(8, 8)]
+    tilemap = [[1] * 10, [1] * 10, [0] * 10]
+    go = GameObject().add(tilemap_comp := SimpleTilemap(tilemap, tiles, (8, 8), collision=[1], colliders="merged"))
+    tilemap_comp.update()
+    rects = go.get_all(Rectangle)
+    assert len(rects) == 1
+    assert rects[0].get_aabb() == (Vector(-40, -12), Vector(40, 4))
+
+    # edits replace the hitboxes instead of adding to them, and leave other hitboxes alone
+    go.add(own := Rectangle(1, 1))
+    tilemap_comp.set_tile(4, 2, 1)
+    tilemap_comp.update()
+    assert own in go.get_all(Rectangle)
+    rects = [rect for rect in go.get_all(Rectangle) if rect is not own]
+    assert len(rects) == 2
+    assert sum(rect.width * rect.height for rect in rects) == 21 * 64
+
+
+def test_grid_colliders(rub):
+    tiles = [Surface(8, 8), Surface(8, 8)]
+    tilemap = [[1] * 10, [0] * 9 + [1], [0] * 10]
+    ground = GameObject().add(tilemap_comp := SimpleTilemap(tilemap, tiles, (8, 8), collision=[1], colliders="grid"))
+    tilemap_comp.update()
+    assert not ground.get_all(Rectangle)
+
+    box = GameObject(pos=(0, 10)).add(Rectangle(width=6, height=6), rb := RigidBody(gravity=(0, -200)))
+    group = Group()
+    group.add(ground, box)
+
+    for _ in range(60):
+        group._fixed_update()
+    assert box.pos.y == pytest.approx(-1) and rb.velocity.y == 0
+
+    # sliding along the floor doesn't catch on the seams between tiles, and the wall stops it
+    rb.velocity = Vector(300, 0)
+    for _ in range(60):
+        group._fixed_update()
+    assert box.pos.x == pytest.approx(29) and box.pos.y == pytest.approx(-1)
+
+    # edits collide right away, without any hitboxes
+    tilemap_comp.set_tile(8, 0, 0)
+    for _ in range(10):
+        group._fixed_update()
+    assert box.pos.y < -4
+    assert not ground.get_all(Rectangle)
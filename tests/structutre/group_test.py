@@ -1,12 +1,28 @@
 """Test the Group class."""
 from unittest.mock import Mock
 import pytest
-from rubato.structure.gameobject.physics.hitbox import Hitbox
+from rubato.structure.gameobject.physics.hitbox import Hitbox, Rectangle
+from rubato.structure.gameobject.physics.rigidbody import RigidBody
+from rubato.structure.gameobject.physics.aabb_tree import AABBTree
+from rubato.structure.gameobject.physics.sweep_prune import SweepAndPrune
+from rubato.structure.gameobject.tilemap.simple import SimpleTilemap
 from rubato.structure.gameobject.game_object import GameObject
 from rubato.structure.group import Group
 from rubato.utils.error import Error
 from rubato.utils.rendering.camera import Camera
-# pylint: disable=redefined-outer-name
+from rubato.utils.computation.vector import Vector
+from rubato.utils.rb_time import Time
+# pylint: disable=redefined-outer-name, unused-argument
+
+
+def mock_collide(monkeypatch) -> Mock:
+    """Replaces the narrowphase with a mock that is called with each pair of hitboxes it is given."""
+    collide = Mock()
+    monkeypatch.setattr(
+        "rubato.structure.group._Engine.collide_all",
+        lambda pairs, manifolds: [collide(hb, other, manifolds) for hb, other in pairs],
+    )
+    return collide
 
 
 @pytest.fixture()
@@ -64,23 +80,314 @@ def test_pass_on_funcs(group, go):
 def test_fixed_update(monkeypatch, group, go):
     go.add(Hitbox())
     go2 = GameObject().add(Hitbox())
+    go3 = GameObject().add(Hitbox())
     g = Group()
-    g.add(go2, go)
+    g.add(go2, go3)
 
     group.add(go, g)
 
-    collide = Mock()
-    calc_bb = Mock()
-    monkeypatch.setattr("rubato.structure.qtree._QTree.collide", collide)
-    monkeypatch.setattr("rubato.structure.qtree._QTree.calc_bb", calc_bb)
+    collide = mock_collide(monkeypatch)
+
+    group._fixed_update()
+
+    go._fixed_update.assert_called_once()
+
+    assert collide.call_count == 3
+    assert list(group._proxies) == [go.get(Hitbox)]
+    assert list(g._proxies) == [go2.get(Hitbox), go3.get(Hitbox)]
+
+
+def test_fixed_update_persistent_tree(monkeypatch, group, go):
+    go.add(Hitbox())
+    group.add(go)
+
+    mock_collide(monkeypatch)
+
+    group._fixed_update()
+    proxy = group._proxies[go.get(Hitbox)]
+
+    group._fixed_update()
+    assert group._proxies[go.get(Hitbox)] is proxy
+
+    group.remove(go)
+    group._fixed_update()
+    assert not group._proxies
+
+
+def test_broadphase(monkeypatch, group, go):
+    assert isinstance(group.broadphase, AABBTree)
+    assert isinstance(Group(broadphase=SweepAndPrune()).broadphase, SweepAndPrune)
+
+    go.add(Hitbox())
+    go2 = GameObject().add(Hitbox())
+    group.add(go, go2)
+
+    collide = mock_collide(monkeypatch)
+
+    group._fixed_update()
+    group.broadphase = SweepAndPrune()
+    assert not group._proxies
+
+    group._fixed_update()
+    assert list(group._proxies) == [go.get(Hitbox), go2.get(Hitbox)]
+    assert collide.call_count == 2
+
+    assert isinstance(group.clone().broadphase, SweepAndPrune)
+
+
+def test_clone_settings():
+    group = Group(velocity_iterations=3, batch_integration=True)
+    clone = group.clone()
+    assert clone.velocity_iterations == 3
+    assert clone.batch_integration
+
+
+def test_fixed_update_filter(monkeypatch, group):
+    coin = GameObject().add(Hitbox(category=0b10, mask=0b01))
+    enemy = GameObject().add(Hitbox(category=0b100))
+    player = GameObject().add(Hitbox(category=0b01))
+    group.add(coin, enemy, player)
+
+    collide = mock_collide(monkeypatch)
+
+    group._fixed_update()
+    pairs = {frozenset((c.args[0].gameobj, c.args[1].gameobj)) for c in collide.call_args_list}
+    assert pairs == {frozenset((coin, player)), frozenset((enemy, player))}
+
+
+def test_fixed_update_static(rub, monkeypatch, group):
+    player = GameObject().add(Hitbox(), RigidBody())
+    wall = GameObject().add(Hitbox(), RigidBody(static=True))
+    tiles = GameObject().add(SimpleTilemap([[0]], []), Hitbox(), Hitbox())
+    sub = Group()
+    sub.add(sensor := GameObject().add(Hitbox()))
+    group.add(player, wall, tiles, sub)
+
+    collide = mock_collide(monkeypatch)
+
+    group._fixed_update()
+    pairs = {frozenset((c.args[0].gameobj, c.args[1].gameobj)) for c in collide.call_args_list}
+    assert pairs == {
+        frozenset((player, wall)),
+        frozenset((player, tiles)),
+        frozenset((player, sensor)),
+        frozenset((sensor, wall)),
+        frozenset((sensor, tiles)),
+    }
+    assert collide.call_count == 7
+    assert list(group._proxies) == player.get_all(Hitbox)
+    assert list(group._static_proxies) == wall.get_all(Hitbox) + tiles.get_all(Hitbox)
+
+    # static game objects are only measured again when they change
+    monkeypatch.setattr(group._static, "move", move := Mock())
+    group._fixed_update()
+    move.assert_not_called()
+
+    tiles.pos = Vector(10, 0)
+    group._fixed_update()
+    assert move.call_count == 2
+    move.assert_called_with(group._static_proxies[tiles.get_all(Hitbox)[1]], 10, 0, 10, 0)
+
+    wall.get(RigidBody).static = False
+    group._fixed_update()
+    assert list(group._proxies) == player.get_all(Hitbox) + wall.get_all(Hitbox)
+    assert list(group._static_proxies) == tiles.get_all(Hitbox)
+
+    tiles.remove_ind(Hitbox, 0)
+    tiles.pos = Vector(20, 0)
+    group._fixed_update()
+    assert list(group._static_proxies) == tiles.get_all(Hitbox)
+
+
+def test_fixed_update_hitbox_only(rub, group):
+    # game objects without a rigidbody, like a player moved by hand and a coin, still collide with each other
+    hits = []
+    player = GameObject().add(Rectangle(10, 10, on_collide=lambda col: hits.append(col.shape_b.gameobj)))
+    coin = GameObject(pos=(5, 0)).add(Rectangle(10, 10, trigger=True))
+    group.add(player, coin)
+
+    group._fixed_update()
+    assert hits == [coin]
+    assert coin.get(Rectangle) in player.get(Rectangle).colliding
+
+
+def test_fixed_update_many_hitboxes(rub, monkeypatch, group):
+    tiles = GameObject().add(*[Rectangle(10, 10, offset=(x * 10, 0)) for x in range(100)], RigidBody(static=True))
+    player = GameObject(pos=(500, 0)).add(Rectangle(12, 8), RigidBody())
+    group.add(tiles, player)
+
+    collide = mock_collide(monkeypatch)
+
+    group._fixed_update()
+    # only the tiles touching the player are tested, not the whole map
+    assert {c.args[1].offset.x for c in collide.call_args_list} == {490, 500, 510}
+
+
+def test_fixed_update_sleep(rub, group):
+    floor = GameObject(pos=(0, -10)).add(Rectangle(100, 20), RigidBody(static=True))
+    crate = GameObject(pos=(0, 4.9)).add(Rectangle(10, 10), RigidBody(gravity=(0, -10)))
+    group.add(floor, crate)
+    body = crate.get(RigidBody)
+    hb = crate.get(Rectangle)
+    hb.on_exit = Mock()
+
+    group._fixed_update()
+    assert floor.get(Rectangle) in hb.colliding
+
+    body.sleep()
+    group._fixed_update()
+    assert hb in group._static_proxies
+    assert not group._proxies
+
+    # the contact with the floor is kept while both are at rest
+    assert floor.get(Rectangle) in hb.colliding
+    assert len(group._contacts) == 1
+    hb.on_exit.assert_not_called()
+
+    # moving the floor wakes the crate up
+    floor.pos = Vector(1, -10)
+    group._fixed_update()
+    assert not body.asleep
+    group._fixed_update()
+    assert hb in group._proxies
+
+    # removing the floor under a sleeping crate wakes it up too
+    body.sleep()
+    group._fixed_update()
+    group.remove(floor)
+    group._fixed_update()
+    assert not body.asleep
+    hb.on_exit.assert_called_once()
+
+
+@pytest.mark.parametrize("continuous", [False, True])
+def test_fixed_update_continuous(monkeypatch, rub, group, continuous):
+    monkeypatch.setattr(Time, "fixed_delta", 1 / 30)
+    wall = GameObject(pos=(50, 0)).add(Rectangle(4, 100))
+    bullet = GameObject().add(Rectangle(4, 4), RigidBody(velocity=(3000, 0), gravity=(0, 0), continuous=continuous))
+    group.add(wall, bullet)
+
+    group._fixed_update()
+    if continuous:
+        assert 40 < bullet.pos.x < 50
+        assert wall.get(Rectangle) in bullet.get(Rectangle).colliding
+        assert bullet.get(RigidBody).velocity.x <= 0
+    else:
+        assert bullet.pos.x == pytest.approx(100)
+        assert not bullet.get(Rectangle).colliding
+
+
+def test_fixed_update_continuous_nested(monkeypatch, rub, group):
+    monkeypatch.setattr(Time, "fixed_delta", 1 / 30)
+    wall = GameObject(pos=(50, 0)).add(Rectangle(4, 100))
+    bullet = GameObject().add(Rectangle(4, 4), RigidBody(velocity=(3000, 0), gravity=(0, 0), continuous=True))
+    child = Group()
+    child.add(bullet)
+    group.add(wall, child)
+
+    group._fixed_update()
+    assert 40 < bullet.pos.x < 50
+    hb = bullet.get(Rectangle)
+    assert hb in child._broadphase.query(*hb._bounds())
+
+
+def test_fixed_update_stack(monkeypatch, rub, group):
+    monkeypatch.setattr(Time, "fixed_delta", 1 / 30)
+    group.add(GameObject(pos=(0, -10)).add(Rectangle(400, 20)))
+    boxes = [
+        GameObject(pos=(0, 10 + 20 * i)).add(Rectangle(20, 20), RigidBody(gravity=(0, -300), can_sleep=False))
+        for i in range(5)
+    ]
+    group.add(*boxes)
+
+    for _ in range(60):
+        group._fixed_update()
+
+    for i, box in enumerate(boxes):
+        assert box.pos.y == pytest.approx(10 + 20 * i, abs=1)
+        assert box.get(RigidBody).velocity.magnitude == pytest.approx(0, abs=0.1)
+
+    # the contacts are carried over to the next step along with their impulses
+    assert len(group._manifolds) == 5
+    old = dict(group._manifolds)
+    group._fixed_update()
+    for key, col in group._manifolds.items():
+        assert col.feature == old[key].feature
+        assert col._jn > 0
+
 
+def test_batch_integration(monkeypatch, rub):
+    monkeypatch.setattr(Time, "fixed_delta", 0.1)
+    spawn = Vector(0, 0)
+    groups = [Group(), Group(batch_integration=True)]
+    for group in groups:
+        group.add(
+            GameObject(pos=spawn).add(RigidBody(gravity=(0, -10), velocity=(5, 0))),
+            GameObject(pos=spawn).add(RigidBody(gravity=(0, -10), max_speed=(2, 2))),
+        )
+
+    for _ in range(5):
+        for group in groups:
+            group._fixed_update()
+
+    for a, b in zip(groups[0].game_objects, groups[1].game_objects):
+        assert (b.pos.x, b.pos.y) == (pytest.approx(a.pos.x), pytest.approx(a.pos.y))
+        assert b.get(RigidBody).velocity == a.get(RigidBody).velocity
+        assert b.get(RigidBody)._rest_time == pytest.approx(a.get(RigidBody)._rest_time)
+
+    # the shared vector was copied before being written to
+    assert spawn == Vector(0, 0)
+    assert groups[1].game_objects[1].get(RigidBody).velocity == Vector(0, -2)
+
+
+@pytest.fixture()
+def walls(group):
+    group.add(
+        near := GameObject(pos=(10, 0), name="near").add(Rectangle(4, 20)),
+        far := GameObject(pos=(30, 0), name="far").add(Rectangle(4, 20, trigger=True)),
+    )
+    group.add(sub := Group())
+    sub.add(deep := GameObject(pos=(50, 0), name="deep").add(Rectangle(4, 20, category=2)))
     group._fixed_update()
+    return near.get(Rectangle), far.get(Rectangle), deep.get(Rectangle)
+
+
+def test_query_point(rub, group, walls):
+    near, far, deep = walls
+    assert group.query_point((10, 5)) == [near]
+    assert group.query_point((50, 0)) == [deep]
+    assert group.query_point((50, 0), mask=1) == []
+    assert group.query_point((20, 0)) == []
 
-    go._fixed_update.assert_called()
-    assert go._fixed_update.call_count == 2
 
-    assert collide.call_count == 5
-    assert calc_bb.call_count == 2
+def test_query_aabb(rub, group, walls):
+    near, far, deep = walls
+    assert group.query_aabb((20, -1), (52, 1)) == [far, deep]
+    assert group.query_aabb((25, -1), (60, 1), triggers=False) == [deep]
+
+
+def test_raycast(rub, group, walls):
+    near, far, deep = walls
+    hit = group.raycast((0, 0), (1, 0), 100)
+    assert hit.hitbox is near
+    assert hit.distance == pytest.approx(8)
+
+    assert [hit.hitbox for hit in group.raycast_all((0, 0), (1, 0), 100)] == [near, far, deep]
+    assert [hit.hitbox for hit in group.raycast_all((0, 0), (1, 0), 40, triggers=False)] == [near]
+    assert [hit.hitbox for hit in group.raycast_all((100, 0), (-1, 0), 100, mask=2)] == [deep]
+    assert group.raycast((0, 20), (1, 0), 100) is None
+
+
+def test_shape_cast(rub, group, walls):
+    near, far, deep = walls
+    group.add(GameObject().add(ball := Rectangle(2, 2), Rectangle(2, 2, offset=(0, 30))))
+    group._fixed_update()
+
+    hits = group.shape_cast(ball, (1, 0), 100)
+    assert [hit.hitbox for hit in hits] == [near, far, deep]
+    assert hits[0].distance == pytest.approx(7, abs=0.1)
+    assert hits[0].normal == Vector(-1, 0)
+    assert ball.gameobj.pos == Vector(0, 0)
 
 
 def test_count(group):
@@ -90,3 +397,43 @@ def test_count(group):
     group.add(*[GameObject() for _ in range(10)])
 
     assert group.count() == 20
+
+
+def test_fixed_update_nested(monkeypatch, group):
+    go = GameObject().add(Hitbox())
+    g, g2 = Group(), Group()
+    g2.add(GameObject().add(Hitbox()))
+    g.add(GameObject().add(Hitbox()), g2)
+    group.add(go, g)
+
+    collide = mock_collide(monkeypatch)
+
+    group._fixed_update()
+    group._fixed_update()
+
+    # each of the 3 pairs once per step
+    assert collide.call_count == 6
+    assert len(g.game_objects) == 1
+    assert len(group.all_gameobjects()) == 2
+    assert len(group.all_gameobjects(True)) == 3
+
+
+def test_fixed_update_culled_exit(rub, group):
+    a = Rectangle(width=10, height=10)
+    b = Rectangle(width=10, height=10)
+    a.on_exit = Mock()
+    go_a = GameObject().add(a)
+    go_b = GameObject(pos=(5, 0)).add(b)
+    group.broadphase = SweepAndPrune()
+    group.add(go_a, go_b)
+
+    group._fixed_update()
+    assert b in a.colliding
+    assert len(group._contacts) == 1
+
+    # far enough apart that the broadphase never reports the pair
+    go_b.pos = Vector(100, 0)
+    group._fixed_update()
+    assert b not in a.colliding
+    a.on_exit.assert_called_once()
+    assert not group._contacts
@@ -0,0 +1,46 @@
+"""Test the Scene class."""
+import pytest
+from rubato.structure.scene import Scene
+from rubato.structure.gameobject.component import Component
+from rubato.structure.gameobject.game_object import GameObject
+from rubato.structure.gameobject.physics.rigidbody import RigidBody
+from rubato.utils.rb_time import Time
+# pylint: disable=unused-argument
+
+
+class Counter(Component):
+    """Counts its updates and remembers the delta times it saw."""
+
+    def __init__(self):
+        super().__init__()
+        self.updates: list[float] = []
+        self.fixed_updates: list[float] = []
+
+    def update(self):
+        self.updates.append(Time.delta_time)
+
+    def fixed_update(self):
+        self.fixed_updates.append(Time.fixed_delta)
+
+
+def test_simulate(rub, monkeypatch):
+    monkeypatch.setattr(Time, "fixed_delta", 0.02)
+    scene = Scene()
+    scene.add(go := GameObject().add(counter := Counter(), rb := RigidBody(gravity=(0, -10), can_sleep=False)))
+
+    scene.simulate(10, dt=0.1)
+    assert counter.updates == [0.1] * 10 and counter.fixed_updates == [0.1] * 10
+    assert rb.velocity.y == pytest.approx(-10)
+    assert go.pos.y == pytest.approx(-5.5)
+    assert Time.fixed_delta == 0.02
+    assert scene.started
+
+    scene.simulate(5, update=False)
+    assert len(counter.updates) == 10 and counter.fixed_updates[10:] == [0.02] * 5
+
+    # the same scene simulated the same way ends up in the same place
+    other = Scene()
+    other.add(GameObject().add(other_rb := RigidBody(gravity=(0, -10), can_sleep=False)))
+    other.simulate(10, dt=0.1)
+    other.simulate(5, update=False)
+    assert other_rb.gameobj.pos == go.pos
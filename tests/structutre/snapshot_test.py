@@ -0,0 +1,85 @@
+"""Test snapshots of scenes."""
+from rubato.structure.scene import Scene
+from rubato.structure.gameobject.game_object import GameObject
+from rubato.structure.gameobject.physics.hitbox import Rectangle
+from rubato.structure.gameobject.physics.rigidbody import RigidBody
+from rubato.structure.gameobject.particles.system import ParticleSystem
+from rubato.structure.gameobject.sprites.animation import Animation
+from rubato.utils.rendering.surface import Surface
+# pylint: disable=unused-argument
+
+
+def make_scene() -> tuple[Scene, list[GameObject]]:
+    scene = Scene()
+    ground = GameObject(pos=(0, -50)).add(Rectangle(width=200, height=20))
+    boxes = [
+        GameObject(pos=(x, 0)).add(Rectangle(width=10, height=10), RigidBody(gravity=(0, -100), velocity=(x, 0)))
+        for x in (-20, 0, 20)
+    ]
+    scene.add(ground, *boxes)
+    return scene, boxes
+
+
+def state(boxes: list[GameObject]) -> list:
+    return [(box.pos.x, box.pos.y, box.get(RigidBody).velocity.y) for box in boxes]
+
+
+def test_rollback(rub):
+    scene, boxes = make_scene()
+    scene.simulate(20)
+    snap = scene.snapshot()
+    scene.simulate(30)
+    later = state(boxes)
+    assert all(box.get(Rectangle).colliding for box in boxes)
+
+    scene.add(extra := GameObject().add(Rectangle(width=10, height=10)))
+    scene._dump()
+    vectors = [(box.pos, box.get(RigidBody)._velocity) for box in boxes]
+    scene.restore(snap)
+    # the numbers are written back into the same vectors
+    assert all(box.pos is pos and box.get(RigidBody)._velocity is vel for box, (pos, vel) in zip(boxes, vectors))
+    assert extra not in scene.root.game_objects
+    assert not any(box.get(Rectangle).colliding for box in boxes)
+
+    # simulating again from the snapshot ends up in the same place
+    scene.simulate(30)
+    assert state(boxes) == later
+
+
+def test_delta(rub):
+    scene, _ = make_scene()
+    scene.simulate(5)
+    base = scene.snapshot()
+    scene.simulate(1)
+    snap = scene.snapshot()
+
+    delta = snap.delta(base)
+    assert 0 < len(delta.values) < len(snap.data)
+    assert delta.apply(base).data == snap.data
+
+    # deltas also cover snapshots of a different length
+    scene.add(GameObject(pos=(500, 0)).add(Rectangle(width=10, height=10)))
+    scene._dump()
+    bigger = scene.snapshot()
+    assert len(bigger.data) > len(base.data)
+    assert bigger.delta(base).apply(base).data == bigger.data
+    assert base.delta(bigger).apply(bigger).data == base.data
+
+
+def test_components(rub):
+    scene = Scene()
+    system = ParticleSystem(running=True, duration=10)
+    anim = Animation(fps=10)
+    anim.add("idle", [Surface(2, 2) for _ in range(4)])
+    scene.add(GameObject().add(system, anim))
+
+    scene.simulate(3, dt=0.05)
+    particles = system.num_particles()
+    frame = anim.current_frame
+    snap = scene.snapshot()
+
+    scene.simulate(10, dt=0.05)
+    assert system.num_particles() > particles and anim.current_frame != frame
+
+    scene.restore(snap)
+    assert system.num_particles() == particles and anim.current_frame == frame
@@ -0,0 +1,65 @@
+"""Test the physics stats."""
+from unittest.mock import Mock
+import pytest
+from rubato.game import Game
+from rubato.structure.scene import Scene
+from rubato.structure.gameobject.game_object import GameObject
+from rubato.structure.gameobject.physics.hitbox import Rectangle, Circle
+from rubato.structure.gameobject.physics.rigidbody import RigidBody
+from rubato.utils.error import InitError
+from rubato.utils.physics_stats import PhysicsStats, StepStats
+# pylint: disable=redefined-outer-name, unused-argument
+
+
+@pytest.fixture()
+def stats(monkeypatch):
+    monkeypatch.setattr(PhysicsStats, "enabled", True)
+    monkeypatch.setattr(PhysicsStats, "history", [])
+    return PhysicsStats
+
+
+def test_init():
+    with pytest.raises(InitError):
+        PhysicsStats()
+
+
+def test_step(rub, stats):
+    scene = Scene()
+    scene.add(
+        GameObject(pos=(0, 0)).add(Rectangle(width=10, height=10, on_collide=Mock()), RigidBody()),
+        GameObject(pos=(8, 0)).add(Circle(radius=4), RigidBody()),
+        GameObject(pos=(100, 0)).add(Circle(radius=4), RigidBody()),
+    )
+    scene._fixed_update()
+
+    step = stats.last()
+    assert step.pairs == 1 and step.tests == {"Circle-Rectangle": 1}
+    assert step.contacts == 1 and step.resolved == 1 and step.callbacks == 1
+    assert step.total >= step.broadphase + step.narrowphase + step.solve > 0
+
+    # nothing is recorded while disabled
+    stats.enabled = False
+    scene._fixed_update()
+    assert len(stats.history) == 1
+
+
+def test_history(stats, monkeypatch):
+    monkeypatch.setattr(PhysicsStats, "history_length", 3)
+    assert stats.last() is None
+    assert stats.average().pairs == 0
+
+    for i in range(5):
+        stats._begin_step()
+        stats._step.pairs = i
+        stats._step.tests["Circle-Circle"] = 2 * i
+        stats._end_step()
+
+    assert [step.pairs for step in stats.history] == [2, 3, 4]
+    assert stats.average().pairs == 3 and stats.average().tests == {"Circle-Circle": 6}
+    stats.clear()
+    assert not stats.history
+
+
+def test_draw(rub, stats):
+    stats.history.append(StepStats())
+    stats._draw(Game.debug_font)
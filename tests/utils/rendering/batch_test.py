@@ -0,0 +1,130 @@
+"""Test drawing surfaces in batches"""
+import ctypes
+import sdl2
+from rubato.utils.hardware.display import Display
+from rubato.utils.rendering.draw import Draw
+from rubato.utils.rendering.surface import Surface
+from rubato.utils.color import Color
+
+
+def read_pixels() -> tuple[list[int], int]:
+    Display._flush()
+    w, h = ctypes.c_int(0), ctypes.c_int(0)
+    sdl2.SDL_GetRendererOutputSize(Display.renderer.sdlrenderer, ctypes.byref(w), ctypes.byref(h))
+    buf = (ctypes.c_uint32 * (w.value * h.value))()
+    sdl2.SDL_RenderReadPixels(
+        Display.renderer.sdlrenderer, sdl2.SDL_Rect(0, 0, w.value, h.value), sdl2.SDL_PIXELFORMAT_ARGB8888, buf,
+        w.value * 4
+    )
+    return list(buf), w.value
+
+
+def close(pixel: int, color: Color) -> bool:
+    # the window is scaled down from the resolution, which can shift the colors a little
+    return all(abs((pixel >> shift & 255) - (color.argb32() >> shift & 255)) <= 2 for shift in (0, 8, 16, 24))
+
+
+def make_surface(width: int, height: int, color: Color, **kwargs) -> Surface:
+    surf = Surface(width, height, **kwargs)
+    surf.fill(color)
+    surf.set_pixel((-width // 2 + 1, height // 2 - 1), Color.black)
+    return surf
+
+
+def test_atlas(rub):
+    # pylint: disable=unused-argument
+    a = Surface(8, 8)
+    b = Surface(20, 10)
+    big = Surface(200, 10)
+    af = Surface(8, 8, af=True)
+
+    assert a._slot is not None and b._slot is not None
+    assert a._tx is b._tx
+    assert big._slot is None and af._slot is None
+
+    slot = a._slot
+    del a
+    c = Surface(7, 8)
+    assert c._slot == slot
+
+    c.af = True
+    assert c._slot is None
+    c.af = False
+    assert c._slot == slot
+
+
+def test_draw_calls(rub):
+    # pylint: disable=unused-argument
+    small = [make_surface(8, 8, Color.red), make_surface(10, 6, Color.blue), make_surface(4, 12, Color.green)]
+    big = make_surface(200, 10, Color.yellow)
+
+    # the first frame uploads the pixels of the surfaces
+    for surf in small + [big]:
+        Draw.surface(surf)
+    Display._present()
+
+    Draw.clear()
+    for i in range(30):
+        Draw.surface(small[i % 3], (i * 3, 0))
+    Display._present()
+    assert Display.draw_calls == 1
+
+    Draw.clear()
+    Draw.surface(small[0], (0, 0))
+    Draw.surface(big, (0, 0))
+    Draw.surface(small[1], (0, 0))
+    Draw.surface(small[2], (0, 0))
+    Display._present()
+    assert Display.draw_calls == 3
+
+    Display.batching = False
+    try:
+        Draw.clear()
+        for i in range(30):
+            Draw.surface(small[i % 3], (i * 3, 0))
+        Display._present()
+        assert Display.draw_calls == 30
+    finally:
+        Display.batching = True
+
+
+def test_same_pixels(rub):
+    # pylint: disable=unused-argument
+    surfs = [
+        make_surface(8, 22, Color.red, scale=(1, -1)),
+        make_surface(7, 14, Color.blue, scale=(2, 1.5)),
+        make_surface(13, 4, Color.green, scale=(-1.5, 1.5), rotation=180),
+        make_surface(30, 15, Color.purple, scale=(-1, -1)),
+        make_surface(150, 20, Color.orange),
+        make_surface(20, 28, Color.cyan),
+    ]
+    surfs[1].set_alpha(128)
+    surfs[5].set_alpha(50)
+
+    def draw():
+        Draw.clear()
+        for i, surf in enumerate(surfs):
+            Draw.surface(surf, (i * 20 - 60, i * 10 - 30))
+        return read_pixels()[0]
+
+    batched = draw()
+    Display.batching = False
+    try:
+        assert draw() == batched
+    finally:
+        Display.batching = True
+
+
+def test_changed_surface(rub):
+    # pylint: disable=unused-argument
+    surf = make_surface(10, 10, Color.red)
+    Draw.clear()
+    Draw.surface(surf, (-50, 0))
+    surf.fill(Color.blue)
+    Draw.surface(surf, (50, 0))
+    pixels, width = read_pixels()
+
+    # the window is half the size of the resolution
+    center = len(pixels) // 2 + width // 2
+    assert close(pixels[center - 25], Color.red)
+    assert close(pixels[center + 25], Color.blue)
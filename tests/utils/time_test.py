@@ -10,3 +10,10 @@ def test_sec_to_milli():
     assert Time.sec_to_milli(1) == 1000
     assert Time.sec_to_milli(0) == 0
     assert Time.sec_to_milli(-1) == -1000
+
+def test_physics_alpha(monkeypatch):
+    monkeypatch.setattr(Time, "fixed_delta", 0.1)
+    monkeypatch.setattr(Time, "_physics_counter", 0.025)
+    assert Time.physics_alpha == 0.25
+    monkeypatch.setattr(Time, "_physics_counter", 0.2)
+    assert Time.physics_alpha == 1